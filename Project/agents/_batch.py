@@ -0,0 +1,127 @@
+"""
+Bulk execution for legal agents
+Fans many inputs through an agent's async methods under a concurrency cap and a request-rate limit
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, List, Optional
+
+from agents._llm import backoff_delay, caller_retries, is_transient
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRateLimiter:
+    """Token bucket allowing `rate` acquisitions per `period` seconds, with bursts up to `rate`"""
+
+    def __init__(self, rate: float, period: float = 60.0):
+        """
+        Initialize rate limiter
+
+        Args:
+            rate: Acquisitions allowed per period
+            period: Length of the period in seconds
+        """
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.period)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class BatchProcessor:
+    """
+    Runs one agent method over many inputs concurrently
+
+    Calls go through the agent's async twin (a<method>), at most max_concurrency
+    at a time and at most rpm per minute. Transient Gemini errors are retried
+    here with exponential backoff (invoke/ainvoke's own retries are turned off
+    for these calls); results come back in input order.
+    """
+
+    def __init__(self, agent: Any, max_concurrency: Optional[int] = None, rpm: Optional[int] = None,
+                 retries: Optional[int] = None):
+        """
+        Initialize batch processor
+
+        Args:
+            agent: Agent wrapper exposing async a<method> twins (e.g. ContractAnalysisAgent)
+            max_concurrency: Calls in flight (defaults to GEMINI_MAX_CONCURRENCY)
+            rpm: Calls started per minute (defaults to GEMINI_REQUESTS_PER_MINUTE)
+            retries: Retries per item on transient errors (defaults to GEMINI_MAX_RETRIES)
+        """
+        self.agent = agent
+        self.max_concurrency = max_concurrency or config.GEMINI_MAX_CONCURRENCY
+        self.rpm = rpm or config.GEMINI_REQUESTS_PER_MINUTE
+        self.retries = config.GEMINI_MAX_RETRIES if retries is None else retries
+
+    async def run_batch(
+        self,
+        method_name: str,
+        items: List[dict],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Run an agent method over every item
+
+        Args:
+            method_name: Sync method name (e.g. 'analyze_contract'); its async twin is called
+            items: Input dictionaries, one per call
+            on_progress: Called with (completed, total) after each item finishes
+            return_exceptions: Put failures in the result list instead of raising the first one
+
+        Returns:
+            Results in the same order as items
+        """
+        method = getattr(self.agent, f"a{method_name}")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        limiter = AsyncRateLimiter(self.rpm)
+        total = len(items)
+        completed = 0
+
+        async def run_one(item: dict) -> Any:
+            nonlocal completed
+            try:
+                for attempt in range(self.retries + 1):
+                    async with semaphore:
+                        await limiter.acquire()
+                        try:
+                            # One Gemini request per attempt, so retries and the rpm cap count real calls
+                            with caller_retries():
+                                return await method(item)
+                        except Exception as e:
+                            if not is_transient(e) or attempt == self.retries:
+                                raise
+                            error = e
+                    delay = backoff_delay(attempt)
+                    logger.warning(f"Batch {method_name} item failed transiently ({str(error)[:100]}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+            finally:
+                completed += 1
+                if on_progress is not None:
+                    on_progress(completed, total)
+
+        logger.info(f"Running batch {method_name} over {total} items")
+        return await asyncio.gather(*[run_one(item) for item in items], return_exceptions=return_exceptions)
@@ -0,0 +1,382 @@
+"""
+Response caching for legal agents
+Content-addressed LRU (or persistent SQLite) cache so identical prompts skip the Gemini round-trip
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol, Tuple, Union
+
+from agents._metrics import agent_metrics
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Compressed values start with a format byte so the preset dictionary can change without misreading old entries
+_ZLIB_V1 = b"\x01"
+_COMPRESSION_LEVEL = 3
+_COMPRESS_MIN_BYTES = 512
+
+# Boilerplate that recurs across legal analyses, primed into zlib so even short responses compress well
+_ZDICT_V1 = (
+    "## Executive Summary\n## Key Findings\n## Recommendations\n## Risk Assessment\n"
+    "## Compliance Gaps\n## Implementation Roadmap\n## Legal Analysis\n## Conclusion\n"
+    "### Immediate Actions\n### Short-term\n### Long-term\n**Priority**: High\n**Priority**: Medium\n"
+    "**Risk Level**: **Recommendation**: **Timeline**: **Jurisdiction**: **Regulation**: "
+    "GDPR CCPA HIPAA SOX PCI-DSS ISO 27001 FCPA compliance requirements regulatory obligations "
+    "precedent holding court jurisdiction plaintiff defendant contract clause liability "
+    "indemnification termination confidentiality data protection breach notification "
+    "- **\n| --- | --- |\n1. **\n2. **\n3. **\nthe organization should ensure that "
+).encode("utf-8")
+
+
+class CacheBackend(Protocol):
+    """Storage for cache entries: key -> (value, expiry timestamp or None)"""
+
+    def get(self, key: str) -> Optional[Tuple[Union[str, bytes], Optional[float]]]:
+        ...
+
+    def set(self, key: str, value: Union[str, bytes], expires_at: Optional[float]) -> None:
+        ...
+
+    def delete(self, key: str) -> None:
+        ...
+
+    def clear(self) -> None:
+        ...
+
+    def __len__(self) -> int:
+        ...
+
+
+class MemoryBackend:
+    """Thread-safe in-process LRU backend"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[Union[str, bytes], Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[Union[str, bytes], Optional[float]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Union[str, bytes], expires_at: Optional[float]) -> None:
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    Persistent backend in a SQLite file, shared across restarts and worker processes
+
+    Rows written under a different prompt_version are treated as misses, so bumping
+    the version after an instruction or template change invalidates old responses.
+    """
+
+    def __init__(self, path: str, prompt_version: str = "v1", maxsize: Optional[int] = None):
+        """
+        Initialize SQLite backend
+
+        Args:
+            path: Database file (created along with its directory if missing)
+            prompt_version: Version tag stored with, and required of, every entry
+            maxsize: Maximum rows kept; the oldest are dropped beyond it (None for unbounded)
+        """
+        self.path = str(Path(path).expanduser())
+        self.prompt_version = prompt_version
+        self.maxsize = maxsize
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            # WAL lets readers in other processes proceed while one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llmCache (
+                    inputHash TEXT PRIMARY KEY,
+                    promptVersion TEXT NOT NULL,
+                    response BLOB NOT NULL,
+                    createdAt INTEGER NOT NULL,
+                    expiresAt INTEGER
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS by_created ON llmCache (createdAt)")
+
+    def get(self, key: str) -> Optional[Tuple[Union[str, bytes], Optional[float]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expiresAt FROM llmCache WHERE inputHash = ? AND promptVersion = ?",
+                (key, self.prompt_version)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, value: Union[str, bytes], expires_at: Optional[float]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llmCache (inputHash, promptVersion, response, createdAt, expiresAt) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, self.prompt_version, value, int(time.time()), expires_at)
+            )
+            if self.maxsize:
+                self._conn.execute(
+                    "DELETE FROM llmCache WHERE inputHash IN "
+                    "(SELECT inputHash FROM llmCache ORDER BY createdAt DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                    (self.maxsize,)
+                )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llmCache WHERE inputHash = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llmCache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llmCache").fetchone()[0]
+
+
+class ResponseCache:
+    """Cache of agent responses keyed by a digest of the prompt (or of a method call)"""
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None, backend: Optional[CacheBackend] = None,
+                 compress: bool = False):
+        """
+        Initialize response cache
+
+        Args:
+            maxsize: Maximum number of responses kept by the default in-memory backend
+            ttl: Seconds before an entry expires (None keeps entries until evicted)
+            backend: Storage backend (defaults to an in-memory LRU)
+            compress: Store long text responses zlib-compressed
+        """
+        self.ttl = ttl
+        self.backend = backend if backend is not None else MemoryBackend(maxsize)
+        self.compress = compress
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(prompt: str) -> str:
+        """Stable 128-bit digest of the prompt text"""
+        return hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).hexdigest()
+
+    @staticmethod
+    def make_call_key(method: str, model: str, data: Any) -> str:
+        """Digest of a method call: method name, model and input data"""
+        payload = json.dumps({"method": method, "model": model, "data": data}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Return the cached response for a prompt, or None on a miss"""
+        return self.get_key(self.make_key(prompt))
+
+    def set(self, prompt: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store a response for a prompt"""
+        self.set_key(self.make_key(prompt), value, ttl)
+
+    def get_key(self, key: str) -> Optional[str]:
+        """Return the cached value for a precomputed key, or None on a miss"""
+        entry = self.backend.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at is None or expires_at > time.time():
+                self.stats["hits"] += 1
+                return self._decode(value)
+            self.backend.delete(key)
+        self.stats["misses"] += 1
+        return None
+
+    def set_key(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store a value under a precomputed key"""
+        ttl = self.ttl if ttl is None else ttl
+        self.backend.set(key, self._encode(value), time.time() + ttl if ttl else None)
+
+    def _encode(self, value):
+        """Compress long text values when compression is enabled"""
+        if not self.compress or not isinstance(value, str) or len(value) < _COMPRESS_MIN_BYTES:
+            return value
+        compressor = zlib.compressobj(_COMPRESSION_LEVEL, zdict=_ZDICT_V1)
+        return _ZLIB_V1 + compressor.compress(value.encode('utf-8')) + compressor.flush()
+
+    @staticmethod
+    def _decode(value):
+        """Inverse of _encode; values stored uncompressed pass through"""
+        if isinstance(value, bytes) and value[:1] == _ZLIB_V1:
+            return zlib.decompressobj(zdict=_ZDICT_V1).decompress(value[1:]).decode('utf-8')
+        return value
+
+    def clear(self) -> None:
+        """Drop every cached response"""
+        self.backend.clear()
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution
+
+    The first caller for a key runs the work; callers arriving while it is in
+    flight wait for and share its result (or exception) instead of repeating it.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._tasks: Dict[Tuple[int, str], asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the identical call already in flight"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of do; calls are coalesced per event loop"""
+        task_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = self._tasks[task_key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: self._tasks.pop(task_key, None))
+        # Shielded so one cancelled caller does not cancel the call for the others
+        return await asyncio.shield(task)
+
+
+# Shared by every cached agent call in the process
+single_flight = SingleFlight()
+
+
+def build_response_cache(prompt_version: str = "v1") -> ResponseCache:
+    """
+    Build a response cache on the backend selected by CACHE_BACKEND
+
+    Args:
+        prompt_version: Version tag for persistent entries (bump when prompts change)
+
+    Returns:
+        ResponseCache using SQLite when configured and available, otherwise in-memory
+    """
+    backend = None
+    if config.CACHE_BACKEND == "sqlite":
+        try:
+            backend = SQLiteBackend(config.CACHE_DB_PATH, prompt_version, maxsize=config.CACHE_DB_MAX_ENTRIES)
+        except Exception as e:
+            logger.warning(f"Persistent cache unavailable, using in-memory cache: {str(e)}")
+    return ResponseCache(
+        maxsize=config.CACHE_MAX_ENTRIES,
+        ttl=config.CACHE_TTL_SECONDS,
+        backend=backend,
+        compress=config.CACHE_COMPRESSION
+    )
+
+
+def cached_llm_call(func: Callable) -> Callable:
+    """
+    Cache an agent method's result keyed on method name, model and input data
+
+    The decorated method's owner must expose `_cache` (a ResponseCache) and `agent`,
+    and may expose `_cacheable(method)`; methods it rejects (e.g. commands with side
+    effects) always run. Callers can pass bypass_cache=True to force a fresh call;
+    the flag is also forwarded to the method so it can skip any caching of its own.
+    Concurrent misses for the same key share one call. Coroutine methods are
+    supported; an async twin named a<method> shares entries with <method>.
+    """
+    def skip_cache(self, method: str, kwargs: Dict) -> bool:
+        cacheable = getattr(self, '_cacheable', None)
+        return (
+            bool(kwargs.get('bypass_cache'))
+            or not config.ENABLE_CACHING
+            or (cacheable is not None and not cacheable(method))
+        )
+
+    if inspect.iscoroutinefunction(func):
+        method = func.__name__[1:] if func.__name__.startswith('a') else func.__name__
+
+        @functools.wraps(func)
+        async def async_wrapper(self, data: Dict, *args, **kwargs):
+            if skip_cache(self, method, kwargs):
+                return await func(self, data, *args, **kwargs)
+
+            key = ResponseCache.make_call_key(method, self.agent.model.id, data)
+            cached = self._cache.get_key(key)
+            agent_metrics.incr(method, 'exact_miss' if cached is None else 'exact_hit')
+            if cached is not None:
+                return cached
+
+            async def call():
+                result = await func(self, data, *args, **kwargs)
+                if result:
+                    self._cache.set_key(key, result)
+                return result
+
+            return await single_flight.ado(key, call)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, data: Dict, *args, **kwargs):
+        if skip_cache(self, func.__name__, kwargs):
+            return func(self, data, *args, **kwargs)
+
+        key = ResponseCache.make_call_key(func.__name__, self.agent.model.id, data)
+        cached = self._cache.get_key(key)
+        agent_metrics.incr(func.__name__, 'exact_miss' if cached is None else 'exact_hit')
+        if cached is not None:
+            return cached
+
+        def call():
+            result = func(self, data, *args, **kwargs)
+            if result:
+                self._cache.set_key(key, result)
+            return result
+
+        return single_flight.do(key, call)
+
+    return wrapper
@@ -0,0 +1,144 @@
+"""
+Gemini context caching for legal agents
+Registers a static system instruction once per model so calls reference it instead of resending it
+"""
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from agno.agent import Agent
+from agno.session import AgentSession
+from google.genai import types
+
+from agents._gemini_pool import build_gemini, get_gemini_client
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Extend a cache this many seconds before it would expire
+_REFRESH_MARGIN_SECONDS = 300
+
+# After a failed create (e.g. instruction below the model's minimum cache size), wait before retrying
+_RETRY_AFTER_SECONDS = 600
+
+
+class ContextCache:
+    """Lazily created, auto-extended Gemini cached content holding one system instruction"""
+
+    def __init__(self, system_instruction: str, ttl_seconds: int = 3600, display_name: str = "legal-instructions"):
+        """
+        Initialize context cache
+
+        Args:
+            system_instruction: Static instruction text to cache
+            ttl_seconds: Lifetime of the cached content on Gemini's side
+            display_name: Label shown for the cache in the Gemini API
+        """
+        self.system_instruction = system_instruction
+        self.ttl_seconds = ttl_seconds
+        self.display_name = display_name
+        # model id -> (cache name, local expiry time)
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._failed_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def handle(self, model_id: str) -> Optional[str]:
+        """
+        Return the cached content name for a model, creating or extending it as needed
+
+        Args:
+            model_id: Gemini model the cache is bound to
+
+        Returns:
+            Cache name (cachedContents/...), or None if context caching is unavailable
+        """
+        now = time.monotonic()
+        entry = self._entries.get(model_id)
+        if entry and now < entry[1] - _REFRESH_MARGIN_SECONDS:
+            return entry[0]
+
+        with self._lock:
+            entry = self._entries.get(model_id)
+            if entry and now < entry[1] - _REFRESH_MARGIN_SECONDS:
+                return entry[0]
+            if now < self._failed_until.get(model_id, 0):
+                return None
+
+            ttl = f"{self.ttl_seconds}s"
+            try:
+                client = get_gemini_client()
+                if entry and now < entry[1]:
+                    client.caches.update(name=entry[0], config=types.UpdateCachedContentConfig(ttl=ttl))
+                    name = entry[0]
+                else:
+                    cached = client.caches.create(
+                        model=model_id,
+                        config=types.CreateCachedContentConfig(
+                            system_instruction=self.system_instruction,
+                            display_name=self.display_name,
+                            ttl=ttl
+                        )
+                    )
+                    name = cached.name
+                    logger.info(f"Created Gemini context cache {name} for {model_id}")
+            except Exception as e:
+                logger.warning(f"Context cache unavailable for {model_id}, sending instructions inline: {str(e)}")
+                self._entries.pop(model_id, None)
+                self._failed_until[model_id] = now + _RETRY_AFTER_SECONDS
+                return None
+
+            self._entries[model_id] = (name, now + self.ttl_seconds)
+            return name
+
+
+class InstructionCache:
+    """
+    Routes an agent's calls through a twin whose system prompt lives in a Gemini context cache
+
+    Agno sends any system message as system_instruction, which Gemini rejects alongside
+    cached_content, so the twin carries no instructions and the cached text is exactly
+    the system message the original agent would have sent. Agents resolved through one
+    InstructionCache must share the same instructions (they may use different models).
+    """
+
+    def __init__(self, display_name: str, ttl_seconds: int = 3600):
+        """
+        Initialize instruction cache
+
+        Args:
+            display_name: Label shown for the cache in the Gemini API
+            ttl_seconds: Lifetime of the cached content on Gemini's side
+        """
+        self.display_name = display_name
+        self.ttl_seconds = ttl_seconds
+        self._context_cache: Optional[ContextCache] = None
+        # model id -> agent reading its instructions from the context cache
+        self._twins: Dict[str, Agent] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, agent: Agent) -> Agent:
+        """Return the context-cached twin of an agent, or the agent itself if caching is unavailable"""
+        if not config.ENABLE_CONTEXT_CACHING:
+            return agent
+
+        if self._context_cache is None:
+            with self._lock:
+                if self._context_cache is None:
+                    system_message = agent.get_system_message(session=AgentSession(session_id=self.display_name))
+                    if system_message is None:
+                        return agent
+                    self._context_cache = ContextCache(system_message.content, self.ttl_seconds, self.display_name)
+
+        model_id = agent.model.id
+        cache_name = self._context_cache.handle(model_id)
+        if cache_name is None:
+            return agent
+
+        twin = self._twins.get(model_id)
+        if twin is None or twin.model.cached_content != cache_name:
+            model = build_gemini(model_id)
+            model.cached_content = cache_name
+            twin = Agent(name=agent.name, model=model, markdown=False)
+            self._twins[model_id] = twin
+        return twin
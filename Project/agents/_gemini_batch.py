@@ -0,0 +1,117 @@
+"""
+Gemini Batch API support for legal agents
+Submits offline jobs (half the online price, outside online rate limits) and collects their results
+"""
+import io
+import json
+import logging
+import time
+from typing import List, Optional
+
+from google.genai import types
+
+from agents._gemini_pool import get_gemini_client
+from agents._llm import LLMCallError
+from config import config
+
+logger = logging.getLogger(__name__)
+
+_DONE_STATES = {
+    types.JobState.JOB_STATE_SUCCEEDED,
+    types.JobState.JOB_STATE_PARTIALLY_SUCCEEDED,
+    types.JobState.JOB_STATE_FAILED,
+    types.JobState.JOB_STATE_CANCELLED,
+    types.JobState.JOB_STATE_EXPIRED,
+}
+
+
+def submit_batch(prompts: List[str], system_instruction: Optional[str] = None,
+                 model_id: Optional[str] = None, display_name: str = "legal-batch") -> str:
+    """
+    Submit prompts as one Gemini batch job
+
+    Args:
+        prompts: User prompts, one request each
+        system_instruction: System instruction sent with every request
+        model_id: Gemini model (defaults to AI_MODEL)
+        display_name: Label for the job and its input file
+
+    Returns:
+        Batch job name (batches/...), to pass to batch_results or wait_for_batch
+    """
+    lines = []
+    for index, prompt in enumerate(prompts):
+        request = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        if system_instruction:
+            request["system_instruction"] = {"parts": [{"text": system_instruction}]}
+        lines.append(json.dumps({"key": str(index), "request": request}))
+
+    client = get_gemini_client()
+    source = client.files.upload(
+        file=io.BytesIO("\n".join(lines).encode("utf-8")),
+        config=types.UploadFileConfig(display_name=f"{display_name}-input", mime_type="jsonl")
+    )
+    job = client.batches.create(
+        model=model_id or config.AI_MODEL,
+        src=source.name,
+        config=types.CreateBatchJobConfig(display_name=display_name)
+    )
+    logger.info(f"Submitted Gemini batch {job.name} with {len(prompts)} requests")
+    return job.name
+
+
+def batch_results(job_name: str) -> Optional[List[Optional[str]]]:
+    """
+    Collect a batch job's responses if it has finished
+
+    Args:
+        job_name: Name returned by submit_batch
+
+    Returns:
+        Response texts in submission order (None for requests that failed),
+        or None while the job is still running
+    """
+    client = get_gemini_client()
+    job = client.batches.get(name=job_name)
+    if job.state not in _DONE_STATES:
+        return None
+    if job.state not in (types.JobState.JOB_STATE_SUCCEEDED, types.JobState.JOB_STATE_PARTIALLY_SUCCEEDED):
+        raise LLMCallError(f"Gemini batch {job_name} ended in {job.state.name}: {job.error}")
+
+    results = {}
+    output = client.files.download(file=job.dest.file_name).decode("utf-8")
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        try:
+            parts = record["response"]["candidates"][0]["content"]["parts"]
+            results[int(record["key"])] = "".join(part.get("text", "") for part in parts)
+        except (KeyError, IndexError):
+            logger.warning(f"Batch {job_name} request {record.get('key')} failed: {record.get('error')}")
+            results[int(record["key"])] = None
+    return [results.get(index) for index in range(max(results, default=-1) + 1)]
+
+
+def wait_for_batch(job_name: str, poll_seconds: Optional[float] = None,
+                   timeout: Optional[float] = None) -> List[Optional[str]]:
+    """
+    Block until a batch job finishes and return its responses
+
+    Args:
+        job_name: Name returned by submit_batch
+        poll_seconds: Seconds between status checks (defaults to GEMINI_BATCH_POLL_SECONDS)
+        timeout: Give up after this many seconds (None waits until the job ends)
+
+    Returns:
+        Response texts in submission order (None for requests that failed)
+    """
+    poll_seconds = poll_seconds or config.GEMINI_BATCH_POLL_SECONDS
+    deadline = time.monotonic() + timeout if timeout else None
+    while True:
+        results = batch_results(job_name)
+        if results is not None:
+            return results
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError(f"Gemini batch {job_name} still running after {timeout}s")
+        time.sleep(poll_seconds)
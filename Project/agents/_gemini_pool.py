@@ -0,0 +1,103 @@
+"""
+Shared Gemini client for legal agents
+One genai.Client (and so one pooled, keep-alive HTTP/2 connection set) per process
+"""
+import atexit
+import logging
+import threading
+from typing import Optional
+
+import httpx
+from agno.models.google import Gemini
+from google import genai
+from google.genai import types
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[genai.Client] = None
+_client_lock = threading.Lock()
+
+
+def _http_client_args() -> dict:
+    """httpx settings shared by the sync and async transports"""
+    return {
+        'http2': config.GEMINI_HTTP2,
+        'limits': httpx.Limits(
+            max_connections=config.GEMINI_MAX_CONNECTIONS,
+            max_keepalive_connections=config.GEMINI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.GEMINI_KEEPALIVE_EXPIRY_SECONDS
+        ),
+    }
+
+
+def get_gemini_client() -> genai.Client:
+    """Return the process-wide Gemini client, creating it on first call"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = genai.Client(
+                    api_key=config.GEMINI_API_KEY,
+                    http_options=types.HttpOptions(
+                        timeout=int(config.GEMINI_TIMEOUT_SECONDS * 1000),
+                        client_args=_http_client_args(),
+                        async_client_args=_http_client_args()
+                    )
+                )
+                atexit.register(close_gemini_client)
+                logger.info("Shared Gemini client initialized")
+    return _client
+
+
+def close_gemini_client() -> None:
+    """Close the shared client's pooled connections; the next get_gemini_client() opens a new one"""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning(f"Closing Gemini client failed: {str(e)}")
+
+
+def build_gemini(model_id: Optional[str] = None) -> Gemini:
+    """
+    Build a Gemini model backed by the shared client
+
+    Args:
+        model_id: Gemini model name (defaults to AI_MODEL)
+
+    Returns:
+        Agno Gemini model
+    """
+    model_id = model_id or config.AI_MODEL
+    if not config.GEMINI_API_KEY:
+        # genai.Client rejects an empty key; let Agno report it on first use instead
+        logger.warning("GEMINI_API_KEY not set; Gemini calls will fail")
+        return Gemini(id=model_id, api_key=config.GEMINI_API_KEY, timeout=config.GEMINI_TIMEOUT_SECONDS)
+    return Gemini(id=model_id, client=get_gemini_client())
+
+
+def warm_up(model_id: Optional[str] = None) -> bool:
+    """
+    Open the shared client's connection to Gemini ahead of the first real request
+
+    Fetches the model's metadata, which costs no tokens but completes DNS, TLS and HTTP/2 setup.
+
+    Args:
+        model_id: Gemini model name (defaults to AI_MODEL)
+
+    Returns:
+        True if the request succeeded
+    """
+    model_id = model_id or config.AI_MODEL
+    try:
+        get_gemini_client().models.get(model=model_id)
+    except Exception as e:
+        logger.warning(f"Gemini warm-up failed for {model_id}: {str(e)}")
+        return False
+    logger.info(f"Gemini connection warmed up for {model_id}")
+    return True
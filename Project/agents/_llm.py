@@ -0,0 +1,278 @@
+"""
+Resilient Gemini invocation for legal agents
+Timeouts, retry with exponential backoff on transient errors, and a shared circuit breaker
+"""
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+import httpx
+from agno.exceptions import ModelProviderError
+from google.genai import errors as genai_errors
+
+from agents._metrics import agent_metrics, current_method
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses of provider errors that are worth retrying
+_TRANSIENT_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Leading status of a google-genai APIError message, e.g. "503 UNAVAILABLE. {...}"
+_API_ERROR_RE = re.compile(r"^(\d{3}) \w+\. ")
+
+
+class LLMCallError(Exception):
+    """Gemini call failed"""
+
+    def __init__(self, message: str = "", status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @classmethod
+    def from_run(cls, message: str) -> "LLMCallError":
+        """
+        Error for an errored agno run, which reports the provider failure as text only
+
+        The status code is recovered from the two forms agno passes through: the API's
+        JSON error body, or the google-genai APIError message.
+        """
+        return cls(message, _status_code(message))
+
+
+def _status_code(message: str) -> Optional[int]:
+    """HTTP status of a provider error message, or None if it is not in a known form"""
+    match = _API_ERROR_RE.match(message)
+    if match:
+        return int(match.group(1))
+    try:
+        body = json.loads(message)
+    except ValueError:
+        return None
+    if isinstance(body, list) and len(body) == 1:
+        body = body[0]
+    error = body.get('error') if isinstance(body, dict) else None
+    code = error.get('code') if isinstance(error, dict) else None
+    return code if isinstance(code, int) else None
+
+
+class CircuitOpenError(LLMCallError):
+    """Gemini calls are short-circuited after repeated failures"""
+
+
+class CircuitBreaker:
+    """
+    Fails fast once consecutive transient failures reach a threshold
+
+    After reset_timeout seconds the breaker lets a trial call through; a success
+    closes it again, a failure re-opens it for another reset_timeout.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError while the breaker is open"""
+        if self.is_open:
+            raise CircuitOpenError("Gemini circuit breaker is open; skipping call")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Gemini circuit breaker opened after {self._failures} failures")
+                self._opened_at = time.monotonic()
+
+
+# Shared by every agent in the process
+gemini_breaker = CircuitBreaker(config.CIRCUIT_BREAKER_FAILURE_THRESHOLD, config.CIRCUIT_BREAKER_RESET_SECONDS)
+
+
+# Running prompt/cached/output token totals across every agent run in the process
+_token_usage = {"prompt_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+_token_usage_lock = threading.Lock()
+
+
+def record_usage(run) -> None:
+    """
+    Log and accumulate a run's token usage, including prompt tokens served from Gemini's cache
+
+    Args:
+        run: Agno RunOutput or RunCompleted event (anything carrying RunMetrics)
+    """
+    metrics = getattr(run, 'metrics', None)
+    if metrics is None:
+        return
+    prompt_tokens = metrics.input_tokens or 0
+    cached_tokens = metrics.cache_read_tokens or 0
+    with _token_usage_lock:
+        _token_usage["prompt_tokens"] += prompt_tokens
+        _token_usage["cached_tokens"] += cached_tokens
+        _token_usage["output_tokens"] += metrics.output_tokens or 0
+    method = current_method.get()
+    if method:
+        agent_metrics.incr(method, 'prompt_tokens', prompt_tokens)
+        agent_metrics.incr(method, 'cached_tokens', cached_tokens)
+    if prompt_tokens:
+        logger.info(f"{getattr(run, 'agent_name', None) or 'Agent'}: cached={cached_tokens}/{prompt_tokens} prompt tokens")
+
+
+def token_usage() -> Dict[str, float]:
+    """Snapshot of token totals and the share of prompt tokens served from cache"""
+    with _token_usage_lock:
+        usage = dict(_token_usage)
+    usage["cached_ratio"] = usage["cached_tokens"] / usage["prompt_tokens"] if usage["prompt_tokens"] else 0.0
+    return usage
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Whether an error is worth retrying (timeouts, network errors, 429 and 5xx)
+
+    Classified on exception types and provider status codes, never on message text,
+    so e.g. a 400 quoting "500 tokens" is not retried.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    if isinstance(exc, genai_errors.APIError):
+        return exc.code in _TRANSIENT_STATUS_CODES
+    if isinstance(exc, ModelProviderError) and exc.__cause__ is None:
+        return exc.status_code in _TRANSIENT_STATUS_CODES
+    if isinstance(exc, LLMCallError):
+        return exc.status_code in _TRANSIENT_STATUS_CODES
+    return exc.__cause__ is not None and is_transient(exc.__cause__)
+
+
+# Set by callers that retry (and rate-limit) at their own layer, e.g. BatchProcessor
+_retry_override: ContextVar[Optional[int]] = ContextVar("retry_override", default=None)
+
+
+@contextmanager
+def caller_retries():
+    """Make invoke/ainvoke attempt each call once in this context, leaving retries to the caller"""
+    token = _retry_override.set(0)
+    try:
+        yield
+    finally:
+        _retry_override.reset(token)
+
+
+def _default_retries() -> int:
+    """GEMINI_MAX_RETRIES, unless the caller handles retries itself"""
+    override = _retry_override.get()
+    return config.GEMINI_MAX_RETRIES if override is None else override
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for the given retry attempt (0-based)"""
+    return 2 ** attempt * 0.5 + random.random() * 0.25
+
+
+def extract_content(response) -> str:
+    """
+    Return the text of an agent run
+
+    Agno reports provider failures as an errored run instead of raising,
+    so those are turned into LLMCallError here.
+    """
+    try:
+        content = response.content
+    except AttributeError:
+        return str(response)
+    record_usage(response)
+    if getattr(response, 'status', None) == 'ERROR':
+        raise LLMCallError.from_run(content or "Gemini run failed")
+    return content
+
+
+def invoke(agent, prompt: str, retries: int = None, breaker: CircuitBreaker = gemini_breaker) -> str:
+    """
+    Run a prompt through an agent with retry and circuit breaking
+
+    The per-request timeout is enforced by the Gemini client (see the model's timeout).
+
+    Args:
+        agent: Agno agent
+        prompt: Prompt text
+        retries: Retries after the first attempt (defaults to GEMINI_MAX_RETRIES)
+        breaker: Circuit breaker guarding the call
+
+    Returns:
+        Response text
+    """
+    retries = _default_retries() if retries is None else retries
+    for attempt in range(retries + 1):
+        breaker.before_call()
+        try:
+            content = extract_content(agent.run(prompt))
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            breaker.record_failure()
+            if attempt == retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"Transient Gemini error ({type(e).__name__}: {str(e)[:100]}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return content
+
+
+async def ainvoke(agent, prompt: str, timeout: float = None, retries: int = None,
+                  breaker: CircuitBreaker = gemini_breaker) -> str:
+    """
+    Async variant of invoke that also bounds each attempt with asyncio.wait_for
+
+    Args:
+        agent: Agno agent
+        prompt: Prompt text
+        timeout: Seconds allowed per attempt (defaults to GEMINI_TIMEOUT_SECONDS)
+        retries: Retries after the first attempt (defaults to GEMINI_MAX_RETRIES)
+        breaker: Circuit breaker guarding the call
+
+    Returns:
+        Response text
+    """
+    timeout = config.GEMINI_TIMEOUT_SECONDS if timeout is None else timeout
+    retries = _default_retries() if retries is None else retries
+    for attempt in range(retries + 1):
+        breaker.before_call()
+        try:
+            content = extract_content(await asyncio.wait_for(agent.arun(prompt), timeout))
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            breaker.record_failure()
+            if attempt == retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"Transient Gemini error ({type(e).__name__}: {str(e)[:100]}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return content
@@ -0,0 +1,85 @@
+"""
+Call metrics for legal agents
+Per-method cache hit/miss counters and latency histograms for tuning the caching layers
+"""
+import bisect
+import threading
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# Upper bounds (seconds) of the latency histogram buckets; slower calls land in "+Inf"
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Agent method currently running in this context, so token usage can be attributed to it
+current_method: ContextVar[Optional[str]] = ContextVar("current_method", default=None)
+
+
+class CallMetrics:
+    """
+    Thread-safe per-method event counters and latency histograms
+
+    Events used by the agents: exact_hit, exact_miss, sem_hit, sem_miss,
+    api_call, prompt_tokens and cached_tokens.
+    """
+
+    def __init__(self):
+        self._events: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._latency: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, method: str, event: str, amount: int = 1) -> None:
+        """Add to a method's event counter"""
+        with self._lock:
+            self._events[method][event] += amount
+
+    def observe(self, method: str, seconds: float) -> None:
+        """Record one call's latency"""
+        with self._lock:
+            latency = self._latency.get(method)
+            if latency is None:
+                latency = self._latency[method] = {"count": 0, "sum": 0.0, "max": 0.0,
+                                                   "buckets": [0] * (len(LATENCY_BUCKETS) + 1)}
+            latency["count"] += 1
+            latency["sum"] += seconds
+            latency["max"] = max(latency["max"], seconds)
+            latency["buckets"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Current metrics by method
+
+        Returns:
+            {method: {"events": {...}, "latency": {count, avg, max, buckets}, "exact_hit_rate", "sem_hit_rate"}}
+        """
+        with self._lock:
+            methods = set(self._events) | set(self._latency)
+            result = {}
+            for method in sorted(methods):
+                events = dict(self._events.get(method, {}))
+                entry = {"events": events}
+                latency = self._latency.get(method)
+                if latency is not None:
+                    labels = [str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+                    entry["latency"] = {
+                        "count": latency["count"],
+                        "avg": latency["sum"] / latency["count"],
+                        "max": latency["max"],
+                        "buckets": dict(zip(labels, latency["buckets"])),
+                    }
+                for kind in ("exact", "sem"):
+                    lookups = events.get(f"{kind}_hit", 0) + events.get(f"{kind}_miss", 0)
+                    if lookups:
+                        entry[f"{kind}_hit_rate"] = events.get(f"{kind}_hit", 0) / lookups
+                result[method] = entry
+            return result
+
+    def reset(self) -> None:
+        """Drop all recorded metrics"""
+        with self._lock:
+            self._events.clear()
+            self._latency.clear()
+
+
+# Shared by every agent in the process
+agent_metrics = CallMetrics()
@@ -0,0 +1,226 @@
+"""
+Prompt building helpers for legal agents
+Precompiled prompt templates with per-field fallbacks for missing input,
+plus parsing of sectioned (multi-task) responses
+"""
+import logging
+import re
+import string
+from typing import Dict, List, Optional, Tuple
+
+from agents._cache import ResponseCache
+from agents._gemini_pool import get_gemini_client
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Delimiters for fused multi-task prompts: <<<SEC k>>> ... <<<END k>>>
+SECTION_RE = re.compile(r"<<<SEC (\d+)>>>(.*?)<<<END \1>>>", re.DOTALL)
+
+# Rough characters per token for English legal text sent to Gemini
+CHARS_PER_TOKEN = 4
+
+# Texts estimated below this share of a budget are assumed to fit without an exact count
+_BUDGET_SAFETY_RATIO = 0.8
+
+# Exact token counts keyed by a digest of model + text
+_token_counts = ResponseCache(maxsize=1024)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the Gemini token count of a text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def count_tokens(text: str, model_id: Optional[str] = None) -> int:
+    """
+    Exact Gemini token count of a text, memoized per model and content
+
+    Falls back to estimate_tokens when the count_tokens API is unavailable.
+    """
+    model_id = model_id or config.AI_MODEL
+    key = f"{model_id}\n{text}"
+    cached = _token_counts.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        total = get_gemini_client().models.count_tokens(model=model_id, contents=text).total_tokens
+    except Exception as e:
+        logger.debug(f"Token count failed, using estimate: {str(e)}")
+        return estimate_tokens(text)
+    _token_counts.set(key, total)
+    return total
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens, marking the cut"""
+    if estimate_tokens(text) <= max_tokens * _BUDGET_SAFETY_RATIO:
+        return text
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    limit = len(text) * max_tokens // tokens
+    return text[:limit].rstrip() + "\n\n[... truncated to fit the prompt token budget]\n"
+
+
+class PromptFields(dict):
+    """Input mapping that supplies a fallback for any field the caller left out"""
+
+    def __init__(self, data: dict, defaults: Dict[str, str], fallback: str):
+        super().__init__(data)
+        self._defaults = defaults
+        self._fallback = fallback
+
+    def __missing__(self, key: str) -> str:
+        return self._defaults.get(key, self._fallback)
+
+
+class PromptTemplate:
+    """
+    Prompt text with {field} placeholders, split into literals and field names once
+
+    Rendering joins the precomputed literals with each field's value instead of
+    re-parsing the template. Templates using format specs, conversions or
+    attribute/index access fall back to str.format_map.
+    """
+
+    def __init__(self, text: str, defaults: Optional[Dict[str, str]] = None,
+                 fallback: str = 'Not provided'):
+        """
+        Initialize prompt template
+
+        Args:
+            text: Template text using {field} placeholders
+            defaults: Fallback values for specific fields when missing from the input
+            fallback: Fallback for any other missing field
+        """
+        self.text = text
+        self.defaults = defaults or {}
+        self.fallback = fallback
+        self._parts = self._compile(text)
+
+    @staticmethod
+    def _compile(text: str) -> Optional[List[Tuple[str, Optional[str]]]]:
+        """Split a template into (literal, field name or None) pairs, or None if it needs format_map"""
+        parts = []
+        for literal, name, spec, conversion in string.Formatter().parse(text):
+            if name is not None and (spec or conversion or not name.isidentifier()):
+                return None
+            parts.append((literal, name))
+        return parts
+
+    def value(self, data: dict, name: str):
+        """A field's input value, or its fallback when missing (for fields precomputed before render)"""
+        return data[name] if name in data else self.defaults.get(name, self.fallback)
+
+    def render(self, data: dict, **extra) -> str:
+        """
+        Render the template
+
+        Args:
+            data: Input fields (e.g. case_data)
+            **extra: Precomputed fields such as formatted lists or truncated text
+
+        Returns:
+            Rendered prompt
+        """
+        if self._parts is None:
+            fields = PromptFields(data, self.defaults, self.fallback)
+            fields.update(extra)
+            return self.text.format_map(fields)
+
+        out = []
+        for literal, name in self._parts:
+            out.append(literal)
+            if name is not None:
+                if name in extra:
+                    value = extra[name]
+                elif name in data:
+                    value = data[name]
+                else:
+                    value = self.defaults.get(name, self.fallback)
+                out.append(str(value))
+        return "".join(out)
+
+
+class SectionSplitter:
+    """Incrementally extracts delimited sections from a streamed response"""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> List[Tuple[int, str]]:
+        """
+        Add a streamed chunk
+
+        Args:
+            chunk: Next piece of response text
+
+        Returns:
+            (section number, body) for every section completed by this chunk
+        """
+        self._buffer += chunk
+        completed = []
+        while True:
+            match = SECTION_RE.search(self._buffer)
+            if not match:
+                break
+            completed.append((int(match.group(1)), match.group(2).strip()))
+            self._buffer = self._buffer[match.end():]
+        return completed
+
+
+class HeadingSplitter:
+    """Incrementally splits a streamed markdown response into sections at headings of one level"""
+
+    def __init__(self, marker: str = "### "):
+        """
+        Initialize heading splitter
+
+        Args:
+            marker: Heading prefix that starts a section (e.g. '### ')
+        """
+        self.marker = marker
+        self._heading: Optional[str] = None
+        # Leading newline lets a heading on the very first line match like any other
+        self._buffer = "\n"
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """
+        Add a streamed chunk
+
+        Args:
+            chunk: Next piece of response text
+
+        Returns:
+            (heading, body) for every section completed by this chunk; a section
+            completes once the next heading line has fully arrived
+        """
+        self._buffer += chunk
+        completed = []
+        while True:
+            start = self._buffer.find("\n" + self.marker)
+            if start == -1:
+                break
+            end = self._buffer.find("\n", start + 1)
+            if end == -1:
+                break
+            self._flush(self._buffer[:start], completed)
+            self._heading = self._buffer[start + 1 + len(self.marker):end].strip()
+            self._buffer = self._buffer[end:]
+        return completed
+
+    def close(self) -> List[Tuple[str, str]]:
+        """Flush the final section once the stream has ended"""
+        completed = []
+        self._flush(self._buffer, completed)
+        self._heading = None
+        self._buffer = "\n"
+        return completed
+
+    def _flush(self, body: str, completed: List[Tuple[str, str]]) -> None:
+        """Emit the current section; text before the first heading is emitted under '' if not blank"""
+        body = body.strip()
+        if self._heading is not None or body:
+            completed.append((self._heading or "", body))
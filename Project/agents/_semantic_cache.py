@@ -0,0 +1,226 @@
+"""
+Semantic response cache for legal agents
+Serves near-duplicate prompts from cache using cosine similarity of Gemini embeddings
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from google.genai import types
+
+from agents._gemini_pool import get_gemini_client
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Cleared while a caller that already consulted its own semantic cache runs an agent
+_agent_lookups: ContextVar[bool] = ContextVar("agent_semantic_lookups", default=True)
+
+
+def semantic_lookups_enabled() -> bool:
+    """Whether agents should consult their semantic caches in the current context"""
+    return config.ENABLE_SEMANTIC_CACHE and _agent_lookups.get()
+
+
+@contextmanager
+def skip_agent_semantic_cache():
+    """Run agent calls without their own semantic lookups, so a miss is embedded only once"""
+    token = _agent_lookups.set(False)
+    try:
+        yield
+    finally:
+        _agent_lookups.reset(token)
+
+
+# How long a lookup waits for a warm-load still in progress before skipping the semantic cache
+_READY_WAIT_SECONDS = 0.1
+
+
+class SemanticCache:
+    """
+    Per-bucket store of (normalized prompt embedding, response) pairs
+
+    Buckets (typically the method name plus the matter it is about) keep different
+    kinds of analysis, and different clients, from matching each other. Lookup is a
+    brute-force inner product, which is cheap at the entry counts an in-process
+    cache holds.
+    """
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 512, path: Optional[str] = None,
+                 ttl: Optional[float] = None, prompt_version: str = "", dimensions: Optional[int] = None):
+        """
+        Initialize semantic cache
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Entries kept per bucket before the oldest are dropped
+            path: .npz file the cache is loaded from and saved to (None keeps it in memory only)
+            ttl: Seconds an entry can be served for (None keeps entries until evicted)
+            prompt_version: Version tag saved with the file; a saved cache with another tag is not loaded
+            dimensions: Embedding size (defaults to EMBEDDING_DIMENSIONS); saved buckets of another size are dropped
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = str(Path(path).expanduser()) if path else None
+        self.ttl = ttl
+        self.prompt_version = prompt_version
+        self.dimensions = dimensions or config.EMBEDDING_DIMENSIONS
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._responses: Dict[str, List[str]] = {}
+        self._added: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._ready.set()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def warm_load(self) -> None:
+        """Load the saved cache in a background thread; lookups skip the cache until it is ready"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        self._ready.clear()
+        threading.Thread(target=self._load, name="semantic-cache-load", daemon=True).start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until any warm-load has finished; returns False on timeout"""
+        return self._ready.wait(timeout)
+
+    def _load(self) -> None:
+        """Read the saved cache file into memory"""
+        try:
+            with open(self.path, 'rb') as f:
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                with np.load(f, allow_pickle=False) as saved:
+                    version = str(saved["prompt_version"]) if "prompt_version" in saved.files else ""
+                    if version != self.prompt_version:
+                        logger.info(f"Semantic cache at {self.path} is for prompt version {version!r}, starting empty")
+                        return
+                    buckets = [name[len("vectors:"):] for name in saved.files if name.startswith("vectors:")]
+                    loaded = {
+                        b: (saved[f"vectors:{b}"], saved[f"responses:{b}"].tolist(), saved[f"added:{b}"])
+                        for b in buckets
+                    }
+            count = 0
+            with self._lock:
+                for bucket, (vectors, responses, added) in loaded.items():
+                    if vectors.ndim != 2 or vectors.shape[1] != self.dimensions:
+                        logger.warning(
+                            f"Semantic cache bucket {bucket} has {vectors.shape[-1]}-dimensional embeddings, "
+                            f"expected {self.dimensions}; dropping it"
+                        )
+                        continue
+                    live = self._live(added)
+                    if not live.any():
+                        continue
+                    self._vectors[bucket] = vectors[live].astype(np.float32)[-self.max_entries:]
+                    self._responses[bucket] = [r for r, keep in zip(responses, live) if keep][-self.max_entries:]
+                    self._added[bucket] = added[live][-self.max_entries:]
+                    count += len(self._responses[bucket])
+            logger.info(f"Semantic cache loaded {count} entries from {self.path}")
+        except Exception as e:
+            logger.warning(f"Semantic cache load failed, starting empty: {str(e)}")
+        finally:
+            self._ready.set()
+
+    def save(self) -> None:
+        """Write the cache to its file (atomically replacing any previous save)"""
+        if not self.path or not self._ready.is_set():
+            return
+        with self._lock:
+            arrays = {}
+            for bucket, vectors in self._vectors.items():
+                arrays[f"vectors:{bucket}"] = vectors
+                arrays[f"responses:{bucket}"] = np.array(self._responses[bucket], dtype=str)
+                arrays[f"added:{bucket}"] = self._added[bucket]
+        if not arrays:
+            return
+        arrays["prompt_version"] = np.array(self.prompt_version)
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Semantic cache save failed: {str(e)}")
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """Return the unit-length embedding of a text, or None if embedding fails"""
+        try:
+            result = get_gemini_client().models.embed_content(
+                model=config.EMBEDDING_MODEL,
+                contents=text,
+                config=types.EmbedContentConfig(
+                    task_type="SEMANTIC_SIMILARITY",
+                    output_dimensionality=config.EMBEDDING_DIMENSIONS
+                )
+            )
+            vector = np.asarray(result.embeddings[0].values, dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Prompt embedding failed, skipping semantic cache: {str(e)}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def lookup(self, bucket: str, prompt: str) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        """
+        Find a cached response for a semantically equivalent prompt
+
+        Args:
+            bucket: Cache partition (e.g. method name)
+            prompt: Rendered prompt
+
+        Returns:
+            (cached response or None, prompt embedding to pass to add() on a miss)
+        """
+        if not self.wait_ready(_READY_WAIT_SECONDS):
+            return None, None
+
+        vector = self.embed(prompt)
+        if vector is None:
+            return None, None
+
+        with self._lock:
+            matrix = self._vectors.get(bucket)
+            if matrix is not None and len(matrix) and matrix.shape[1] == vector.shape[0]:
+                scores = np.where(self._live(self._added[bucket]), matrix @ vector, -np.inf)
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self.stats["hits"] += 1
+                    logger.debug(f"Semantic cache hit in {bucket} (similarity {scores[best]:.3f})")
+                    return self._responses[bucket][best], vector
+            self.stats["misses"] += 1
+        return None, vector
+
+    def add(self, bucket: str, vector: np.ndarray, response: str) -> None:
+        """Store a response under the embedding returned by lookup()"""
+        with self._lock:
+            matrix = self._vectors.get(bucket)
+            if matrix is None:
+                matrix = np.empty((0, vector.shape[0]), dtype=np.float32)
+                self._responses[bucket] = []
+                self._added[bucket] = np.empty(0, dtype=np.float64)
+            self._vectors[bucket] = np.vstack([matrix, vector])[-self.max_entries:]
+            self._added[bucket] = np.append(self._added[bucket], time.time())[-self.max_entries:]
+            responses = self._responses[bucket]
+            responses.append(response)
+            del responses[:-self.max_entries]
+
+    def clear(self) -> None:
+        """Drop every cached response"""
+        with self._lock:
+            self._vectors.clear()
+            self._responses.clear()
+            self._added.clear()
+
+    def _live(self, added: np.ndarray) -> np.ndarray:
+        """Mask of entries (by time added) that have not outlived the TTL"""
+        if self.ttl is None:
+            return np.ones(len(added), dtype=bool)
+        return added > time.time() - self.ttl
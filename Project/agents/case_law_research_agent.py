@@ -2,32 +2,160 @@
 Case Law Research Agent
 Specializes in researching case law, finding precedents, and analyzing legal decisions
 """
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, Literal, Optional, Tuple
 from agno.agent import Agent
-from agno.models.google import Gemini
 from config import config
+from agents._gemini_pool import build_gemini
+from agents._cache import ResponseCache, build_response_cache, single_flight
+from agents._context_cache import InstructionCache
+from agents._llm import LLMCallError, ainvoke, gemini_breaker, invoke, is_transient, record_usage
+from agents._prompt_utils import SECTION_RE, PromptTemplate, SectionSplitter, truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
+# Fallbacks for prompt fields; anything not listed falls back to 'Not provided'
+_FIELD_DEFAULTS = {
+    'case_name': 'Unknown',
+    'citation': 'N/A',
+    'court': 'Unknown',
+    'decision_date': 'N/A',
+    'legal_issue': 'Not specified',
+    'jurisdiction': 'Not specified',
+    'practice_area': 'Not specified',
+    'current_issue': 'Not specified',
+    'current_jurisdiction': 'Not specified',
+    'full_text': 'Not available',
+}
+
+_PRECEDENT_RESEARCH_TEMPLATE = PromptTemplate("""
+Conduct comprehensive case law research for the following matter:
 
-class CaseLawResearchAgent:
-    """
-    AI Agent specialized in case law research and precedent analysis
-    """
+## Research Parameters
+**Legal Issue**: {legal_issue}
+**Jurisdiction**: {jurisdiction}
+**Practice Area**: {practice_area}
 
-    def __init__(self):
-        """Initialize Case Law Research Agent"""
-        self.agent = Agent(
-            name="Case Law Research Specialist",
-            model=Gemini(id=config.AI_MODEL, api_key=config.GEMINI_API_KEY),
-            instructions=self._get_instructions(),
-            markdown=True
-        )
-        logger.info("Case Law Research Agent initialized")
+**Current Case Facts**: {current_facts}
 
-    def _get_instructions(self) -> str:
-        """Get comprehensive instructions for the agent"""
-        return """
+## Available Precedents ({precedent_count} cases)
+
+{precedents_detailed}
+
+## Task
+Provide comprehensive case law research analysis following your analytical framework.
+Focus on identifying the most relevant and applicable precedents for the legal issue.
+Provide strategic recommendations for how to use these precedents effectively.
+""", _FIELD_DEFAULTS)
+
+_APPLICABILITY_TEMPLATE = PromptTemplate("""
+Analyze the applicability of the following precedent to the current case:
+
+## Precedent Case
+**Case Name**: {case_name}
+**Citation**: {citation}
+**Court**: {court}
+**Decision Date**: {decision_date}
+
+**Facts**: {facts}
+**Legal Issue**: {legal_issue}
+**Holding**: {holding}
+**Reasoning**: {reasoning}
+
+## Current Case
+**Facts**: {current_facts}
+**Legal Issue**: {current_issue}
+**Jurisdiction**: {current_jurisdiction}
+
+## Task
+Provide a detailed analysis including:
+1. **Factual Comparison**: Similarities and differences between cases
+2. **Legal Issue Alignment**: How closely the legal issues match
+3. **Precedential Authority**: Binding vs. persuasive authority level
+4. **Applicability Assessment**: Strong, moderate, or weak applicability
+5. **Distinguishing Factors**: Ways opposing counsel might distinguish this case
+6. **Strategic Use**: How to best use this precedent in arguments
+7. **Risk Assessment**: Potential weaknesses in relying on this precedent
+8. **Recommendation**: Whether to cite prominently, use as support, or avoid
+
+Be specific and provide actionable guidance for litigation strategy.
+""", _FIELD_DEFAULTS)
+
+_COMPARISON_TEMPLATE = PromptTemplate("""
+Compare and analyze the following cases:
+
+{cases_formatted}
+
+## Comparison Criteria
+- Factual patterns
+- Legal issues addressed
+- Holdings and outcomes
+- Judicial reasoning approaches
+- Precedential value
+- Jurisdictional considerations
+
+## Task
+Provide a comprehensive comparison including:
+1. **Common Threads**: Shared facts, issues, or reasoning
+2. **Key Differences**: How cases diverge
+3. **Trend Analysis**: Evolution of law across cases
+4. **Conflicting Holdings**: Any contradictions or tensions
+5. **Strongest Precedents**: Which cases have most authority
+6. **Strategic Implications**: How to use these cases together
+
+Present findings in clear, organized format with tables where appropriate.
+""", _FIELD_DEFAULTS)
+
+_PRINCIPLES_TEMPLATE = PromptTemplate("""
+Extract and articulate the legal principles from the following case:
+
+**Case**: {case_name}
+**Citation**: {citation}
+
+**Holding**: {holding}
+**Reasoning**: {reasoning}
+**Full Opinion**: {full_text}
+
+## Task
+Extract and clearly articulate:
+1. **Black Letter Law**: The specific legal rules established
+2. **Tests/Standards**: Any tests or standards articulated by the court
+3. **Elements**: Required elements for claims or defenses
+4. **Factors**: Factors courts should consider
+5. **Legal Principles**: Broader principles underlying the decision
+6. **Exceptions**: Any exceptions or limitations noted
+7. **Application Guidance**: How to apply these principles to new facts
+
+Present principles in clear, quotable form that can be used in legal arguments.
+""", _FIELD_DEFAULTS)
+
+# Model tier: 'pro' uses AI_MODEL, 'fast' uses AI_MODEL_FAST
+Tier = Literal['fast', 'pro']
+
+# Map step of map-reduce case comparison; expects a case from _prep_cases
+_CASE_SUMMARY_TEMPLATE = PromptTemplate("""
+Summarize this case in at most 120 words for a multi-case comparison: facts, legal issue, holding, key reasoning.
+
+**Case**: {case_name} ({citation}, {court}, {decision_date})
+**Facts**: {facts}
+**Legal Issue**: {legal_issue}
+**Holding**: {holding}
+**Reasoning**: {_reasoning_short}
+""", _FIELD_DEFAULTS)
+
+# (result key, matter key, prompt builder, standalone method) for each fusable task
+_FUSED_TASKS = (
+    ('precedent_research', 'research_data', '_format_precedent_research_prompt', 'research_precedents'),
+    ('case_applicability', 'case_data', '_format_applicability_prompt', 'analyze_case_applicability'),
+    ('case_comparison', 'cases_data', '_format_comparison_prompt', 'compare_cases'),
+    ('legal_principles', 'principle_data', '_format_principles_prompt', 'extract_legal_principles'),
+)
+
+# Static system instructions, built once at import and shared by every instance
+_INSTRUCTIONS = """
 You are an expert Case Law Research Specialist with deep expertise in legal precedents,
 judicial reasoning, and case analysis. Your role is to help lawyers research relevant
 case law, analyze judicial decisions, and identify applicable precedents.
@@ -162,7 +290,40 @@ holdings, and reasoning. Distinguish between binding authority, persuasive autho
 and dicta.
 """
 
-    def research_precedents(self, research_data: dict) -> str:
+
+class CaseLawResearchAgent:
+    """
+    AI Agent specialized in case law research and precedent analysis
+    """
+
+    def __init__(self):
+        """Initialize Case Law Research Agent"""
+        self.agent = Agent(
+            name="Case Law Research Specialist",
+            model=build_gemini(),
+            instructions=_INSTRUCTIONS,
+            markdown=True
+        )
+        # Cheaper, faster tier for extractive tasks
+        self.agent_fast = Agent(
+            name="Case Law Research Specialist (Fast)",
+            model=build_gemini(config.AI_MODEL_FAST),
+            instructions=_INSTRUCTIONS,
+            markdown=True
+        )
+        self._cache = build_response_cache()
+        self._instruction_cache = InstructionCache(
+            "case-law-research-instructions",
+            ttl_seconds=config.CONTEXT_CACHE_TTL_SECONDS
+        )
+        logger.info("Case Law Research Agent initialized")
+
+    @classmethod
+    def _get_instructions(cls) -> str:
+        """Get comprehensive instructions for the agent"""
+        return _INSTRUCTIONS
+
+    def research_precedents(self, research_data: dict, bypass_cache: bool = False, tier: Tier = 'pro') -> str:
         """
         Research relevant case law precedents
 
@@ -173,6 +334,8 @@ and dicta.
                 - practice_area: Area of law
                 - current_facts: Facts of current case
                 - precedents: List of potentially relevant cases
+            bypass_cache: Skip the response cache and always call Gemini
+            tier: Model tier, 'pro' (AI_MODEL) or 'fast' (AI_MODEL_FAST)
 
         Returns:
             Comprehensive precedent research analysis
@@ -181,14 +344,14 @@ and dicta.
         logger.info(f"Researching precedents for: {research_data.get('legal_issue', 'Unknown')[:50]}")
 
         try:
-            response = self.agent.run(prompt)
+            result = self._run_cached(prompt, bypass_cache, tier)
             logger.info("Precedent research completed")
-            return response.content if hasattr(response, 'content') else str(response)
+            return result
         except Exception as e:
             logger.error(f"Precedent research failed: {str(e)}")
             raise
 
-    def analyze_case_applicability(self, case_data: dict) -> str:
+    def analyze_case_applicability(self, case_data: dict, bypass_cache: bool = False, tier: Tier = 'pro') -> str:
         """
         Analyze how a specific case applies to current situation
 
@@ -198,191 +361,500 @@ and dicta.
         Returns:
             Analysis of case applicability
         """
-        prompt = f"""
-Analyze the applicability of the following precedent to the current case:
+        prompt = self._format_applicability_prompt(case_data)
 
-## Precedent Case
-**Case Name**: {case_data.get('case_name', 'Unknown')}
-**Citation**: {case_data.get('citation', 'N/A')}
-**Court**: {case_data.get('court', 'Unknown')}
-**Decision Date**: {case_data.get('decision_date', 'N/A')}
+        try:
+            return self._run_cached(prompt, bypass_cache, tier)
+        except Exception as e:
+            logger.error(f"Case applicability analysis failed: {str(e)}")
+            raise
 
-**Facts**: {case_data.get('facts', 'Not provided')}
-**Legal Issue**: {case_data.get('legal_issue', 'Not specified')}
-**Holding**: {case_data.get('holding', 'Not provided')}
-**Reasoning**: {case_data.get('reasoning', 'Not provided')}
+    def compare_cases(self, cases_data: dict, bypass_cache: bool = False, tier: Tier = 'pro') -> str:
+        """
+        Compare multiple cases to identify patterns and differences
 
-## Current Case
-**Facts**: {case_data.get('current_facts', 'Not provided')}
-**Legal Issue**: {case_data.get('current_issue', 'Not specified')}
-**Jurisdiction**: {case_data.get('current_jurisdiction', 'Not specified')}
+        Large comparisons (CASE_COMPARISON_MAP_REDUCE_MIN cases or more) summarize
+        each case in parallel and then compare the summaries in one call.
 
-## Task
-Provide a detailed analysis including:
-1. **Factual Comparison**: Similarities and differences between cases
-2. **Legal Issue Alignment**: How closely the legal issues match
-3. **Precedential Authority**: Binding vs. persuasive authority level
-4. **Applicability Assessment**: Strong, moderate, or weak applicability
-5. **Distinguishing Factors**: Ways opposing counsel might distinguish this case
-6. **Strategic Use**: How to best use this precedent in arguments
-7. **Risk Assessment**: Potential weaknesses in relying on this precedent
-8. **Recommendation**: Whether to cite prominently, use as support, or avoid
+        Args:
+            cases_data: Dictionary with list of cases to compare
 
-Be specific and provide actionable guidance for litigation strategy.
-"""
+        Returns:
+            Comparative case analysis
+        """
+        cases = cases_data.get('cases', [])
 
         try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
+            if len(cases) < config.CASE_COMPARISON_MAP_REDUCE_MIN:
+                return self._run_cached(self._format_comparison_prompt(cases_data), bypass_cache, tier)
+
+            # Map: summarize each case in parallel; reduce: compare the summaries
+            prepped = self._prep_cases(cases)
+            with ThreadPoolExecutor(max_workers=min(len(prepped), config.GEMINI_MAX_CONCURRENCY)) as pool:
+                summaries = list(pool.map(lambda case: self._summarize_case(case, bypass_cache), prepped))
+            return self._run_cached(self._format_reduce_prompt(cases_data, prepped, summaries), bypass_cache, tier)
         except Exception as e:
-            logger.error(f"Case applicability analysis failed: {str(e)}")
+            logger.error(f"Case comparison failed: {str(e)}")
             raise
 
-    def compare_cases(self, cases_data: dict) -> str:
+    def extract_legal_principles(self, case_data: dict, bypass_cache: bool = False, tier: Tier = 'fast') -> str:
         """
-        Compare multiple cases to identify patterns and differences
+        Extract legal principles and rules from case law
+
+        Runs on the fast tier by default since the task is extractive.
 
         Args:
-            cases_data: Dictionary with list of cases to compare
+            case_data: Case information
 
         Returns:
-            Comparative case analysis
+            Extracted legal principles
         """
-        prompt = f"""
-Compare and analyze the following cases:
+        prompt = self._format_principles_prompt(case_data)
 
-{self._format_multiple_cases(cases_data.get('cases', []))}
+        try:
+            return self._run_cached(prompt, bypass_cache, tier)
+        except Exception as e:
+            logger.error(f"Legal principle extraction failed: {str(e)}")
+            raise
 
-## Comparison Criteria
-- Factual patterns
-- Legal issues addressed
-- Holdings and outcomes
-- Judicial reasoning approaches
-- Precedential value
-- Jurisdictional considerations
+    def research_precedents_stream(self, research_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of research_precedents
 
-## Task
-Provide a comprehensive comparison including:
-1. **Common Threads**: Shared facts, issues, or reasoning
-2. **Key Differences**: How cases diverge
-3. **Trend Analysis**: Evolution of law across cases
-4. **Conflicting Holdings**: Any contradictions or tensions
-5. **Strongest Precedents**: Which cases have most authority
-6. **Strategic Implications**: How to use these cases together
+        Yields response text as Gemini generates it, so callers can render
+        output before the full analysis is complete.
+        """
+        prompt = self._format_precedent_research_prompt(research_data)
+        logger.info(f"Streaming precedent research for: {research_data.get('legal_issue', 'Unknown')[:50]}")
 
-Present findings in clear, organized format with tables where appropriate.
-"""
+        try:
+            yield from self._stream(prompt, bypass_cache)
+            logger.info("Precedent research completed")
+        except Exception as e:
+            logger.error(f"Precedent research failed: {str(e)}")
+            raise
+
+    async def aresearch_precedents(self, research_data: dict, bypass_cache: bool = False, tier: Tier = 'pro') -> str:
+        """
+        Async variant of research_precedents
+
+        Args:
+            research_data: Same fields as research_precedents
+
+        Returns:
+            Comprehensive precedent research analysis
+        """
+        prompt = self._format_precedent_research_prompt(research_data)
+        logger.info(f"Researching precedents for: {research_data.get('legal_issue', 'Unknown')[:50]}")
 
         try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
+            result = await self._arun_cached(prompt, bypass_cache, tier)
+            logger.info("Precedent research completed")
+            return result
+        except Exception as e:
+            logger.error(f"Precedent research failed: {str(e)}")
+            raise
+
+    async def aanalyze_case_applicability(self, case_data: dict, bypass_cache: bool = False, tier: Tier = 'pro') -> str:
+        """Async variant of analyze_case_applicability"""
+        prompt = self._format_applicability_prompt(case_data)
+
+        try:
+            return await self._arun_cached(prompt, bypass_cache, tier)
+        except Exception as e:
+            logger.error(f"Case applicability analysis failed: {str(e)}")
+            raise
+
+    async def acompare_cases(self, cases_data: dict, bypass_cache: bool = False, tier: Tier = 'pro') -> str:
+        """Async variant of compare_cases"""
+        cases = cases_data.get('cases', [])
+
+        try:
+            if len(cases) < config.CASE_COMPARISON_MAP_REDUCE_MIN:
+                return await self._arun_cached(self._format_comparison_prompt(cases_data), bypass_cache, tier)
+
+            prepped = self._prep_cases(cases)
+            summaries = await asyncio.gather(*[self._asummarize_case(case, bypass_cache) for case in prepped])
+            return await self._arun_cached(self._format_reduce_prompt(cases_data, prepped, summaries), bypass_cache, tier)
         except Exception as e:
             logger.error(f"Case comparison failed: {str(e)}")
             raise
 
-    def extract_legal_principles(self, case_data: dict) -> str:
+    def _summarize_case(self, case: dict, bypass_cache: bool = False) -> str:
+        """Condense one (prepped) case for the map step of compare_cases"""
+        return self._run_cached(_CASE_SUMMARY_TEMPLATE.render(case), bypass_cache, tier='fast')
+
+    async def _asummarize_case(self, case: dict, bypass_cache: bool = False) -> str:
+        """Async variant of _summarize_case"""
+        return await self._arun_cached(_CASE_SUMMARY_TEMPLATE.render(case), bypass_cache, tier='fast')
+
+    async def aextract_legal_principles(self, case_data: dict, bypass_cache: bool = False, tier: Tier = 'fast') -> str:
+        """Async variant of extract_legal_principles"""
+        prompt = self._format_principles_prompt(case_data)
+
+        try:
+            return await self._arun_cached(prompt, bypass_cache, tier)
+        except Exception as e:
+            logger.error(f"Legal principle extraction failed: {str(e)}")
+            raise
+
+    async def bulk_research(
+        self,
+        research_data: Optional[dict] = None,
+        case_data: Optional[dict] = None,
+        cases_data: Optional[dict] = None,
+        principle_data: Optional[dict] = None
+    ) -> Dict[str, str]:
         """
-        Extract legal principles and rules from case law
+        Run several research tasks concurrently for one matter
 
         Args:
-            case_data: Case information
+            research_data: Input for research_precedents (skipped if None)
+            case_data: Input for analyze_case_applicability (skipped if None)
+            cases_data: Input for compare_cases (skipped if None)
+            principle_data: Input for extract_legal_principles (skipped if None)
 
         Returns:
-            Extracted legal principles
+            Dictionary mapping each requested task to its analysis
         """
-        prompt = f"""
-Extract and articulate the legal principles from the following case:
+        tasks = {}
+        if research_data is not None:
+            tasks['precedent_research'] = self.aresearch_precedents(research_data)
+        if case_data is not None:
+            tasks['case_applicability'] = self.aanalyze_case_applicability(case_data)
+        if cases_data is not None:
+            tasks['case_comparison'] = self.acompare_cases(cases_data)
+        if principle_data is not None:
+            tasks['legal_principles'] = self.aextract_legal_principles(principle_data)
+
+        results = await asyncio.gather(*tasks.values())
+        return dict(zip(tasks.keys(), results))
+
+    def full_analysis(self, matter: dict, bypass_cache: bool = False) -> Dict[str, str]:
+        """
+        Run every requested research task for a matter in a single Gemini call
 
-**Case**: {case_data.get('case_name', 'Unknown')}
-**Citation**: {case_data.get('citation', 'N/A')}
+        Args:
+            matter: Dictionary with any of research_data, case_data,
+                cases_data and principle_data (same inputs as bulk_research)
+            bypass_cache: Skip the response cache and always call Gemini
 
-**Holding**: {case_data.get('holding', 'Not provided')}
-**Reasoning**: {case_data.get('reasoning', 'Not provided')}
-**Full Opinion**: {case_data.get('full_text', 'Not available')}
+        Returns:
+            Dictionary mapping each requested task to its analysis
+        """
+        prompt, sections = self._format_full_analysis_prompt(matter)
+        if not sections:
+            return {}
 
-## Task
-Extract and clearly articulate:
-1. **Black Letter Law**: The specific legal rules established
-2. **Tests/Standards**: Any tests or standards articulated by the court
-3. **Elements**: Required elements for claims or defenses
-4. **Factors**: Factors courts should consider
-5. **Legal Principles**: Broader principles underlying the decision
-6. **Exceptions**: Any exceptions or limitations noted
-7. **Application Guidance**: How to apply these principles to new facts
+        logger.info(f"Running fused analysis with {len(sections)} sections")
 
-Present principles in clear, quotable form that can be used in legal arguments.
-"""
+        try:
+            content = self._run_cached(prompt, bypass_cache)
+        except Exception as e:
+            logger.error(f"Fused analysis failed: {str(e)}")
+            raise
+
+        return self._split_sections(content, sections, matter, bypass_cache)
+
+    def full_analysis_stream(self, matter: dict, bypass_cache: bool = False) -> Iterator[Tuple[str, str]]:
+        """
+        Streaming variant of full_analysis
+
+        Yields (task key, analysis) pairs as soon as each section of the fused
+        response is complete. Sections the model drops are run separately
+        once the stream ends.
+        """
+        prompt, sections = self._format_full_analysis_prompt(matter)
+        if not sections:
+            return
+
+        logger.info(f"Streaming fused analysis with {len(sections)} sections")
 
+        splitter = SectionSplitter()
+        done = set()
         try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
+            for chunk in self._stream(prompt, bypass_cache):
+                for num, body in splitter.feed(chunk):
+                    key = sections.get(num)
+                    if key and key not in done:
+                        done.add(key)
+                        yield key, body
         except Exception as e:
-            logger.error(f"Legal principle extraction failed: {str(e)}")
+            logger.error(f"Fused analysis failed: {str(e)}")
             raise
 
-    def _format_precedent_research_prompt(self, research_data: dict) -> str:
-        """Format comprehensive precedent research prompt"""
-        precedents = research_data.get('precedents', [])
+        for num, key in sections.items():
+            if key in done:
+                continue
+            logger.warning(f"Fused response missing section {num} ({key}), running it separately")
+            yield key, self._run_single_task(key, matter, bypass_cache)
+
+    def _split_sections(self, content: str, sections: Dict[int, str], matter: dict,
+                        bypass_cache: bool = False) -> Dict[str, str]:
+        """Split a fused response into per-task results"""
+        found = {int(num): body.strip() for num, body in SECTION_RE.findall(content or '')}
+
+        results = {}
+        for num, key in sections.items():
+            if num in found:
+                results[key] = found[num]
+                continue
+            # The model dropped this section; fall back to a dedicated call
+            logger.warning(f"Fused response missing section {num} ({key}), running it separately")
+            results[key] = self._run_single_task(key, matter, bypass_cache)
+        return results
+
+    def _run_single_task(self, key: str, matter: dict, bypass_cache: bool = False) -> str:
+        """Run one fused task on its own"""
+        for task_key, matter_key, _, method_name in _FUSED_TASKS:
+            if task_key == key:
+                return getattr(self, method_name)(matter[matter_key], bypass_cache)
+        raise ValueError(f"Unknown analysis task: {key}")
+
+    def _agent_for(self, tier: Tier) -> Agent:
+        """Agent backing a model tier, preferring one that reads instructions from the context cache"""
+        agent = self.agent_fast if tier == 'fast' else self.agent
+        return self._instruction_cache.resolve(agent)
+
+    @staticmethod
+    def _cache_key(agent: Agent, prompt: str) -> str:
+        """Digest of model and prompt, computed once per call; includes the model so tiers don't share entries"""
+        return ResponseCache.make_key(f"{agent.model.id}\n{prompt}")
+
+    def _run_cached(self, prompt: str, bypass_cache: bool = False, tier: Tier = 'pro') -> str:
+        """Run a prompt through the agent, reusing cached responses for identical prompts"""
+        agent = self._agent_for(tier)
+        key = self._cache_key(agent, prompt)
+        use_cache = config.ENABLE_CACHING and not bypass_cache
+        if use_cache:
+            cached = self._cache.get_key(key)
+            if cached is not None:
+                logger.debug("Response cache hit")
+                return cached
+
+        if not use_cache:
+            return invoke(agent, prompt)
+
+        def call():
+            content = invoke(agent, prompt)
+            if content:
+                self._cache.set_key(key, content)
+            return content
+
+        return single_flight.do(key, call)
+
+    async def _arun_cached(self, prompt: str, bypass_cache: bool = False, tier: Tier = 'pro') -> str:
+        """Async variant of _run_cached"""
+        # First use creates the context cache over HTTP; keep it off the event loop
+        agent = await asyncio.to_thread(self._instruction_cache.resolve, self.agent_fast if tier == 'fast' else self.agent)
+        key = self._cache_key(agent, prompt)
+        use_cache = config.ENABLE_CACHING and not bypass_cache
+        if use_cache:
+            cached = self._cache.get_key(key)
+            if cached is not None:
+                logger.debug("Response cache hit")
+                return cached
+
+        if not use_cache:
+            return await ainvoke(agent, prompt)
+
+        async def call():
+            content = await ainvoke(agent, prompt)
+            if content:
+                self._cache.set_key(key, content)
+            return content
+
+        return await single_flight.ado(key, call)
+
+    def _stream(self, prompt: str, bypass_cache: bool = False) -> Iterator[str]:
+        """Stream response text for a prompt, caching the assembled response"""
+        agent = self._agent_for('pro')
+        key = self._cache_key(agent, prompt)
+        use_cache = config.ENABLE_CACHING and not bypass_cache
+        if use_cache:
+            cached = self._cache.get_key(key)
+            if cached is not None:
+                logger.debug("Response cache hit")
+                yield cached
+                return
+
+        # A partially consumed stream cannot be retried, so only the breaker applies
+        gemini_breaker.before_call()
+        parts = []
+        for event in agent.run(prompt, stream=True, stream_events=True):
+            if event.event == "RunError":
+                error = LLMCallError.from_run(event.content or "Gemini streaming run failed")
+                if is_transient(error):
+                    gemini_breaker.record_failure()
+                raise error
+            if event.event == "RunContent" and event.content:
+                parts.append(event.content)
+                yield event.content
+            elif event.event == "RunCompleted":
+                record_usage(event)
+        gemini_breaker.record_success()
+
+        if use_cache and parts:
+            self._cache.set_key(key, "".join(parts))
+
+    def _format_full_analysis_prompt(self, matter: dict) -> tuple:
+        """Format the fused multi-task prompt and its section map"""
+        sections = {}
+        tasks = []
+        for key, matter_key, builder, _ in _FUSED_TASKS:
+            if matter.get(matter_key) is None:
+                continue
+            num = len(sections) + 1
+            sections[num] = key
+            tasks.append(f"\n# Task {num}\n{getattr(self, builder)(matter[matter_key])}")
 
         prompt = f"""
-Conduct comprehensive case law research for the following matter:
+Complete each of the {len(sections)} tasks below for the same matter.
 
-## Research Parameters
-**Legal Issue**: {research_data.get('legal_issue', 'Not specified')}
-**Jurisdiction**: {research_data.get('jurisdiction', 'Not specified')}
-**Practice Area**: {research_data.get('practice_area', 'Not specified')}
+Wrap the answer to task k between a line containing only <<<SEC k>>> and a line
+containing only <<<END k>>> (for example <<<SEC 1>>> ... <<<END 1>>>). Answer every
+task in its own section, in order, and put nothing outside the delimiters.
+{''.join(tasks)}
+"""
+        return prompt, sections
+
+    def _format_precedent_research_prompt(self, research_data: dict) -> str:
+        """Format comprehensive precedent research prompt"""
+        precedents = self._prep_cases(research_data.get('precedents', []))
+        return _PRECEDENT_RESEARCH_TEMPLATE.render(
+            research_data,
+            precedent_count=len(precedents),
+            precedents_detailed=self._format_precedents_budgeted(precedents)
+        )
 
-**Current Case Facts**: {research_data.get('current_facts', 'Not provided')}
+    def _format_applicability_prompt(self, case_data: dict) -> str:
+        """Format precedent applicability prompt"""
+        return _APPLICABILITY_TEMPLATE.render(case_data)
 
-## Available Precedents ({len(precedents)} cases)
+    def _format_comparison_prompt(self, cases_data: dict) -> str:
+        """Format case comparison prompt"""
+        return _COMPARISON_TEMPLATE.render(
+            cases_data,
+            cases_formatted=self._format_multiple_cases(self._prep_cases(cases_data.get('cases', [])))
+        )
 
-{self._format_precedents_detailed(precedents)}
+    def _format_reduce_prompt(self, cases_data: dict, cases: list, summaries: list) -> str:
+        """Format the comparison prompt over per-case summaries"""
+        formatted = "".join(
+            f"\n## Case {i}: {case.get('case_name', 'Unknown')}\n{summary.strip()}\n\n"
+            for i, (case, summary) in enumerate(zip(cases, summaries), 1)
+        )
+        return _COMPARISON_TEMPLATE.render(cases_data, cases_formatted=formatted)
+
+    def _format_principles_prompt(self, case_data: dict) -> str:
+        """Format legal principle extraction prompt"""
+        return _PRINCIPLES_TEMPLATE.render(case_data)
+
+    @staticmethod
+    def _prep_cases(cases: list) -> list:
+        """Shallow-copy cases with long fields pre-sliced for the list formatters"""
+        return [
+            {
+                **case,
+                '_facts_short': (case.get('facts') or 'Not provided')[:200],
+                '_reasoning_short': (case.get('reasoning') or '')[:300],
+            }
+            for case in cases
+        ]
+
+    def _format_precedents_budgeted(self, precedents: list) -> str:
+        """
+        Format precedents within the prompt budget
 
-## Task
-Provide comprehensive case law research analysis following your analytical framework.
-Focus on identifying the most relevant and applicable precedents for the legal issue.
-Provide strategic recommendations for how to use these precedents effectively.
-"""
-        return prompt
+        The strongest cases (by importance score, then citation count) are shown
+        in full; the rest are rolled up as one-line summaries.
+        """
+        limit = config.PRECEDENT_DETAIL_LIMIT
+        if len(precedents) <= limit:
+            formatted = self._format_precedents_detailed(precedents)
+        else:
+            ranked = sorted(
+                precedents,
+                key=lambda c: (c.get('importance_score') or 0, c.get('citation_count') or 0),
+                reverse=True
+            )
+            formatted = (
+                self._format_precedents_detailed(ranked[:limit])
+                + self._format_precedent_summaries(ranked[limit:])
+            )
+        return truncate_to_tokens(formatted, config.PRECEDENT_TOKEN_BUDGET)
+
+    def _format_precedent_summaries(self, precedents: list) -> str:
+        """Format lower-ranked precedents as one-line summaries"""
+        lines = [f"\n### {len(precedents)} additional cases (summarized)\n"]
+        for case in precedents:
+            lines.append(
+                f"- {case.get('case_name', 'Unknown')} ({case.get('citation', 'N/A')}, "
+                f"{case.get('court', 'Unknown')}, {case.get('decision_date', 'N/A')}): "
+                f"{(case.get('holding') or 'Holding not provided')[:150]}\n"
+            )
+        return "".join(lines)
 
     def _format_precedents_detailed(self, precedents: list) -> str:
         """Format precedents with full details"""
         if not precedents:
             return "**No precedents provided**"
 
-        formatted = ""
+        parts = []
         for i, case in enumerate(precedents, 1):
-            formatted += f"\n### Case {i}: {case.get('case_name', 'Unknown')}\n"
-            formatted += f"**Citation**: {case.get('citation', 'N/A')}\n"
-            formatted += f"**Court**: {case.get('court', 'Unknown')} ({case.get('jurisdiction', 'Unknown')})\n"
-            formatted += f"**Date**: {case.get('decision_date', 'N/A')}\n"
-            formatted += f"**Legal Issue**: {case.get('legal_issue', 'Not specified')}\n"
-            formatted += f"**Holding**: {case.get('holding', 'Not provided')}\n"
-            formatted += f"**Importance Score**: {case.get('importance_score', 'N/A')}\n"
-            formatted += f"**Citations**: {case.get('citation_count', 0)}\n"
-            if case.get('reasoning'):
-                formatted += f"**Reasoning**: {case.get('reasoning')[:300]}...\n"
-            formatted += "\n"
-
-        return formatted
+            reasoning = case['_reasoning_short']
+            reasoning_line = f"**Reasoning**: {reasoning}...\n" if reasoning else ""
+            parts.append(
+                f"\n### Case {i}: {case.get('case_name', 'Unknown')}\n"
+                f"**Citation**: {case.get('citation', 'N/A')}\n"
+                f"**Court**: {case.get('court', 'Unknown')} ({case.get('jurisdiction', 'Unknown')})\n"
+                f"**Date**: {case.get('decision_date', 'N/A')}\n"
+                f"**Legal Issue**: {case.get('legal_issue', 'Not specified')}\n"
+                f"**Holding**: {case.get('holding', 'Not provided')}\n"
+                f"**Importance Score**: {case.get('importance_score', 'N/A')}\n"
+                f"**Citations**: {case.get('citation_count', 0)}\n"
+                f"{reasoning_line}\n"
+            )
+
+        return "".join(parts)
 
     def _format_multiple_cases(self, cases: list) -> str:
         """Format multiple cases for comparison"""
         if not cases:
             return "**No cases provided**"
 
-        formatted = ""
+        parts = []
         for i, case in enumerate(cases, 1):
-            formatted += f"\n## Case {i}: {case.get('case_name', 'Unknown')}\n"
-            formatted += f"- **Citation**: {case.get('citation', 'N/A')}\n"
-            formatted += f"- **Court**: {case.get('court', 'Unknown')}\n"
-            formatted += f"- **Date**: {case.get('decision_date', 'N/A')}\n"
-            formatted += f"- **Facts**: {case.get('facts', 'Not provided')[:200]}...\n"
-            formatted += f"- **Issue**: {case.get('legal_issue', 'Not specified')}\n"
-            formatted += f"- **Holding**: {case.get('holding', 'Not provided')}\n\n"
-
-        return formatted
-
-
-# Global agent instance
-case_law_agent = CaseLawResearchAgent()
+            parts.append(
+                f"\n## Case {i}: {case.get('case_name', 'Unknown')}\n"
+                f"- **Citation**: {case.get('citation', 'N/A')}\n"
+                f"- **Court**: {case.get('court', 'Unknown')}\n"
+                f"- **Date**: {case.get('decision_date', 'N/A')}\n"
+                f"- **Facts**: {case['_facts_short']}...\n"
+                f"- **Issue**: {case.get('legal_issue', 'Not specified')}\n"
+                f"- **Holding**: {case.get('holding', 'Not provided')}\n\n"
+            )
+
+        return "".join(parts)
+
+
+# Agent instance, created on first use so importing this module stays cheap
+_case_law_agent: Optional[CaseLawResearchAgent] = None
+_case_law_agent_lock = threading.Lock()
+
+
+def get_case_law_agent() -> CaseLawResearchAgent:
+    """Return the shared case law agent, constructing it on first call"""
+    global _case_law_agent
+    if _case_law_agent is None:
+        with _case_law_agent_lock:
+            if _case_law_agent is None:
+                _case_law_agent = CaseLawResearchAgent()
+    return _case_law_agent
+
+
+def __getattr__(name):
+    # Keeps `from agents.case_law_research_agent import case_law_agent` working
+    if name == "case_law_agent":
+        return get_case_law_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,32 +2,30 @@
 Compliance Advisory Agent
 Specializes in regulatory compliance, risk management, and policy development
 """
+import asyncio
+import atexit
+import json
 import logging
+import threading
+import time
+from typing import AsyncIterator, Dict, Final, Iterable, Iterator, List, NamedTuple, Optional, Sequence
 from agno.agent import Agent
-from agno.models.google import Gemini
 from config import config
+from agents._cache import ResponseCache, build_response_cache, cached_llm_call
+from agents._context_cache import InstructionCache
+from agents._gemini_pool import build_gemini
+from agents._llm import LLMCallError, ainvoke, gemini_breaker, invoke, is_transient, record_usage
+from agents._metrics import agent_metrics, current_method
+from agents._prompt_utils import PromptTemplate
+from agents._semantic_cache import SemanticCache, semantic_lookups_enabled
 
 logger = logging.getLogger(__name__)
 
+# Version tag for persisted responses; bump whenever _INSTRUCTIONS or a prompt template changes
+PROMPT_VERSION: Final[str] = "v1"
 
-class ComplianceAdvisoryAgent:
-    """
-    AI Agent specialized in compliance advisory and regulatory analysis
-    """
-
-    def __init__(self):
-        """Initialize Compliance Advisory Agent"""
-        self.agent = Agent(
-            name="Compliance Advisory Specialist",
-            model=Gemini(id=config.AI_MODEL, api_key=config.GEMINI_API_KEY),
-            instructions=self._get_instructions(),
-            markdown=True
-        )
-        logger.info("Compliance Advisory Agent initialized")
-
-    def _get_instructions(self) -> str:
-        """Get comprehensive instructions for the agent"""
-        return """
+# Static system instructions, built once at import and shared by every instance
+_INSTRUCTIONS: Final[str] = """
 You are an expert Compliance Advisory Specialist with deep expertise in regulatory
 compliance, risk management, corporate governance, and policy development. Your role
 is to help organizations navigate complex regulatory requirements and maintain compliance.
@@ -232,59 +230,68 @@ specific regulatory provisions and include citations where applicable. Consider
 both legal requirements and industry best practices.
 """
 
-    def assess_compliance(self, compliance_data: dict) -> str:
-        """
-        Assess compliance with applicable regulations
 
-        Args:
-            compliance_data: Dictionary containing:
-                - organization: Organization information
-                - industry: Industry sector
-                - jurisdiction: Relevant jurisdictions
-                - frameworks: Compliance frameworks (GDPR, HIPAA, etc.)
-                - current_practices: Current compliance practices
-                - scope: Areas to assess
+# Defaults for list fields, shared across calls instead of rebuilt per prompt
+_DEFAULT_JURISDICTIONS = ('Not specified',)
+_DEFAULT_SCOPE = ('General compliance',)
+_DEFAULT_KNOWN_ISSUES = ('None identified',)
+_DEFAULT_BREACH_LAWS = ('GDPR', 'CCPA', 'State breach notification laws')
 
-        Returns:
-            Comprehensive compliance assessment
-        """
-        prompt = self._format_compliance_assessment_prompt(compliance_data)
-        logger.info(f"Assessing compliance for: {compliance_data.get('organization', 'Unknown')}")
+# Prompt templates, rendered with per-field fallbacks for anything missing from the input
+_ASSESSMENT_TEMPLATE = PromptTemplate("""
+Conduct a comprehensive compliance assessment for:
 
-        try:
-            response = self.agent.run(prompt)
-            logger.info("Compliance assessment completed")
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Compliance assessment failed: {str(e)}")
-            raise
+## Organization Profile
+**Name**: {organization}
+**Industry**: {industry}
+**Jurisdiction(s)**: {jurisdictions}
+**Size**: {size}
+**Business Model**: {business_model}
 
-    def analyze_regulatory_requirement(self, requirement_data: dict) -> str:
-        """
-        Analyze specific regulatory requirement
+## Compliance Scope
+**Frameworks**: {frameworks}
+**Focus Areas**: {scope}
 
-        Args:
-            requirement_data: Information about regulation
+## Current State
+**Existing Compliance Program**: {existing_program}
+**Known Issues**: {known_issues}
+**Recent Audits**: {recent_audits}
 
-        Returns:
-            Detailed requirement analysis
-        """
-        prompt = f"""
+## Current Practices
+{current_practices}
+
+## Assessment Task
+Provide comprehensive compliance assessment following your analytical framework.
+Focus on:
+- Identifying all applicable regulations
+- Assessing current compliance status
+- Identifying gaps and risks
+- Providing prioritized remediation recommendations
+- Developing implementation roadmap
+
+Ensure recommendations are practical, prioritized, and include resource estimates.
+""", {
+    'organization': 'Unknown',
+    'recent_audits': 'None',
+    'current_practices': 'Not provided',
+}, fallback='Not specified')
+
+_REQUIREMENT_TEMPLATE = PromptTemplate("""
 Analyze the following regulatory requirement:
 
 ## Regulation Details
-**Framework**: {requirement_data.get('framework', 'Unknown')}
-**Regulation**: {requirement_data.get('regulation_name', 'Unknown')}
-**Jurisdiction**: {requirement_data.get('jurisdiction', 'Unknown')}
-**Effective Date**: {requirement_data.get('effective_date', 'Unknown')}
+**Framework**: {framework}
+**Regulation**: {regulation_name}
+**Jurisdiction**: {jurisdiction}
+**Effective Date**: {effective_date}
 
 ## Requirement Text
-{requirement_data.get('requirement_text', 'Not provided')}
+{requirement_text}
 
 ## Organization Context
-**Industry**: {requirement_data.get('industry', 'Not specified')}
-**Size**: {requirement_data.get('organization_size', 'Not specified')}
-**Current Practices**: {requirement_data.get('current_practices', 'Not specified')}
+**Industry**: {industry}
+**Size**: {organization_size}
+**Current Practices**: {current_practices}
 
 ## Analysis Required
 1. **Interpretation**: What does this requirement actually mandate?
@@ -299,41 +306,29 @@ Analyze the following regulatory requirement:
 10. **Implementation Guidance**: Step-by-step compliance roadmap
 
 Provide practical, actionable guidance for achieving and maintaining compliance.
-"""
-
-        try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Regulatory requirement analysis failed: {str(e)}")
-            raise
-
-    def develop_compliance_policy(self, policy_data: dict) -> str:
-        """
-        Develop compliance policy document
-
-        Args:
-            policy_data: Information about policy requirements
-
-        Returns:
-            Draft policy document
-        """
-        prompt = f"""
+""", {
+    'requirement_text': 'Not provided',
+    'industry': 'Not specified',
+    'organization_size': 'Not specified',
+    'current_practices': 'Not specified',
+}, fallback='Unknown')
+
+_POLICY_TEMPLATE = PromptTemplate("""
 Develop a compliance policy for:
 
 ## Policy Information
-**Policy Name**: {policy_data.get('policy_name', 'Unknown')}
-**Policy Type**: {policy_data.get('policy_type', 'Unknown')}
-**Applicable Regulations**: {', '.join(policy_data.get('regulations', []))}
-**Target Audience**: {policy_data.get('target_audience', 'All employees')}
+**Policy Name**: {policy_name}
+**Policy Type**: {policy_type}
+**Applicable Regulations**: {regulations}
+**Target Audience**: {target_audience}
 
 ## Organization Context
-**Industry**: {policy_data.get('industry', 'Not specified')}
-**Size**: {policy_data.get('organization_size', 'Not specified')}
-**Risk Profile**: {policy_data.get('risk_profile', 'Not specified')}
+**Industry**: {industry}
+**Size**: {organization_size}
+**Risk Profile**: {risk_profile}
 
 ## Policy Requirements
-{policy_data.get('requirements', 'Not provided')}
+{requirements}
 
 ## Task
 Draft a comprehensive compliance policy including:
@@ -387,35 +382,23 @@ Draft a comprehensive compliance policy including:
 
 Draft policy should be clear, enforceable, and compliant with all applicable regulations.
 Use professional policy language and formatting.
-"""
-
-        try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Policy development failed: {str(e)}")
-            raise
-
-    def create_compliance_checklist(self, checklist_data: dict) -> str:
-        """
-        Create compliance checklist for specific regulation
-
-        Args:
-            checklist_data: Information about compliance requirements
-
-        Returns:
-            Detailed compliance checklist
-        """
-        prompt = f"""
+""", {
+    'policy_name': 'Unknown',
+    'policy_type': 'Unknown',
+    'target_audience': 'All employees',
+    'requirements': 'Not provided',
+}, fallback='Not specified')
+
+_CHECKLIST_TEMPLATE = PromptTemplate("""
 Create a comprehensive compliance checklist for:
 
 ## Compliance Framework
-**Framework**: {checklist_data.get('framework', 'Unknown')}
-**Jurisdiction**: {checklist_data.get('jurisdiction', 'Unknown')}
-**Industry**: {checklist_data.get('industry', 'Not specified')}
+**Framework**: {framework}
+**Jurisdiction**: {jurisdiction}
+**Industry**: {industry}
 
 ## Scope
-{checklist_data.get('scope', 'General compliance')}
+{scope}
 
 ## Task
 Create a detailed, actionable compliance checklist organized by:
@@ -437,39 +420,25 @@ Format as a practical checklist that can be used for:
 
 Make checklist comprehensive but manageable. Prioritize requirements by importance
 and risk. Include guidance on how to use the checklist effectively.
-"""
-
-        try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Checklist creation failed: {str(e)}")
-            raise
-
-    def assess_data_breach_response(self, breach_data: dict) -> str:
-        """
-        Assess data breach and provide response guidance
+""", {
+    'industry': 'Not specified',
+    'scope': 'General compliance',
+}, fallback='Unknown')
 
-        Args:
-            breach_data: Information about data breach
-
-        Returns:
-            Breach response recommendations
-        """
-        prompt = f"""
+_BREACH_RESPONSE_TEMPLATE = PromptTemplate("""
 Provide data breach response guidance for:
 
 ## Breach Details
-**Type of Data**: {breach_data.get('data_type', 'Unknown')}
-**Number of Records**: {breach_data.get('record_count', 'Unknown')}
-**Discovery Date**: {breach_data.get('discovery_date', 'Unknown')}
-**Breach Cause**: {breach_data.get('cause', 'Under investigation')}
-**Geographic Scope**: {breach_data.get('geographic_scope', 'Unknown')}
+**Type of Data**: {data_type}
+**Number of Records**: {record_count}
+**Discovery Date**: {discovery_date}
+**Breach Cause**: {cause}
+**Geographic Scope**: {geographic_scope}
 
 ## Organization Context
-**Industry**: {breach_data.get('industry', 'Not specified')}
-**Jurisdiction**: {breach_data.get('jurisdiction', 'Not specified')}
-**Applicable Laws**: {', '.join(breach_data.get('applicable_laws', ['GDPR', 'CCPA', 'State breach notification laws']))}
+**Industry**: {industry}
+**Jurisdiction**: {jurisdiction}
+**Applicable Laws**: {applicable_laws}
 
 ## Response Guidance Needed
 Provide comprehensive breach response plan including:
@@ -524,52 +493,391 @@ Provide comprehensive breach response plan including:
 
 Prioritize actions by urgency and regulatory requirement. Provide specific guidance
 on notification timing and content to ensure compliance with applicable laws.
-"""
+""", {
+    'cause': 'Under investigation',
+    'industry': 'Not specified',
+    'jurisdiction': 'Not specified',
+}, fallback='Unknown')
+
+
+class _Operation(NamedTuple):
+    """An agent method's log label, prompt template and list fields (joined, with their defaults)"""
+    label: str
+    template: PromptTemplate
+    list_fields: Dict[str, Sequence[str]]
+
+
+# Every agent method by name; the public methods dispatch through this table
+_OPERATIONS: Final[Dict[str, _Operation]] = {
+    'assess_compliance': _Operation('Compliance assessment', _ASSESSMENT_TEMPLATE, {
+        'jurisdictions': _DEFAULT_JURISDICTIONS,
+        'frameworks': config.COMPLIANCE_FRAMEWORKS,
+        'scope': _DEFAULT_SCOPE,
+        'known_issues': _DEFAULT_KNOWN_ISSUES,
+    }),
+    'analyze_regulatory_requirement': _Operation('Regulatory requirement analysis', _REQUIREMENT_TEMPLATE, {}),
+    'develop_compliance_policy': _Operation('Policy development', _POLICY_TEMPLATE, {'regulations': ()}),
+    'create_compliance_checklist': _Operation('Checklist creation', _CHECKLIST_TEMPLATE, {}),
+    'assess_data_breach_response': _Operation('Data breach response assessment', _BREACH_RESPONSE_TEMPLATE, {
+        'applicable_laws': _DEFAULT_BREACH_LAWS,
+    }),
+}
+
+# Fields naming the organization and its regulatory profile; semantic matches never cross them
+_PROFILE_FIELDS: Final[Sequence[str]] = (
+    'organization', 'industry', 'organization_size', 'size', 'jurisdiction', 'jurisdictions',
+    'geographic_scope', 'framework', 'frameworks', 'regulation_name', 'data_type',
+)
+
+
+class ComplianceAdvisoryAgent:
+    """
+    AI Agent specialized in compliance advisory and regulatory analysis
+    """
 
+    def __init__(self):
+        """Initialize Compliance Advisory Agent"""
+        self.agent = Agent(
+            name="Compliance Advisory Specialist",
+            model=build_gemini(),
+            instructions=self._get_instructions(),
+            markdown=True
+        )
+        self._cache = build_response_cache(PROMPT_VERSION)
+        self._instruction_cache = InstructionCache(
+            "compliance-advisory-instructions",
+            ttl_seconds=config.CONTEXT_CACHE_TTL_SECONDS
+        )
+        self._semantic_cache = SemanticCache(
+            threshold=config.SEMANTIC_CACHE_THRESHOLD,
+            max_entries=config.CACHE_MAX_ENTRIES,
+            path=config.SEMANTIC_CACHE_PATH or None,
+            ttl=config.SEMANTIC_CACHE_TTL_SECONDS,
+            prompt_version=PROMPT_VERSION
+        )
+        if config.ENABLE_SEMANTIC_CACHE:
+            self._semantic_cache.warm_load()
+            atexit.register(self._semantic_cache.save)
+        logger.info("Compliance Advisory Agent initialized")
+
+    @classmethod
+    def _get_instructions(cls) -> str:
+        """Get comprehensive instructions for the agent"""
+        return _INSTRUCTIONS
+
+    @cached_llm_call
+    def assess_compliance(self, compliance_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Assess compliance with applicable regulations
+
+        Args:
+            compliance_data: Dictionary containing:
+                - organization: Organization information
+                - industry: Industry sector
+                - jurisdiction: Relevant jurisdictions
+                - frameworks: Compliance frameworks (GDPR, HIPAA, etc.)
+                - current_practices: Current compliance practices
+                - scope: Areas to assess
+
+        Returns:
+            Comprehensive compliance assessment
+        """
+        logger.info(f"Assessing compliance for: {compliance_data.get('organization', 'Unknown')}")
+        result = self._dispatch('assess_compliance', compliance_data, bypass_cache)
+        logger.info("Compliance assessment completed")
+        return result
+
+    def assess_compliance_stream(self, compliance_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of assess_compliance
+
+        Yields the assessment as Gemini generates it, so callers can render
+        markdown progressively. Shares cache entries with assess_compliance.
+        """
+        prompt = self._build_prompt('assess_compliance', compliance_data)
+        logger.info(f"Streaming compliance assessment for: {compliance_data.get('organization', 'Unknown')}")
+        yield from self._stream('assess_compliance', compliance_data, prompt, bypass_cache)
+        logger.info("Compliance assessment completed")
+
+    @cached_llm_call
+    def analyze_regulatory_requirement(self, requirement_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Analyze specific regulatory requirement
+
+        Args:
+            requirement_data: Information about regulation
+
+        Returns:
+            Detailed requirement analysis
+        """
+        return self._dispatch('analyze_regulatory_requirement', requirement_data, bypass_cache)
+
+    @cached_llm_call
+    def develop_compliance_policy(self, policy_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Develop compliance policy document
+
+        Args:
+            policy_data: Information about policy requirements
+
+        Returns:
+            Draft policy document
+        """
+        return self._dispatch('develop_compliance_policy', policy_data, bypass_cache)
+
+    @cached_llm_call
+    def create_compliance_checklist(self, checklist_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Create compliance checklist for specific regulation
+
+        Args:
+            checklist_data: Information about compliance requirements
+
+        Returns:
+            Detailed compliance checklist
+        """
+        return self._dispatch('create_compliance_checklist', checklist_data, bypass_cache)
+
+    @cached_llm_call
+    def assess_data_breach_response(self, breach_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Assess data breach and provide response guidance
+
+        Args:
+            breach_data: Information about data breach
+
+        Returns:
+            Breach response recommendations
+        """
+        return self._dispatch('assess_data_breach_response', breach_data, bypass_cache)
+
+    @cached_llm_call
+    async def aassess_compliance(self, compliance_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of assess_compliance"""
+        logger.info(f"Assessing compliance for: {compliance_data.get('organization', 'Unknown')}")
+        result = await self._adispatch('assess_compliance', compliance_data, bypass_cache)
+        logger.info("Compliance assessment completed")
+        return result
+
+    async def aassess_compliance_stream(self, compliance_data: dict, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of assess_compliance_stream"""
+        prompt = self._build_prompt('assess_compliance', compliance_data)
+        logger.info(f"Streaming compliance assessment for: {compliance_data.get('organization', 'Unknown')}")
+        async for chunk in self._astream('assess_compliance', compliance_data, prompt, bypass_cache):
+            yield chunk
+        logger.info("Compliance assessment completed")
+
+    @cached_llm_call
+    async def aanalyze_regulatory_requirement(self, requirement_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of analyze_regulatory_requirement"""
+        return await self._adispatch('analyze_regulatory_requirement', requirement_data, bypass_cache)
+
+    @cached_llm_call
+    async def adevelop_compliance_policy(self, policy_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of develop_compliance_policy"""
+        return await self._adispatch('develop_compliance_policy', policy_data, bypass_cache)
+
+    @cached_llm_call
+    async def acreate_compliance_checklist(self, checklist_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of create_compliance_checklist"""
+        return await self._adispatch('create_compliance_checklist', checklist_data, bypass_cache)
+
+    @cached_llm_call
+    async def aassess_data_breach_response(self, breach_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of assess_data_breach_response"""
+        return await self._adispatch('assess_data_breach_response', breach_data, bypass_cache)
+
+    async def batch_assess(self, items: List[dict], concurrency: Optional[int] = None) -> List[str]:
+        """
+        Run compliance assessments for several organizations concurrently
+
+        Args:
+            items: compliance_data dictionaries, one per assessment
+            concurrency: Maximum assessments in flight (defaults to GEMINI_MAX_CONCURRENCY)
+
+        Returns:
+            Assessments in the same order as items
+        """
+        semaphore = asyncio.Semaphore(concurrency or config.GEMINI_MAX_CONCURRENCY)
+
+        async def assess(compliance_data: dict) -> str:
+            async with semaphore:
+                return await self.aassess_compliance(compliance_data)
+
+        return await asyncio.gather(*[assess(item) for item in items])
+
+    def _build_prompt(self, method: str, data: dict) -> str:
+        """Render a method's prompt, joining its list fields"""
+        operation = _OPERATIONS[method]
+        lists = {field: _join(data.get(field), default) for field, default in operation.list_fields.items()}
+        return operation.template.render(data, **lists)
+
+    def _dispatch(self, method: str, data: dict, bypass_cache: bool = False) -> str:
+        """Build a method's prompt and run it"""
+        return self._run(method, data, self._build_prompt(method, data), bypass_cache)
+
+    async def _adispatch(self, method: str, data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of _dispatch"""
+        return await self._arun(method, data, self._build_prompt(method, data), bypass_cache)
+
+    @staticmethod
+    def _semantic_bucket(method: str, data: dict) -> str:
+        """Semantic cache partition for a call: one per method and organization profile"""
+        profile = {field: data[field] for field in _PROFILE_FIELDS if data.get(field)}
+        return f"{method}/{ResponseCache.make_key(json.dumps(profile, sort_keys=True, default=str))}"
+
+    def _run(self, method: str, data: dict, prompt: str, bypass_cache: bool = False) -> str:
+        """Run a prompt, serving near-duplicate prompts for the same organization from the semantic cache"""
         try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
+            bucket = self._semantic_bucket(method, data)
+            vector = None
+            if semantic_lookups_enabled() and not bypass_cache:
+                cached, vector = self._semantic_cache.lookup(bucket, prompt)
+                agent_metrics.incr(method, 'sem_miss' if cached is None else 'sem_hit')
+                if cached is not None:
+                    return cached
+
+            # Resolved once so retries reuse the same context-cached instructions
+            agent = self._instruction_cache.resolve(self.agent)
+            started = time.perf_counter()
+            token = current_method.set(method)
+            try:
+                result = invoke(agent, prompt)
+            finally:
+                current_method.reset(token)
+                elapsed = time.perf_counter() - started
+                agent_metrics.incr(method, 'api_call')
+                agent_metrics.observe(method, elapsed)
+            logger.info(f"op={method} lat={elapsed:.2f}s")
+            if vector is not None and result:
+                self._semantic_cache.add(bucket, vector, result)
+            return result
         except Exception as e:
-            logger.error(f"Data breach response assessment failed: {str(e)}")
+            logger.error(f"{_OPERATIONS[method].label} failed: {str(e)}")
             raise
 
-    def _format_compliance_assessment_prompt(self, compliance_data: dict) -> str:
-        """Format comprehensive compliance assessment prompt"""
-        prompt = f"""
-Conduct a comprehensive compliance assessment for:
+    async def _arun(self, method: str, data: dict, prompt: str, bypass_cache: bool = False) -> str:
+        """Async variant of _run"""
+        try:
+            bucket = self._semantic_bucket(method, data)
+            vector = None
+            if semantic_lookups_enabled() and not bypass_cache:
+                # Embedding is a blocking HTTP call; keep it off the event loop
+                cached, vector = await asyncio.to_thread(self._semantic_cache.lookup, bucket, prompt)
+                agent_metrics.incr(method, 'sem_miss' if cached is None else 'sem_hit')
+                if cached is not None:
+                    return cached
+
+            # First use creates the context cache over HTTP; keep it off the event loop
+            agent = await asyncio.to_thread(self._instruction_cache.resolve, self.agent)
+            started = time.perf_counter()
+            token = current_method.set(method)
+            try:
+                result = await ainvoke(agent, prompt)
+            finally:
+                current_method.reset(token)
+                elapsed = time.perf_counter() - started
+                agent_metrics.incr(method, 'api_call')
+                agent_metrics.observe(method, elapsed)
+            logger.info(f"op={method} lat={elapsed:.2f}s")
+            if vector is not None and result:
+                self._semantic_cache.add(bucket, vector, result)
+            return result
+        except Exception as e:
+            logger.error(f"{_OPERATIONS[method].label} failed: {str(e)}")
+            raise
 
-## Organization Profile
-**Name**: {compliance_data.get('organization', 'Unknown')}
-**Industry**: {compliance_data.get('industry', 'Not specified')}
-**Jurisdiction(s)**: {', '.join(compliance_data.get('jurisdictions', ['Not specified']))}
-**Size**: {compliance_data.get('size', 'Not specified')}
-**Business Model**: {compliance_data.get('business_model', 'Not specified')}
+    def _stream(self, method: str, data: dict, prompt: str, bypass_cache: bool = False) -> Iterator[str]:
+        """Stream response text, caching the assembled response under the same key as method"""
+        use_cache = config.ENABLE_CACHING and not bypass_cache
+        key = ResponseCache.make_call_key(method, self.agent.model.id, data)
+        if use_cache:
+            cached = self._cache.get_key(key)
+            if cached is not None:
+                yield cached
+                return
 
-## Compliance Scope
-**Frameworks**: {', '.join(compliance_data.get('frameworks', config.COMPLIANCE_FRAMEWORKS))}
-**Focus Areas**: {', '.join(compliance_data.get('scope', ['General compliance']))}
+        try:
+            parts = []
+            agent = self._instruction_cache.resolve(self.agent)
+            # A partially consumed stream cannot be retried, so only the breaker applies
+            gemini_breaker.before_call()
+            for event in agent.run(prompt, stream=True, stream_events=True):
+                if event.event == "RunError":
+                    error = LLMCallError.from_run(event.content or "Gemini streaming run failed")
+                    if is_transient(error):
+                        gemini_breaker.record_failure()
+                    raise error
+                if event.event == "RunContent" and event.content:
+                    parts.append(event.content)
+                    yield event.content
+                elif event.event == "RunCompleted":
+                    record_usage(event)
+            gemini_breaker.record_success()
+        except Exception as e:
+            logger.error(f"{_OPERATIONS[method].label} failed: {str(e)}")
+            raise
 
-## Current State
-**Existing Compliance Program**: {compliance_data.get('existing_program', 'Not specified')}
-**Known Issues**: {', '.join(compliance_data.get('known_issues', ['None identified']))}
-**Recent Audits**: {compliance_data.get('recent_audits', 'None')}
+        if use_cache and parts:
+            self._cache.set_key(key, "".join(parts))
 
-## Current Practices
-{compliance_data.get('current_practices', 'Not provided')}
+    async def _astream(self, method: str, data: dict, prompt: str, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of _stream"""
+        use_cache = config.ENABLE_CACHING and not bypass_cache
+        key = ResponseCache.make_call_key(method, self.agent.model.id, data)
+        if use_cache:
+            cached = self._cache.get_key(key)
+            if cached is not None:
+                yield cached
+                return
 
-## Assessment Task
-Provide comprehensive compliance assessment following your analytical framework.
-Focus on:
-- Identifying all applicable regulations
-- Assessing current compliance status
-- Identifying gaps and risks
-- Providing prioritized remediation recommendations
-- Developing implementation roadmap
+        try:
+            parts = []
+            agent = await asyncio.to_thread(self._instruction_cache.resolve, self.agent)
+            # A partially consumed stream cannot be retried, so only the breaker applies
+            gemini_breaker.before_call()
+            async for event in agent.arun(prompt, stream=True, stream_events=True):
+                if event.event == "RunError":
+                    error = LLMCallError.from_run(event.content or "Gemini streaming run failed")
+                    if is_transient(error):
+                        gemini_breaker.record_failure()
+                    raise error
+                if event.event == "RunContent" and event.content:
+                    parts.append(event.content)
+                    yield event.content
+                elif event.event == "RunCompleted":
+                    record_usage(event)
+            gemini_breaker.record_success()
+        except Exception as e:
+            logger.error(f"{_OPERATIONS[method].label} failed: {str(e)}")
+            raise
 
-Ensure recommendations are practical, prioritized, and include resource estimates.
-"""
-        return prompt
+        if use_cache and parts:
+            self._cache.set_key(key, "".join(parts))
+
+
+def _join(values: Optional[Iterable[str]], default: Iterable[str]) -> str:
+    """Comma-join a list field in one pass, using default when it is missing or empty"""
+    return ', '.join(values or default)
+
+
+# Agent instance, created on first use so importing this module stays cheap
+_compliance_agent: Optional[ComplianceAdvisoryAgent] = None
+_compliance_agent_lock = threading.Lock()
+
+
+def get_compliance_agent() -> ComplianceAdvisoryAgent:
+    """Return the shared compliance agent, constructing it on first call"""
+    global _compliance_agent
+    if _compliance_agent is None:
+        with _compliance_agent_lock:
+            if _compliance_agent is None:
+                _compliance_agent = ComplianceAdvisoryAgent()
+    return _compliance_agent
 
 
-# Global agent instance
-compliance_agent = ComplianceAdvisoryAgent()
+def __getattr__(name):
+    # Keeps `from agents.compliance_advisory_agent import compliance_agent` working
+    if name == "compliance_agent":
+        return get_compliance_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
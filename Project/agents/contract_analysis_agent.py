@@ -2,32 +2,29 @@
 Contract Analysis Agent
 Specializes in contract review, risk assessment, and clause analysis
 """
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, ClassVar, Dict, Final, Iterator, List, Literal, NamedTuple, Optional, Tuple
 from agno.agent import Agent
-from agno.models.google import Gemini
 from config import config
+from agents._cache import ResponseCache, build_response_cache, cached_llm_call, single_flight
+from agents._context_cache import InstructionCache
+from agents._gemini_batch import submit_batch, wait_for_batch
+from agents._gemini_pool import build_gemini
+from agents._llm import LLMCallError, ainvoke, gemini_breaker, invoke, is_transient, record_usage
+from agents._metrics import agent_metrics
+from agents._prompt_utils import HeadingSplitter, PromptTemplate, estimate_tokens, truncate_to_tokens
+from agents._semantic_cache import SemanticCache, semantic_lookups_enabled
 
 logger = logging.getLogger(__name__)
 
+# Version tag for persisted responses; bump whenever _INSTRUCTIONS or a prompt builder changes
+PROMPT_VERSION: Final[str] = "v1"
 
-class ContractAnalysisAgent:
-    """
-    AI Agent specialized in contract analysis and risk assessment
-    """
-
-    def __init__(self):
-        """Initialize Contract Analysis Agent"""
-        self.agent = Agent(
-            name="Contract Analysis Specialist",
-            model=Gemini(id=config.AI_MODEL, api_key=config.GEMINI_API_KEY),
-            instructions=self._get_instructions(),
-            markdown=True
-        )
-        logger.info("Contract Analysis Agent initialized")
-
-    def _get_instructions(self) -> str:
-        """Get comprehensive instructions for the agent"""
-        return """
+# Static system instructions, built once at import and shared by every instance
+_INSTRUCTIONS: Final[str] = """
 You are an expert Contract Analysis Specialist with deep expertise in contract law,
 risk assessment, and commercial transactions. Your role is to help lawyers and
 businesses analyze contracts, identify risks, and ensure favorable terms.
@@ -207,59 +204,56 @@ Always provide specific clause references, quote problematic language, and sugge
 concrete alternative wording. Balance legal protection with commercial feasibility.
 """
 
-    def analyze_contract(self, contract_data: dict) -> str:
-        """
-        Perform comprehensive contract analysis
 
-        Args:
-            contract_data: Dictionary containing:
-                - contract_name: Name/title of contract
-                - contract_type: Type (e.g., services, sale, license)
-                - contract_text: Full contract text
-                - parties: Contracting parties
-                - party_role: Client's role (buyer, seller, etc.)
-                - jurisdiction: Applicable jurisdiction
-                - industry: Industry context
+# Risk categories as listed in risk assessment prompts, joined once at import
+_RISK_CATEGORIES: Final[str] = ', '.join(config.CONTRACT_RISK_CATEGORIES)
 
-        Returns:
-            Comprehensive contract analysis
-        """
-        prompt = self._format_contract_analysis_prompt(contract_data)
-        logger.info(f"Analyzing contract: {contract_data.get('contract_name', 'Unknown')[:50]}")
+# Prompt templates, rendered with per-field fallbacks for anything missing from the input
+_ANALYSIS_TEMPLATE = PromptTemplate("""
+Perform a comprehensive analysis of the following contract:
 
-        try:
-            response = self.agent.run(prompt)
-            logger.info("Contract analysis completed")
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Contract analysis failed: {str(e)}")
-            raise
+## Contract Information
+**Contract Name**: {contract_name}
+**Contract Type**: {contract_type}
+**Parties**: {parties}
+**Our Role**: {party_role}
+**Jurisdiction**: {jurisdiction}
+**Industry**: {industry}
 
-    def assess_contract_risk(self, contract_data: dict) -> str:
-        """
-        Focused risk assessment of contract
+## Full Contract Text
+{contract_text}
 
-        Args:
-            contract_data: Contract information
+## Analysis Requirements
+Provide comprehensive analysis following your analytical framework. Focus on:
+- Executive summary with key findings
+- Detailed section-by-section review
+- Risk assessment with specific risk ratings
+- Recommended changes with specific language
+- Negotiation strategy and priorities
 
-        Returns:
-            Detailed risk assessment
-        """
-        prompt = f"""
+Ensure analysis is practical, specific, and actionable for business decision-making.
+""", {
+    'contract_name': 'Unknown',
+    'contract_type': 'Unknown',
+    'industry': 'General',
+    'contract_text': 'Not provided',
+}, fallback='Not specified')
+
+_RISK_TEMPLATE = PromptTemplate("""
 Perform a comprehensive risk assessment for the following contract:
 
 ## Contract Information
-**Contract Name**: {contract_data.get('contract_name', 'Unknown')}
-**Contract Type**: {contract_data.get('contract_type', 'Unknown')}
-**Our Role**: {contract_data.get('party_role', 'Not specified')}
-**Contract Value**: {contract_data.get('contract_value', 'Not specified')}
-**Term**: {contract_data.get('term', 'Not specified')}
+**Contract Name**: {contract_name}
+**Contract Type**: {contract_type}
+**Our Role**: {party_role}
+**Contract Value**: {contract_value}
+**Term**: {term}
 
 ## Contract Text
-{contract_data.get('contract_text', 'Not provided')[:5000]}
+{contract_text}
 
 ## Risk Categories to Assess
-{', '.join(config.CONTRACT_RISK_CATEGORIES)}
+{risk_categories}
 
 ## Task
 Provide detailed risk assessment including:
@@ -273,39 +267,26 @@ Provide detailed risk assessment including:
 8. **Overall Risk Profile**: Summary risk level for entire contract
 
 Present findings in clear risk matrix format with actionable recommendations.
-"""
-
-        try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Contract risk assessment failed: {str(e)}")
-            raise
-
-    def review_specific_clause(self, clause_data: dict) -> str:
-        """
-        Analyze a specific contract clause
-
-        Args:
-            clause_data: Information about specific clause
+""", {
+    'contract_name': 'Unknown',
+    'contract_type': 'Unknown',
+    'contract_text': 'Not provided',
+}, fallback='Not specified')
 
-        Returns:
-            Clause analysis and recommendations
-        """
-        prompt = f"""
+_CLAUSE_TEMPLATE = PromptTemplate("""
 Review and analyze the following contract clause:
 
 ## Clause Details
-**Clause Type**: {clause_data.get('clause_type', 'Unknown')}
-**Section Reference**: {clause_data.get('section_reference', 'Not specified')}
+**Clause Type**: {clause_type}
+**Section Reference**: {section_reference}
 
 **Current Language**:
-{clause_data.get('clause_text', 'Not provided')}
+{clause_text}
 
 ## Context
-**Contract Type**: {clause_data.get('contract_type', 'Not specified')}
-**Our Position**: {clause_data.get('party_role', 'Not specified')}
-**Jurisdiction**: {clause_data.get('jurisdiction', 'Not specified')}
+**Contract Type**: {contract_type}
+**Our Position**: {party_role}
+**Jurisdiction**: {jurisdiction}
 
 ## Analysis Required
 1. **Interpretation**: What does this clause actually mean and require?
@@ -317,36 +298,13 @@ Review and analyze the following contract clause:
 7. **Alternative Language**: Provide 2-3 alternative versions (aggressive, moderate, minimal changes)
 
 Be specific and provide ready-to-use alternative language.
-"""
-
-        try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Clause review failed: {str(e)}")
-            raise
-
-    def compare_contracts(self, comparison_data: dict) -> str:
-        """
-        Compare multiple contract versions or similar contracts
-
-        Args:
-            comparison_data: Data for contract comparison
-
-        Returns:
-            Comparative analysis
-        """
-        prompt = f"""
-Compare the following contracts:
-
-## Contract A
-**Name**: {comparison_data.get('contract_a_name', 'Version A')}
-{comparison_data.get('contract_a_text', 'Not provided')[:3000]}
-
-## Contract B
-**Name**: {comparison_data.get('contract_b_name', 'Version B')}
-{comparison_data.get('contract_b_text', 'Not provided')[:3000]}
+""", {
+    'clause_type': 'Unknown',
+    'clause_text': 'Not provided',
+}, fallback='Not specified')
 
+# Shared by the direct comparison prompt and the reduce step of map-reduce comparison
+_COMPARISON_TASK = """
 ## Comparison Task
 1. **Key Differences**: Identify material differences between contracts
 2. **Risk Comparison**: Which contract has better risk allocation?
@@ -358,40 +316,67 @@ Compare the following contracts:
 Present findings in side-by-side comparison format where helpful.
 """
 
-        try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Contract comparison failed: {str(e)}")
-            raise
+_COMPARISON_TEMPLATE = PromptTemplate("""
+Compare the following contracts:
 
-    def generate_negotiation_strategy(self, contract_data: dict) -> str:
-        """
-        Generate negotiation strategy for contract
+## Contract A
+**Name**: {contract_a_name}
+{contract_a_text}
 
-        Args:
-            contract_data: Contract information and business context
+## Contract B
+**Name**: {contract_b_name}
+{contract_b_text}
+""" + _COMPARISON_TASK, {
+    'contract_a_name': 'Version A',
+    'contract_b_name': 'Version B',
+})
+
+# Map step of map-reduce contract comparison, run once per contract
+_CONTRACT_SUMMARY_TEMPLATE = PromptTemplate("""
+Summarize this contract in at most 400 words for a side-by-side comparison with another contract.
+Cover parties and obligations, payment terms, term and termination, liability and indemnification,
+IP and confidentiality, and any unusual or one-sided provisions. Quote key language where it matters.
+
+**Contract**: {contract_name}
+
+{contract_text}
+""", {
+    'contract_name': 'Unknown',
+})
+
+# Reduce step of map-reduce contract comparison
+_SUMMARY_COMPARISON_TEMPLATE = PromptTemplate("""
+Compare the following contracts, each given as a structured summary of the full text:
 
-        Returns:
-            Negotiation strategy and talking points
-        """
-        prompt = f"""
+## Contract A
+**Name**: {contract_a_name}
+{summary_a}
+
+## Contract B
+**Name**: {contract_b_name}
+{summary_b}
+""" + _COMPARISON_TASK, {
+    'contract_a_name': 'Version A',
+    'contract_b_name': 'Version B',
+})
+
+_NEGOTIATION_TEMPLATE = PromptTemplate("""
 Develop a negotiation strategy for the following contract:
 
 ## Contract Details
-**Contract**: {contract_data.get('contract_name', 'Unknown')}
-**Type**: {contract_data.get('contract_type', 'Unknown')}
-**Value**: {contract_data.get('contract_value', 'Unknown')}
-**Our Position**: {contract_data.get('party_role', 'Unknown')}
+**Contract**: {contract_name}
+**Type**: {contract_type}
+**Value**: {contract_value}
+**Our Position**: {party_role}
 
 ## Business Context
-**Our Leverage**: {contract_data.get('our_leverage', 'Not specified')}
-**Relationship Importance**: {contract_data.get('relationship_importance', 'Not specified')}
-**Alternatives**: {contract_data.get('alternatives', 'Not specified')}
-**Time Pressure**: {contract_data.get('time_pressure', 'Not specified')}
+**Our Leverage**: {our_leverage}
+**Relationship Importance**: {relationship_importance}
+**Alternatives**: {alternatives}
+**Time Pressure**: {time_pressure}
 
 ## Key Issues Identified
-{self._format_issues(contract_data.get('key_issues', []))}
+{key_issues}
 
 ## Strategy Development
 Provide:
@@ -407,53 +392,545 @@ Provide:
 10. **Talking Points**: Key arguments for priority issues
 
 Frame strategy around achieving business objectives while managing legal risk.
-"""
+""", {
+    'our_leverage': 'Not specified',
+    'relationship_importance': 'Not specified',
+    'alternatives': 'Not specified',
+    'time_pressure': 'Not specified',
+}, fallback='Unknown')
+
+
+class _Operation(NamedTuple):
+    """An agent method's log label, prompt builder and whether near-duplicate prompts may share answers"""
+    label: str
+    builder: str
+    semantic: bool
+
+
+# Model tier: 'pro' uses AI_MODEL, 'fast' uses AI_MODEL_FAST
+Tier = Literal['fast', 'pro']
+
+# Every agent method by name; the public methods dispatch through this table. Whole-contract
+# analyses are exact-cache only: contracts differing in a cap, governing law or party embed alike
+_OPERATIONS: Final[Dict[str, _Operation]] = {
+    'analyze_contract': _Operation('Contract analysis', '_format_contract_analysis_prompt', False),
+    'assess_contract_risk': _Operation('Contract risk assessment', '_format_risk_prompt', False),
+    'review_specific_clause': _Operation('Clause review', '_format_clause_prompt', True),
+    'compare_contracts': _Operation('Contract comparison', '_format_comparison_prompt', False),
+    'summarize_contract': _Operation('Contract summary', '_format_summary_prompt', False),
+    'generate_negotiation_strategy': _Operation(
+        'Negotiation strategy generation', '_format_negotiation_prompt', False
+    ),
+}
+
+
+class ContractAnalysisAgent:
+    """
+    AI Agent specialized in contract analysis and risk assessment
+    """
+
+    # Agno agents by tier, shared by every instance; instances differ only in their caches
+    _shared_agents: ClassVar[Dict[str, Agent]] = {}
+    _shared_agent_lock: ClassVar[threading.Lock] = threading.Lock()
+    # Gemini context cache holding the shared agent's instructions, so calls don't resend them
+    _instruction_cache: ClassVar[InstructionCache] = InstructionCache(
+        "contract-analysis-instructions",
+        ttl_seconds=config.CONTEXT_CACHE_TTL_SECONDS
+    )
+
+    def __init__(self):
+        """Initialize Contract Analysis Agent"""
+        self.agent = self._get_shared_agent()
+        # Cheaper, faster tier for short clause reviews
+        self.agent_fast = self._get_shared_agent('fast')
+        self._cache = build_response_cache(PROMPT_VERSION)
+        # Kept in memory: SEMANTIC_CACHE_PATH holds the compliance agent's saved cache
+        self._semantic_cache = SemanticCache(
+            threshold=config.SEMANTIC_CACHE_THRESHOLD,
+            max_entries=config.CACHE_MAX_ENTRIES,
+            ttl=config.SEMANTIC_CACHE_TTL_SECONDS
+        )
+        logger.info("Contract Analysis Agent initialized")
+
+    @classmethod
+    def _get_shared_agent(cls, tier: Tier = 'pro') -> Agent:
+        """Return the class-wide Agno agent for a model tier, building it on first call"""
+        agent = cls._shared_agents.get(tier)
+        if agent is None:
+            with cls._shared_agent_lock:
+                agent = cls._shared_agents.get(tier)
+                if agent is None:
+                    fast = tier == 'fast'
+                    agent = Agent(
+                        name="Contract Analysis Specialist (Fast)" if fast else "Contract Analysis Specialist",
+                        model=build_gemini(config.AI_MODEL_FAST if fast else config.AI_MODEL),
+                        instructions=cls._get_instructions(),
+                        markdown=True
+                    )
+                    cls._shared_agents[tier] = agent
+        return agent
+
+    @classmethod
+    def _get_instructions(cls) -> str:
+        """Get comprehensive instructions for the agent"""
+        return _INSTRUCTIONS
+
+    @cached_llm_call
+    def analyze_contract(self, contract_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Perform comprehensive contract analysis
+
+        Args:
+            contract_data: Dictionary containing:
+                - contract_name: Name/title of contract
+                - contract_type: Type (e.g., services, sale, license)
+                - contract_text: Full contract text
+                - parties: Contracting parties
+                - party_role: Client's role (buyer, seller, etc.)
+                - jurisdiction: Applicable jurisdiction
+                - industry: Industry context
+
+        Returns:
+            Comprehensive contract analysis
+        """
+        logger.info(f"Analyzing contract: {contract_data.get('contract_name', 'Unknown')[:50]}")
+        result = self._dispatch('analyze_contract', contract_data, bypass_cache)
+        logger.info("Contract analysis completed")
+        return result
+
+    def analyze_contract_stream(self, contract_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of analyze_contract
+
+        Yields the analysis as Gemini generates it, so callers can render
+        output before the full analysis is complete. Shares cache entries
+        with analyze_contract.
+        """
+        prompt = self._format_contract_analysis_prompt(contract_data)
+        logger.info(f"Streaming contract analysis: {contract_data.get('contract_name', 'Unknown')[:50]}")
 
         try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
+            yield from self._stream('analyze_contract', contract_data, prompt, bypass_cache)
+            logger.info("Contract analysis completed")
         except Exception as e:
-            logger.error(f"Negotiation strategy generation failed: {str(e)}")
+            logger.error(f"Contract analysis failed: {str(e)}")
+            raise
+
+    def analyze_contract_sections(self, contract_data: dict, bypass_cache: bool = False) -> Iterator[Tuple[str, str]]:
+        """
+        Streaming variant of analyze_contract that yields whole report sections
+
+        Yields (heading, body) pairs for each '### ' section of the analysis
+        (Executive Summary, Risk Matrix, ...) as soon as the next one starts,
+        so downstream parsing can begin before generation finishes.
+        """
+        splitter = HeadingSplitter()
+        for chunk in self.analyze_contract_stream(contract_data, bypass_cache):
+            yield from splitter.feed(chunk)
+        yield from splitter.close()
+
+    @cached_llm_call
+    def assess_contract_risk(self, contract_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Focused risk assessment of contract
+
+        Args:
+            contract_data: Contract information
+
+        Returns:
+            Detailed risk assessment
+        """
+        return self._dispatch('assess_contract_risk', contract_data, bypass_cache)
+
+    @cached_llm_call
+    def review_specific_clause(self, clause_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Analyze a specific contract clause
+
+        Args:
+            clause_data: Information about specific clause
+
+        Returns:
+            Clause analysis and recommendations
+        """
+        return self._dispatch('review_specific_clause', clause_data, bypass_cache)
+
+    @cached_llm_call
+    def compare_contracts(self, comparison_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Compare multiple contract versions or similar contracts
+
+        Contracts too long for one comparison prompt (over COMPARISON_TEXT_TOKEN_BUDGET)
+        are summarized in parallel on the fast tier, then compared by their summaries.
+
+        Args:
+            comparison_data: Data for contract comparison
+
+        Returns:
+            Comparative analysis
+        """
+        if not self._needs_map_reduce(comparison_data):
+            return self._dispatch('compare_contracts', comparison_data, bypass_cache)
+
+        # Map: summarize both contracts in parallel; reduce: compare the summaries
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            summary_a, summary_b = pool.map(
+                lambda side: self._dispatch('summarize_contract', _contract_side(comparison_data, side), bypass_cache),
+                ('a', 'b')
+            )
+        return self._run('compare_contracts', _SUMMARY_COMPARISON_TEMPLATE.render(
+            comparison_data, summary_a=summary_a, summary_b=summary_b
+        ), bypass_cache)
+
+    @cached_llm_call
+    def generate_negotiation_strategy(self, contract_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Generate negotiation strategy for contract
+
+        Args:
+            contract_data: Contract information and business context
+
+        Returns:
+            Negotiation strategy and talking points
+        """
+        return self._dispatch('generate_negotiation_strategy', contract_data, bypass_cache)
+
+    @cached_llm_call
+    async def aanalyze_contract(self, contract_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of analyze_contract"""
+        logger.info(f"Analyzing contract: {contract_data.get('contract_name', 'Unknown')[:50]}")
+        result = await self._adispatch('analyze_contract', contract_data, bypass_cache)
+        logger.info("Contract analysis completed")
+        return result
+
+    async def aanalyze_contract_stream(self, contract_data: dict, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of analyze_contract_stream"""
+        prompt = self._format_contract_analysis_prompt(contract_data)
+        logger.info(f"Streaming contract analysis: {contract_data.get('contract_name', 'Unknown')[:50]}")
+
+        try:
+            async for chunk in self._astream('analyze_contract', contract_data, prompt, bypass_cache):
+                yield chunk
+            logger.info("Contract analysis completed")
+        except Exception as e:
+            logger.error(f"Contract analysis failed: {str(e)}")
             raise
 
+    async def aanalyze_contract_sections(self, contract_data: dict,
+                                         bypass_cache: bool = False) -> AsyncIterator[Tuple[str, str]]:
+        """Async variant of analyze_contract_sections"""
+        splitter = HeadingSplitter()
+        async for chunk in self.aanalyze_contract_stream(contract_data, bypass_cache):
+            for section in splitter.feed(chunk):
+                yield section
+        for section in splitter.close():
+            yield section
+
+    @cached_llm_call
+    async def aassess_contract_risk(self, contract_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of assess_contract_risk"""
+        return await self._adispatch('assess_contract_risk', contract_data, bypass_cache)
+
+    @cached_llm_call
+    async def areview_specific_clause(self, clause_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of review_specific_clause"""
+        return await self._adispatch('review_specific_clause', clause_data, bypass_cache)
+
+    @cached_llm_call
+    async def acompare_contracts(self, comparison_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of compare_contracts"""
+        if not self._needs_map_reduce(comparison_data):
+            return await self._adispatch('compare_contracts', comparison_data, bypass_cache)
+
+        summary_a, summary_b = await asyncio.gather(*[
+            self._adispatch('summarize_contract', _contract_side(comparison_data, side), bypass_cache)
+            for side in ('a', 'b')
+        ])
+        return await self._arun('compare_contracts', _SUMMARY_COMPARISON_TEMPLATE.render(
+            comparison_data, summary_a=summary_a, summary_b=summary_b
+        ), bypass_cache)
+
+    @cached_llm_call
+    async def agenerate_negotiation_strategy(self, contract_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of generate_negotiation_strategy"""
+        return await self._adispatch('generate_negotiation_strategy', contract_data, bypass_cache)
+
+    async def analyze_many(self, contracts: List[dict], concurrency: Optional[int] = None,
+                           interactive: bool = True) -> List[Optional[str]]:
+        """
+        Analyze several contracts concurrently
+
+        Args:
+            contracts: contract_data dictionaries, one per contract
+            concurrency: Maximum analyses in flight (defaults to GEMINI_MAX_CONCURRENCY)
+            interactive: False submits one Gemini batch job instead and waits for it, for at
+                most GEMINI_BATCH_TIMEOUT_SECONDS (cheaper, but results can take hours); if the
+                job cannot be submitted the contracts are analyzed online
+
+        Returns:
+            Analyses in the same order as contracts (None for batch requests that failed)
+        """
+        if not interactive:
+            try:
+                # Building and uploading the JSONL input blocks, so keep it off the event loop
+                job_name = await asyncio.to_thread(self.submit_offline_batch, contracts)
+            except Exception as e:
+                logger.warning(f"Gemini batch unavailable, analyzing contracts online: {str(e)}")
+            else:
+                return await asyncio.to_thread(self.poll_batch, job_name, config.GEMINI_BATCH_TIMEOUT_SECONDS)
+
+        semaphore = asyncio.Semaphore(concurrency or config.GEMINI_MAX_CONCURRENCY)
+
+        async def analyze(contract_data: dict) -> str:
+            async with semaphore:
+                return await self.aanalyze_contract(contract_data)
+
+        return await asyncio.gather(*[analyze(contract) for contract in contracts])
+
+    def submit_offline_batch(self, contracts: List[dict]) -> str:
+        """
+        Submit contract analyses as a Gemini batch job for non-interactive workloads
+
+        Args:
+            contracts: contract_data dictionaries, one per contract
+
+        Returns:
+            Batch job name for poll_batch
+        """
+        prompts = [self._format_contract_analysis_prompt(contract) for contract in contracts]
+
+        try:
+            return submit_batch(prompts, self._get_instructions(), display_name="contract-analysis")
+        except Exception as e:
+            logger.error(f"Contract batch submission failed: {str(e)}")
+            raise
+
+    def poll_batch(self, job_name: str, timeout: Optional[float] = None) -> List[Optional[str]]:
+        """
+        Wait for a batch job from submit_offline_batch and return its analyses
+
+        Args:
+            job_name: Name returned by submit_offline_batch
+            timeout: Seconds to wait before giving up (None waits until the job ends)
+
+        Returns:
+            Analyses in submission order (None for requests that failed)
+        """
+        try:
+            return wait_for_batch(job_name, timeout=timeout)
+        except Exception as e:
+            logger.error(f"Contract batch {job_name} failed: {str(e)}")
+            raise
+
+    def _build_prompt(self, method: str, data: dict) -> str:
+        """Render a method's prompt with its builder"""
+        return getattr(self, _OPERATIONS[method].builder)(data)
+
+    @staticmethod
+    def _needs_map_reduce(comparison_data: dict) -> bool:
+        """Whether either contract is too long to compare directly without truncation"""
+        return any(
+            estimate_tokens(str(comparison_data.get(f'contract_{side}_text') or '')) > config.COMPARISON_TEXT_TOKEN_BUDGET
+            for side in ('a', 'b')
+        )
+
+    @staticmethod
+    def _tier_for(method: str, data: dict) -> Tier:
+        """Model tier for a call: summaries and short clause reviews go to the fast tier, everything else to pro"""
+        if method == 'summarize_contract':
+            return 'fast'
+        if method == 'review_specific_clause':
+            clause_text = str(data.get('clause_text') or '')
+            if estimate_tokens(clause_text) <= config.CLAUSE_FAST_TIER_MAX_TOKENS:
+                return 'fast'
+        return 'pro'
+
+    def _dispatch(self, method: str, data: dict, bypass_cache: bool = False) -> str:
+        """Build a method's prompt and run it on the tier its input calls for"""
+        return self._run(method, self._build_prompt(method, data), bypass_cache, self._tier_for(method, data))
+
+    async def _adispatch(self, method: str, data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of _dispatch"""
+        return await self._arun(method, self._build_prompt(method, data), bypass_cache, self._tier_for(method, data))
+
+    @staticmethod
+    def _inflight_key(agent: Agent, prompt: str) -> str:
+        """Single-flight key for a prompt; namespaced since other agents send the same prompt with other instructions"""
+        return ResponseCache.make_key(f"contract-analysis\n{agent.model.id}\n{prompt}")
+
+    def _run(self, method: str, prompt: str, bypass_cache: bool = False, tier: Tier = 'pro') -> str:
+        """Run a prompt, serving near-duplicate prompts from the semantic cache where the method allows it"""
+        try:
+            vector = None
+            if _OPERATIONS[method].semantic and semantic_lookups_enabled() and not bypass_cache:
+                cached, vector = self._semantic_cache.lookup(method, prompt)
+                agent_metrics.incr(method, 'sem_miss' if cached is None else 'sem_hit')
+                if cached is not None:
+                    return cached
+
+            # Resolved once so retries reuse the same context-cached instructions
+            agent = self._instruction_cache.resolve(self.agent_fast if tier == 'fast' else self.agent)
+            # Identical prompts already in flight share one call, even with caching off or bypassed
+            result = single_flight.do(self._inflight_key(agent, prompt), lambda: invoke(agent, prompt))
+            if vector is not None and result:
+                self._semantic_cache.add(method, vector, result)
+            return result
+        except Exception as e:
+            logger.error(f"{_OPERATIONS[method].label} failed: {str(e)}")
+            raise
+
+    async def _arun(self, method: str, prompt: str, bypass_cache: bool = False, tier: Tier = 'pro') -> str:
+        """Async variant of _run"""
+        try:
+            vector = None
+            if _OPERATIONS[method].semantic and semantic_lookups_enabled() and not bypass_cache:
+                # Embedding is a blocking HTTP call; keep it off the event loop
+                cached, vector = await asyncio.to_thread(self._semantic_cache.lookup, method, prompt)
+                agent_metrics.incr(method, 'sem_miss' if cached is None else 'sem_hit')
+                if cached is not None:
+                    return cached
+
+            # First use creates the context cache over HTTP; keep it off the event loop
+            agent = await asyncio.to_thread(self._instruction_cache.resolve, self.agent_fast if tier == 'fast' else self.agent)
+            result = await single_flight.ado(self._inflight_key(agent, prompt), lambda: ainvoke(agent, prompt))
+            if vector is not None and result:
+                self._semantic_cache.add(method, vector, result)
+            return result
+        except Exception as e:
+            logger.error(f"{_OPERATIONS[method].label} failed: {str(e)}")
+            raise
+
+    def _stream(self, method: str, data: dict, prompt: str, bypass_cache: bool = False) -> Iterator[str]:
+        """Yield response text as it is generated, caching the assembled response under the same key as method"""
+        use_cache = config.ENABLE_CACHING and not bypass_cache
+        key = ResponseCache.make_call_key(method, self.agent.model.id, data)
+        if use_cache:
+            cached = self._cache.get_key(key)
+            if cached is not None:
+                yield cached
+                return
+
+        # A partially consumed stream cannot be retried, so only the breaker applies
+        gemini_breaker.before_call()
+        agent = self._instruction_cache.resolve(self.agent)
+        parts = []
+        for event in agent.run(prompt, stream=True, stream_events=True):
+            if event.event == "RunError":
+                error = LLMCallError.from_run(event.content or "Gemini streaming run failed")
+                if is_transient(error):
+                    gemini_breaker.record_failure()
+                raise error
+            if event.event == "RunContent" and event.content:
+                parts.append(event.content)
+                yield event.content
+            elif event.event == "RunCompleted":
+                record_usage(event)
+        gemini_breaker.record_success()
+
+        if use_cache and parts:
+            self._cache.set_key(key, "".join(parts))
+
+    async def _astream(self, method: str, data: dict, prompt: str, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of _stream"""
+        use_cache = config.ENABLE_CACHING and not bypass_cache
+        key = ResponseCache.make_call_key(method, self.agent.model.id, data)
+        if use_cache:
+            cached = self._cache.get_key(key)
+            if cached is not None:
+                yield cached
+                return
+
+        gemini_breaker.before_call()
+        agent = await asyncio.to_thread(self._instruction_cache.resolve, self.agent)
+        parts = []
+        async for event in agent.arun(prompt, stream=True, stream_events=True):
+            if event.event == "RunError":
+                error = LLMCallError.from_run(event.content or "Gemini streaming run failed")
+                if is_transient(error):
+                    gemini_breaker.record_failure()
+                raise error
+            if event.event == "RunContent" and event.content:
+                parts.append(event.content)
+                yield event.content
+            elif event.event == "RunCompleted":
+                record_usage(event)
+        gemini_breaker.record_success()
+
+        if use_cache and parts:
+            self._cache.set_key(key, "".join(parts))
+
     def _format_contract_analysis_prompt(self, contract_data: dict) -> str:
         """Format comprehensive contract analysis prompt"""
-        prompt = f"""
-Perform a comprehensive analysis of the following contract:
-
-## Contract Information
-**Contract Name**: {contract_data.get('contract_name', 'Unknown')}
-**Contract Type**: {contract_data.get('contract_type', 'Unknown')}
-**Parties**: {contract_data.get('parties', 'Not specified')}
-**Our Role**: {contract_data.get('party_role', 'Not specified')}
-**Jurisdiction**: {contract_data.get('jurisdiction', 'Not specified')}
-**Industry**: {contract_data.get('industry', 'General')}
+        return _ANALYSIS_TEMPLATE.render(contract_data)
+
+    def _format_risk_prompt(self, contract_data: dict) -> str:
+        """Format contract risk assessment prompt"""
+        return _RISK_TEMPLATE.render(
+            contract_data,
+            contract_text=truncate_to_tokens(
+                _RISK_TEMPLATE.value(contract_data, 'contract_text'), config.CONTRACT_TEXT_TOKEN_BUDGET
+            ),
+            risk_categories=_RISK_CATEGORIES
+        )
 
-## Full Contract Text
-{contract_data.get('contract_text', 'Not provided')}
+    def _format_clause_prompt(self, clause_data: dict) -> str:
+        """Format clause review prompt"""
+        return _CLAUSE_TEMPLATE.render(clause_data)
+
+    def _format_comparison_prompt(self, comparison_data: dict) -> str:
+        """Format contract comparison prompt"""
+        budget = config.COMPARISON_TEXT_TOKEN_BUDGET
+        return _COMPARISON_TEMPLATE.render(
+            comparison_data,
+            contract_a_text=truncate_to_tokens(_COMPARISON_TEMPLATE.value(comparison_data, 'contract_a_text'), budget),
+            contract_b_text=truncate_to_tokens(_COMPARISON_TEMPLATE.value(comparison_data, 'contract_b_text'), budget)
+        )
 
-## Analysis Requirements
-Provide comprehensive analysis following your analytical framework. Focus on:
-- Executive summary with key findings
-- Detailed section-by-section review
-- Risk assessment with specific risk ratings
-- Recommended changes with specific language
-- Negotiation strategy and priorities
+    def _format_summary_prompt(self, contract_data: dict) -> str:
+        """Format the per-contract summary prompt for map-reduce comparison"""
+        return _CONTRACT_SUMMARY_TEMPLATE.render(
+            contract_data,
+            contract_text=truncate_to_tokens(
+                _CONTRACT_SUMMARY_TEMPLATE.value(contract_data, 'contract_text'), config.CONTRACT_TEXT_TOKEN_BUDGET
+            )
+        )
 
-Ensure analysis is practical, specific, and actionable for business decision-making.
-"""
-        return prompt
+    def _format_negotiation_prompt(self, contract_data: dict) -> str:
+        """Format negotiation strategy prompt"""
+        return _NEGOTIATION_TEMPLATE.render(contract_data, key_issues=self._format_issues(contract_data.get('key_issues', [])))
 
     def _format_issues(self, issues: list) -> str:
         """Format list of issues"""
         if not issues:
             return "No specific issues provided"
+        return "".join(f"{i}. {issue}\n" for i, issue in enumerate(issues, 1))
+
+
+def _contract_side(comparison_data: dict, side: str) -> dict:
+    """One contract ('a' or 'b') of a comparison, as input for the summary prompt"""
+    return {
+        'contract_name': comparison_data.get(f'contract_{side}_name', f'Version {side.upper()}'),
+        'contract_text': comparison_data.get(f'contract_{side}_text', 'Not provided'),
+    }
+
+
+# Agent instance, created on first use so importing this module stays cheap
+_contract_agent: Optional[ContractAnalysisAgent] = None
+_contract_agent_lock = threading.Lock()
+
 
-        formatted = ""
-        for i, issue in enumerate(issues, 1):
-            formatted += f"{i}. {issue}\n"
-        return formatted
+def get_contract_agent() -> ContractAnalysisAgent:
+    """Return the shared contract agent, constructing it on first call"""
+    global _contract_agent
+    if _contract_agent is None:
+        with _contract_agent_lock:
+            if _contract_agent is None:
+                _contract_agent = ContractAnalysisAgent()
+    return _contract_agent
 
 
-# Global agent instance
-contract_agent = ContractAnalysisAgent()
+def __getattr__(name):
+    # Keeps `from agents.contract_analysis_agent import contract_agent` working
+    if name == "contract_agent":
+        return get_contract_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,32 +2,54 @@
 Legal Drafting Agent
 Specializes in drafting legal documents, motions, briefs, and correspondence
 """
+import asyncio
+import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, ClassVar, Dict, Final, Iterator, List, NamedTuple, Optional, Tuple, Union
 from agno.agent import Agent
-from agno.models.google import Gemini
 from config import config
+from agents._batch import BatchProcessor
+from agents._cache import ResponseCache, build_response_cache, cached_llm_call
+from agents._gemini_batch import submit_batch, wait_for_batch
+from agents._gemini_pool import build_gemini
+from agents._prompt_utils import PromptTemplate
+from agents._llm import LLMCallError, ainvoke, gemini_breaker, invoke, is_transient, record_usage
 
 logger = logging.getLogger(__name__)
 
+# Version tag for persisted responses; bump whenever _INSTRUCTIONS or a prompt builder changes
+PROMPT_VERSION: Final[str] = "v1"
 
-class LegalDraftingAgent:
-    """
-    AI Agent specialized in legal document drafting
-    """
 
-    def __init__(self):
-        """Initialize Legal Drafting Agent"""
-        self.agent = Agent(
-            name="Legal Drafting Specialist",
-            model=Gemini(id=config.AI_MODEL, api_key=config.GEMINI_API_KEY),
-            instructions=self._get_instructions(),
-            markdown=True
-        )
-        logger.info("Legal Drafting Agent initialized")
+class _DocumentKind(NamedTuple):
+    """A document type's drafting method (its async twin is a<method>) and prompt builder"""
+    method: str
+    builder: str
 
-    def _get_instructions(self) -> str:
-        """Get comprehensive instructions for the agent"""
-        return """
+
+# Document types accepted by draft_bundle and draft_batch
+_DOCUMENT_KINDS: Final[Dict[str, _DocumentKind]] = {
+    'memo': _DocumentKind('draft_legal_memo', '_format_memo_prompt'),
+    'motion': _DocumentKind('draft_motion', '_format_motion_prompt'),
+    'demand_letter': _DocumentKind('draft_demand_letter', '_format_demand_letter_prompt'),
+    'contract_clause': _DocumentKind('draft_contract_clause', '_format_clause_prompt'),
+    'writing_review': _DocumentKind('improve_legal_writing', '_format_writing_review_prompt'),
+}
+
+
+class _OfflineJob(NamedTuple):
+    """A submitted batch: job name (None when every item was cached), cache keys, results so far and uncached positions"""
+    job_name: Optional[str]
+    keys: List[str]
+    results: List[Union[str, Exception, None]]
+    pending: List[int]
+
+
+# Static system instructions, built once at import and shared by every instance
+_INSTRUCTIONS: Final[str] = """
 You are an expert Legal Drafting Specialist with mastery in legal writing,
 document preparation, and persuasive advocacy. Your role is to help lawyers
 draft clear, effective, and professionally formatted legal documents.
@@ -267,41 +289,32 @@ Produce documents that are professional, persuasive, and ready for filing or exe
 with minimal editing required.
 """
 
-    def draft_legal_memo(self, memo_data: dict) -> str:
-        """
-        Draft a legal memorandum
 
-        Args:
-            memo_data: Dictionary containing:
-                - question: Legal question to address
-                - facts: Relevant facts
-                - jurisdiction: Applicable jurisdiction
-                - applicable_law: Relevant statutes, cases
-                - purpose: Purpose of memo (research, client advice, etc.)
+# Focus areas for improve_legal_writing when the caller names none
+_DEFAULT_FOCUS_AREAS = ('Clarity', 'Conciseness', 'Persuasiveness')
 
-        Returns:
-            Drafted legal memorandum
-        """
-        prompt = f"""
+# Prompt templates, rendered with per-field fallbacks for anything missing from the input
+
+_MEMO_TEMPLATE = PromptTemplate("""
 Draft a legal memorandum addressing the following:
 
 ## Memo Parameters
-**To**: {memo_data.get('recipient', 'Senior Partner')}
-**From**: {memo_data.get('author', 'Associate')}
-**Re**: {memo_data.get('subject', 'Legal Research Memorandum')}
-**Date**: {memo_data.get('date', 'Today')}
+**To**: {recipient}
+**From**: {author}
+**Re**: {subject}
+**Date**: {date}
 
 ## Question Presented
-{memo_data.get('question', 'Not specified')}
+{question}
 
 ## Facts
-{memo_data.get('facts', 'Not provided')}
+{facts}
 
 ## Applicable Law
-**Jurisdiction**: {memo_data.get('jurisdiction', 'Not specified')}
-**Statutes**: {', '.join(memo_data.get('statutes', []))}
+**Jurisdiction**: {jurisdiction}
+**Statutes**: {statutes}
 **Relevant Cases**:
-{self._format_cases_list(memo_data.get('cases', []))}
+{cases}
 
 ## Analysis Required
 Draft a complete legal memorandum following standard format:
@@ -313,53 +326,39 @@ Draft a complete legal memorandum following standard format:
 
 Use objective tone, analyze both favorable and unfavorable authorities,
 provide realistic assessment. Cite cases and statutes properly.
-"""
-
-        logger.info(f"Drafting legal memo: {memo_data.get('subject', 'Unknown')[:50]}")
-
-        try:
-            response = self.agent.run(prompt)
-            logger.info("Legal memo drafting completed")
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Legal memo drafting failed: {str(e)}")
-            raise
-
-    def draft_motion(self, motion_data: dict) -> str:
-        """
-        Draft a legal motion
-
-        Args:
-            motion_data: Information about motion to draft
-
-        Returns:
-            Drafted motion
-        """
-        prompt = f"""
+""", {
+    'recipient': 'Senior Partner',
+    'author': 'Associate',
+    'subject': 'Legal Research Memorandum',
+    'date': 'Today',
+    'facts': 'Not provided',
+}, fallback='Not specified')
+
+_MOTION_TEMPLATE = PromptTemplate("""
 Draft a motion for filing in court:
 
 ## Court Information
-**Court**: {motion_data.get('court', 'Not specified')}
-**Case Number**: {motion_data.get('case_number', 'XX-XXXX-XXXXXX')}
-**Case Caption**: {motion_data.get('case_caption', 'Plaintiff v. Defendant')}
+**Court**: {court}
+**Case Number**: {case_number}
+**Case Caption**: {case_caption}
 
 ## Motion Type
-{motion_data.get('motion_type', 'Not specified')}
+{motion_type}
 
 ## Relief Sought
-{motion_data.get('relief_sought', 'Not specified')}
+{relief_sought}
 
 ## Factual Background
-{motion_data.get('facts', 'Not provided')}
+{facts}
 
 ## Legal Basis
-**Applicable Rules**: {', '.join(motion_data.get('rules', []))}
+**Applicable Rules**: {rules}
 **Supporting Cases**:
-{self._format_cases_list(motion_data.get('cases', []))}
-**Statutes**: {', '.join(motion_data.get('statutes', []))}
+{cases}
+**Statutes**: {statutes}
 
 ## Arguments
-{self._format_arguments(motion_data.get('arguments', []))}
+{arguments}
 
 ## Draft Requirements
 Create a complete motion including:
@@ -374,55 +373,39 @@ Create a complete motion including:
 
 Use persuasive but professional tone. Cite authorities properly.
 Organize arguments logically with strongest first.
-"""
-
-        logger.info(f"Drafting motion: {motion_data.get('motion_type', 'Unknown')}")
-
-        try:
-            response = self.agent.run(prompt)
-            logger.info("Motion drafting completed")
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Motion drafting failed: {str(e)}")
-            raise
-
-    def draft_demand_letter(self, demand_data: dict) -> str:
-        """
-        Draft a demand letter
-
-        Args:
-            demand_data: Information for demand letter
+""", {
+    'case_number': 'XX-XXXX-XXXXXX',
+    'case_caption': 'Plaintiff v. Defendant',
+    'facts': 'Not provided',
+}, fallback='Not specified')
 
-        Returns:
-            Drafted demand letter
-        """
-        prompt = f"""
+_DEMAND_LETTER_TEMPLATE = PromptTemplate("""
 Draft a demand letter:
 
 ## Client Information
-**Client**: {demand_data.get('client_name', 'Our Client')}
-**Client Position**: {demand_data.get('client_position', 'Not specified')}
+**Client**: {client_name}
+**Client Position**: {client_position}
 
 ## Recipient Information
-**Recipient**: {demand_data.get('recipient_name', 'Recipient')}
-**Recipient Address**: {demand_data.get('recipient_address', '[Address]')}
+**Recipient**: {recipient_name}
+**Recipient Address**: {recipient_address}
 
 ## Matter
-**Subject**: {demand_data.get('subject', 'Legal Matter')}
-**Facts**: {demand_data.get('facts', 'Not provided')}
+**Subject**: {subject}
+**Facts**: {facts}
 
 ## Legal Basis
-{demand_data.get('legal_basis', 'Not provided')}
+{legal_basis}
 
 ## Damages/Relief
-{demand_data.get('damages', 'Not specified')}
+{damages}
 
 ## Demand
-**Amount/Action Demanded**: {demand_data.get('demand', 'Not specified')}
-**Deadline**: {demand_data.get('deadline', 'Not specified')}
+**Amount/Action Demanded**: {demand}
+**Deadline**: {deadline}
 
 ## Tone
-{demand_data.get('tone', 'Firm but professional')}
+{tone}
 
 ## Draft Requirements
 Create a professional demand letter that:
@@ -436,48 +419,36 @@ Create a professional demand letter that:
 8. Includes proper closing and signature
 
 Letter should be persuasive but professional, firm but not inflammatory.
-"""
-
-        logger.info(f"Drafting demand letter: {demand_data.get('subject', 'Unknown')[:50]}")
-
-        try:
-            response = self.agent.run(prompt)
-            logger.info("Demand letter drafting completed")
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Demand letter drafting failed: {str(e)}")
-            raise
-
-    def draft_contract_clause(self, clause_data: dict) -> str:
-        """
-        Draft a specific contract clause
-
-        Args:
-            clause_data: Information about clause to draft
-
-        Returns:
-            Drafted contract clause
-        """
-        prompt = f"""
+""", {
+    'client_name': 'Our Client',
+    'recipient_name': 'Recipient',
+    'recipient_address': '[Address]',
+    'subject': 'Legal Matter',
+    'facts': 'Not provided',
+    'legal_basis': 'Not provided',
+    'tone': 'Firm but professional',
+}, fallback='Not specified')
+
+_CLAUSE_TEMPLATE = PromptTemplate("""
 Draft a contract clause:
 
 ## Clause Type
-{clause_data.get('clause_type', 'Not specified')}
+{clause_type}
 
 ## Purpose
-{clause_data.get('purpose', 'Not specified')}
+{purpose}
 
 ## Context
-**Contract Type**: {clause_data.get('contract_type', 'General')}
-**Party Favored**: {clause_data.get('party_favored', 'Balanced')}
-**Jurisdiction**: {clause_data.get('jurisdiction', 'Not specified')}
-**Industry**: {clause_data.get('industry', 'General')}
+**Contract Type**: {contract_type}
+**Party Favored**: {party_favored}
+**Jurisdiction**: {jurisdiction}
+**Industry**: {industry}
 
 ## Requirements
-{clause_data.get('requirements', 'Not provided')}
+{requirements}
 
 ## Additional Considerations
-{clause_data.get('considerations', 'None specified')}
+{considerations}
 
 ## Drafting Task
 Draft a complete, professional contract clause that:
@@ -495,43 +466,29 @@ Provide:
 
 Use proper contract language: "shall" for obligations, "may" for discretion,
 defined terms, clear structure.
-"""
-
-        logger.info(f"Drafting contract clause: {clause_data.get('clause_type', 'Unknown')}")
-
-        try:
-            response = self.agent.run(prompt)
-            logger.info("Contract clause drafting completed")
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Contract clause drafting failed: {str(e)}")
-            raise
-
-    def improve_legal_writing(self, writing_data: dict) -> str:
-        """
-        Review and improve legal writing
-
-        Args:
-            writing_data: Text to review and suggestions
-
-        Returns:
-            Improved version with explanations
-        """
-        prompt = f"""
+""", {
+    'contract_type': 'General',
+    'party_favored': 'Balanced',
+    'industry': 'General',
+    'requirements': 'Not provided',
+    'considerations': 'None specified',
+}, fallback='Not specified')
+
+_WRITING_REVIEW_TEMPLATE = PromptTemplate("""
 Review and improve the following legal writing:
 
 ## Document Type
-{writing_data.get('document_type', 'Legal document')}
+{document_type}
 
 ## Original Text
-{writing_data.get('original_text', 'Not provided')}
+{original_text}
 
 ## Improvement Focus
-{', '.join(writing_data.get('focus_areas', ['Clarity', 'Conciseness', 'Persuasiveness']))}
+{focus_areas}
 
 ## Context
-**Audience**: {writing_data.get('audience', 'Not specified')}
-**Purpose**: {writing_data.get('purpose', 'Not specified')}
+**Audience**: {audience}
+**Purpose**: {purpose}
 
 ## Review Task
 Provide:
@@ -551,41 +508,619 @@ Focus on:
 - Citation format
 
 Provide side-by-side comparison for key passages showing before and after.
-"""
+""", {
+    'document_type': 'Legal document',
+    'original_text': 'Not provided',
+}, fallback='Not specified')
+
+
+class LegalDraftingAgent:
+    """
+    AI Agent specialized in legal document drafting
+    """
+
+    # Agno agent shared by every instance; instances differ only in their caches
+    _shared_agent: ClassVar[Optional[Agent]] = None
+    _shared_agent_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self):
+        """Initialize Legal Drafting Agent"""
+        self.agent = self._get_shared_agent()
+        self._cache = build_response_cache(PROMPT_VERSION)
+        logger.info("Legal Drafting Agent initialized")
+
+    @classmethod
+    def _get_shared_agent(cls) -> Agent:
+        """Return the class-wide Agno agent, building it on first call"""
+        if cls._shared_agent is None:
+            with cls._shared_agent_lock:
+                if cls._shared_agent is None:
+                    cls._shared_agent = Agent(
+                        name="Legal Drafting Specialist",
+                        model=build_gemini(),
+                        instructions=cls._get_instructions(),
+                        markdown=True
+                    )
+        return cls._shared_agent
+
+    def clear_cache(self) -> None:
+        """Drop every cached draft (with CACHE_BACKEND=sqlite this clears the shared cache file)"""
+        self._cache.clear()
+
+    @classmethod
+    def _get_instructions(cls) -> str:
+        """Get comprehensive instructions for the agent"""
+        return _INSTRUCTIONS
+
+    @cached_llm_call
+    def draft_legal_memo(self, memo_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Draft a legal memorandum
+
+        Args:
+            memo_data: Dictionary containing:
+                - question: Legal question to address
+                - facts: Relevant facts
+                - jurisdiction: Applicable jurisdiction
+                - applicable_law: Relevant statutes, cases
+                - purpose: Purpose of memo (research, client advice, etc.)
+
+        Returns:
+            Drafted legal memorandum
+        """
+        prompt = self._format_memo_prompt(memo_data)
+        logger.info("Drafting legal memo: %.50s", memo_data.get('subject', 'Unknown'))
+        return self._run("Legal memo drafting", prompt)
+
+    def draft_legal_memo_stream(self, memo_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of draft_legal_memo
+
+        Yields the draft as Gemini generates it. Shares cache entries with draft_legal_memo.
+        """
+        prompt = self._format_memo_prompt(memo_data)
+        logger.info("Streaming legal memo: %.50s", memo_data.get('subject', 'Unknown'))
+
+        try:
+            yield from self._stream('draft_legal_memo', memo_data, prompt, bypass_cache)
+            logger.info("Legal memo drafting completed")
+        except Exception as e:
+            logger.error(f"Legal memo drafting failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    def draft_motion(self, motion_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Draft a legal motion
+
+        Args:
+            motion_data: Information about motion to draft
+
+        Returns:
+            Drafted motion
+        """
+        prompt = self._format_motion_prompt(motion_data)
+        logger.info("Drafting motion: %s", motion_data.get('motion_type', 'Unknown'))
+        return self._run("Motion drafting", prompt)
+
+    def draft_motion_stream(self, motion_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of draft_motion
+
+        Yields the draft as Gemini generates it. Shares cache entries with draft_motion.
+        """
+        prompt = self._format_motion_prompt(motion_data)
+        logger.info("Streaming motion: %s", motion_data.get('motion_type', 'Unknown'))
+
+        try:
+            yield from self._stream('draft_motion', motion_data, prompt, bypass_cache)
+            logger.info("Motion drafting completed")
+        except Exception as e:
+            logger.error(f"Motion drafting failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    def draft_demand_letter(self, demand_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Draft a demand letter
+
+        Args:
+            demand_data: Information for demand letter
 
+        Returns:
+            Drafted demand letter
+        """
+        prompt = self._format_demand_letter_prompt(demand_data)
+        logger.info("Drafting demand letter: %.50s", demand_data.get('subject', 'Unknown'))
+        return self._run("Demand letter drafting", prompt)
+
+    def draft_demand_letter_stream(self, demand_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of draft_demand_letter
+
+        Yields the draft as Gemini generates it. Shares cache entries with draft_demand_letter.
+        """
+        prompt = self._format_demand_letter_prompt(demand_data)
+        logger.info("Streaming demand letter: %.50s", demand_data.get('subject', 'Unknown'))
+
+        try:
+            yield from self._stream('draft_demand_letter', demand_data, prompt, bypass_cache)
+            logger.info("Demand letter drafting completed")
+        except Exception as e:
+            logger.error(f"Demand letter drafting failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    def draft_contract_clause(self, clause_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Draft a specific contract clause
+
+        Args:
+            clause_data: Information about clause to draft
+
+        Returns:
+            Drafted contract clause
+        """
+        prompt = self._format_clause_prompt(clause_data)
+        logger.info("Drafting contract clause: %s", clause_data.get('clause_type', 'Unknown'))
+        return self._run("Contract clause drafting", prompt)
+
+    def warm_clause_cache(self, clauses: List[dict], concurrency: int = 3) -> int:
+        """
+        Draft clauses ahead of time so identical requests are served from the response cache
+
+        Args:
+            clauses: clause_data dictionaries, exactly as callers will pass them to draft_contract_clause
+            concurrency: Drafts in flight
+
+        Returns:
+            Number of clauses now cached
+        """
+        def warm(clause_data: dict) -> bool:
+            try:
+                self.draft_contract_clause(clause_data)
+                return True
+            except Exception as e:
+                logger.warning(f"Warming {clause_data.get('clause_type', 'Unknown')} clause failed: {str(e)}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            warmed = sum(pool.map(warm, clauses))
+        logger.info("Clause cache warmed with %d of %d clauses", warmed, len(clauses))
+        return warmed
+
+    def start_clause_warmup(self) -> None:
+        """Warm the clause cache from WARM_CLAUSES_PATH in a background thread, if enabled"""
+        if not (config.WARM_CLAUSE_CACHE and config.ENABLE_CACHING and config.WARM_CLAUSES_PATH):
+            return
+        try:
+            with open(Path(config.WARM_CLAUSES_PATH).expanduser(), encoding='utf-8') as f:
+                clauses = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Clause cache warm-up skipped: {str(e)}")
+            return
+        threading.Thread(target=self.warm_clause_cache, args=(clauses,), name="clause-cache-warmup", daemon=True).start()
+
+    def draft_contract_clause_stream(self, clause_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of draft_contract_clause
+
+        Yields the draft as Gemini generates it. Shares cache entries with draft_contract_clause.
+        """
+        prompt = self._format_clause_prompt(clause_data)
+        logger.info("Streaming contract clause: %s", clause_data.get('clause_type', 'Unknown'))
+
+        try:
+            yield from self._stream('draft_contract_clause', clause_data, prompt, bypass_cache)
+            logger.info("Contract clause drafting completed")
+        except Exception as e:
+            logger.error(f"Contract clause drafting failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    def improve_legal_writing(self, writing_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Review and improve legal writing
+
+        Args:
+            writing_data: Text to review and suggestions
+
+        Returns:
+            Improved version with explanations
+        """
+        prompt = self._format_writing_review_prompt(writing_data)
         logger.info("Reviewing and improving legal writing")
+        return self._run("Legal writing improvement", prompt)
+
+    def improve_legal_writing_stream(self, writing_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of improve_legal_writing
+
+        Yields the draft as Gemini generates it. Shares cache entries with improve_legal_writing.
+        """
+        prompt = self._format_writing_review_prompt(writing_data)
+        logger.info("Streaming review of legal writing")
 
         try:
-            response = self.agent.run(prompt)
+            yield from self._stream('improve_legal_writing', writing_data, prompt, bypass_cache)
             logger.info("Legal writing improvement completed")
-            return response.content if hasattr(response, 'content') else str(response)
         except Exception as e:
             logger.error(f"Legal writing improvement failed: {str(e)}")
             raise
 
+    @cached_llm_call
+    async def adraft_legal_memo(self, memo_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of draft_legal_memo"""
+        prompt = self._format_memo_prompt(memo_data)
+        logger.info("Drafting legal memo: %.50s", memo_data.get('subject', 'Unknown'))
+        return await self._arun("Legal memo drafting", prompt)
+
+    async def adraft_legal_memo_stream(self, memo_data: dict, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of draft_legal_memo_stream"""
+        prompt = self._format_memo_prompt(memo_data)
+        logger.info("Streaming legal memo: %.50s", memo_data.get('subject', 'Unknown'))
+
+        try:
+            async for chunk in self._astream('draft_legal_memo', memo_data, prompt, bypass_cache):
+                yield chunk
+            logger.info("Legal memo drafting completed")
+        except Exception as e:
+            logger.error(f"Legal memo drafting failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    async def adraft_motion(self, motion_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of draft_motion"""
+        prompt = self._format_motion_prompt(motion_data)
+        logger.info("Drafting motion: %s", motion_data.get('motion_type', 'Unknown'))
+        return await self._arun("Motion drafting", prompt)
+
+    async def adraft_motion_stream(self, motion_data: dict, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of draft_motion_stream"""
+        prompt = self._format_motion_prompt(motion_data)
+        logger.info("Streaming motion: %s", motion_data.get('motion_type', 'Unknown'))
+
+        try:
+            async for chunk in self._astream('draft_motion', motion_data, prompt, bypass_cache):
+                yield chunk
+            logger.info("Motion drafting completed")
+        except Exception as e:
+            logger.error(f"Motion drafting failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    async def adraft_demand_letter(self, demand_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of draft_demand_letter"""
+        prompt = self._format_demand_letter_prompt(demand_data)
+        logger.info("Drafting demand letter: %.50s", demand_data.get('subject', 'Unknown'))
+        return await self._arun("Demand letter drafting", prompt)
+
+    async def adraft_demand_letter_stream(self, demand_data: dict, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of draft_demand_letter_stream"""
+        prompt = self._format_demand_letter_prompt(demand_data)
+        logger.info("Streaming demand letter: %.50s", demand_data.get('subject', 'Unknown'))
+
+        try:
+            async for chunk in self._astream('draft_demand_letter', demand_data, prompt, bypass_cache):
+                yield chunk
+            logger.info("Demand letter drafting completed")
+        except Exception as e:
+            logger.error(f"Demand letter drafting failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    async def adraft_contract_clause(self, clause_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of draft_contract_clause"""
+        prompt = self._format_clause_prompt(clause_data)
+        logger.info("Drafting contract clause: %s", clause_data.get('clause_type', 'Unknown'))
+        return await self._arun("Contract clause drafting", prompt)
+
+    async def adraft_contract_clause_stream(self, clause_data: dict, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of draft_contract_clause_stream"""
+        prompt = self._format_clause_prompt(clause_data)
+        logger.info("Streaming contract clause: %s", clause_data.get('clause_type', 'Unknown'))
+
+        try:
+            async for chunk in self._astream('draft_contract_clause', clause_data, prompt, bypass_cache):
+                yield chunk
+            logger.info("Contract clause drafting completed")
+        except Exception as e:
+            logger.error(f"Contract clause drafting failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    async def aimprove_legal_writing(self, writing_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of improve_legal_writing"""
+        prompt = self._format_writing_review_prompt(writing_data)
+        logger.info("Reviewing and improving legal writing")
+        return await self._arun("Legal writing improvement", prompt)
+
+    async def aimprove_legal_writing_stream(self, writing_data: dict, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of improve_legal_writing_stream"""
+        prompt = self._format_writing_review_prompt(writing_data)
+        logger.info("Streaming review of legal writing")
+
+        try:
+            async for chunk in self._astream('improve_legal_writing', writing_data, prompt, bypass_cache):
+                yield chunk
+            logger.info("Legal writing improvement completed")
+        except Exception as e:
+            logger.error(f"Legal writing improvement failed: {str(e)}")
+            raise
+
+    async def draft_bundle(self, spec: Dict[str, dict]) -> Dict[str, Union[str, Exception]]:
+        """
+        Draft several documents for a matter concurrently
+
+        Args:
+            spec: Document inputs keyed by document type ('memo', 'motion',
+                'demand_letter', 'contract_clause', 'writing_review')
+
+        Returns:
+            Drafts keyed by document type; a document whose drafting failed maps
+            to its exception so the other drafts are still returned
+        """
+        unknown = set(spec) - set(_DOCUMENT_KINDS)
+        if unknown:
+            raise ValueError(f"Unsupported document types: {', '.join(sorted(unknown))}")
+
+        kinds = list(spec)
+        logger.info("Drafting bundle of %d documents", len(kinds))
+        results = await asyncio.gather(
+            *[getattr(self, f"a{_DOCUMENT_KINDS[kind].method}")(spec[kind]) for kind in kinds],
+            return_exceptions=True
+        )
+        return dict(zip(kinds, results))
+
+    async def draft_bundle_stream(self, spec: Dict[str, dict]) -> AsyncIterator[Tuple[str, Union[str, Exception]]]:
+        """
+        Streaming variant of draft_bundle
+
+        Yields (document type, draft) pairs as each draft finishes, so the first
+        document can be shown without waiting for the slowest. A failed document
+        yields its exception. Drafts still running are cancelled if the caller
+        stops iterating.
+        """
+        unknown = set(spec) - set(_DOCUMENT_KINDS)
+        if unknown:
+            raise ValueError(f"Unsupported document types: {', '.join(sorted(unknown))}")
+
+        async def draft(kind: str) -> Tuple[str, Union[str, Exception]]:
+            try:
+                return kind, await getattr(self, f"a{_DOCUMENT_KINDS[kind].method}")(spec[kind])
+            except Exception as e:
+                return kind, e
+
+        logger.info("Streaming bundle of %d documents", len(spec))
+        tasks = [asyncio.create_task(draft(kind)) for kind in spec]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def draft_batch(self, kind: str, items: List[dict],
+                          interactive: bool = False) -> List[Union[str, Exception]]:
+        """
+        Draft many documents of one type, e.g. demand letters to a list of counterparties
+
+        Uncached items go out as one Gemini batch job (half the online price, but results
+        can take hours; waiting stops after GEMINI_BATCH_TIMEOUT_SECONDS). If the job cannot
+        be submitted, or interactive is True, items are drafted through online calls under
+        the GEMINI_MAX_CONCURRENCY and GEMINI_REQUESTS_PER_MINUTE limits instead. Once a job
+        is accepted, errors collecting it are raised rather than paying for the drafts twice.
+
+        Args:
+            kind: Document type, as in draft_bundle
+            items: Input dictionaries for that type, one per document
+            interactive: Skip the Batch API and draft online
+
+        Returns:
+            Drafts in the same order as items; an item whose drafting failed maps
+            to its exception so the other drafts are still returned
+        """
+        document = _DOCUMENT_KINDS.get(kind)
+        if document is None:
+            raise ValueError(f"Unsupported document type: {kind}")
+
+        if not interactive:
+            try:
+                job = await asyncio.to_thread(self._submit_offline, document, items)
+            except Exception as e:
+                logger.warning(f"Gemini batch unavailable, drafting {kind} online: {str(e)}")
+            else:
+                return await asyncio.to_thread(self._collect_offline, job)
+
+        return await BatchProcessor(self).run_batch(document.method, items, return_exceptions=True)
+
+    def _submit_offline(self, document: _DocumentKind, items: List[dict]) -> _OfflineJob:
+        """Serve cached drafts and submit the rest as one Gemini batch job"""
+        keys = [ResponseCache.make_call_key(document.method, self.agent.model.id, item) for item in items]
+        results: List[Union[str, Exception, None]] = [
+            self._cache.get_key(key) if config.ENABLE_CACHING else None for key in keys
+        ]
+        pending = [index for index, result in enumerate(results) if result is None]
+        if not pending:
+            return _OfflineJob(None, keys, results, pending)
+
+        builder = getattr(self, document.builder)
+        job_name = submit_batch(
+            [builder(items[index]) for index in pending],
+            self._get_instructions(),
+            model_id=self.agent.model.id,
+            display_name=f"drafting-{document.method}"
+        )
+        return _OfflineJob(job_name, keys, results, pending)
+
+    def _collect_offline(self, job: _OfflineJob) -> List[Union[str, Exception]]:
+        """Wait for a submitted batch job and store its drafts in the response cache"""
+        job_name, keys, results, pending = job
+        if job_name is None:
+            return results
+
+        try:
+            drafts = wait_for_batch(job_name, timeout=config.GEMINI_BATCH_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.error(f"Collecting Gemini batch {job_name} failed: {str(e)}")
+            raise
+        for position, index in enumerate(pending):
+            draft = drafts[position] if position < len(drafts) else None
+            if draft is None:
+                results[index] = LLMCallError(f"Batch request {index} in {job_name} failed")
+                continue
+            results[index] = draft
+            if config.ENABLE_CACHING:
+                self._cache.set_key(keys[index], draft)
+        return results
+
+    def _run(self, label: str, prompt: str) -> str:
+        """Run a prompt with retries, logging completion or failure under label"""
+        try:
+            result = invoke(self.agent, prompt)
+            logger.info("%s completed", label)
+            return result
+        except Exception as e:
+            logger.error(f"{label} failed: {str(e)}")
+            raise
+
+    async def _arun(self, label: str, prompt: str) -> str:
+        """Async variant of _run"""
+        try:
+            result = await ainvoke(self.agent, prompt)
+            logger.info("%s completed", label)
+            return result
+        except Exception as e:
+            logger.error(f"{label} failed: {str(e)}")
+            raise
+
+    def _stream(self, method: str, data: dict, prompt: str, bypass_cache: bool = False) -> Iterator[str]:
+        """Yield response text as it is generated, caching the assembled response under the same key as method"""
+        use_cache = config.ENABLE_CACHING and not bypass_cache
+        key = ResponseCache.make_call_key(method, self.agent.model.id, data)
+        if use_cache:
+            cached = self._cache.get_key(key)
+            if cached is not None:
+                yield cached
+                return
+
+        # A partially consumed stream cannot be retried, so only the breaker applies
+        gemini_breaker.before_call()
+        parts = []
+        for event in self.agent.run(prompt, stream=True, stream_events=True):
+            if event.event == "RunError":
+                error = LLMCallError.from_run(event.content or "Gemini streaming run failed")
+                if is_transient(error):
+                    gemini_breaker.record_failure()
+                raise error
+            if event.event == "RunContent" and event.content:
+                parts.append(event.content)
+                yield event.content
+            elif event.event == "RunCompleted":
+                record_usage(event)
+        gemini_breaker.record_success()
+
+        if use_cache and parts:
+            self._cache.set_key(key, "".join(parts))
+
+    async def _astream(self, method: str, data: dict, prompt: str, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of _stream"""
+        use_cache = config.ENABLE_CACHING and not bypass_cache
+        key = ResponseCache.make_call_key(method, self.agent.model.id, data)
+        if use_cache:
+            cached = self._cache.get_key(key)
+            if cached is not None:
+                yield cached
+                return
+
+        gemini_breaker.before_call()
+        parts = []
+        async for event in self.agent.arun(prompt, stream=True, stream_events=True):
+            if event.event == "RunError":
+                error = LLMCallError.from_run(event.content or "Gemini streaming run failed")
+                if is_transient(error):
+                    gemini_breaker.record_failure()
+                raise error
+            if event.event == "RunContent" and event.content:
+                parts.append(event.content)
+                yield event.content
+            elif event.event == "RunCompleted":
+                record_usage(event)
+        gemini_breaker.record_success()
+
+        if use_cache and parts:
+            self._cache.set_key(key, "".join(parts))
+
+    def _format_memo_prompt(self, memo_data: dict) -> str:
+        """Format legal memorandum prompt"""
+        return _MEMO_TEMPLATE.render(
+            memo_data,
+            statutes=', '.join(memo_data.get('statutes', [])),
+            cases=self._format_cases_list(memo_data.get('cases', []))
+        )
+
+    def _format_motion_prompt(self, motion_data: dict) -> str:
+        """Format motion drafting prompt"""
+        return _MOTION_TEMPLATE.render(
+            motion_data,
+            rules=', '.join(motion_data.get('rules', [])),
+            cases=self._format_cases_list(motion_data.get('cases', [])),
+            statutes=', '.join(motion_data.get('statutes', [])),
+            arguments=self._format_arguments(motion_data.get('arguments', []))
+        )
+
+    def _format_demand_letter_prompt(self, demand_data: dict) -> str:
+        """Format demand letter prompt"""
+        return _DEMAND_LETTER_TEMPLATE.render(demand_data)
+
+    def _format_clause_prompt(self, clause_data: dict) -> str:
+        """Format contract clause drafting prompt"""
+        return _CLAUSE_TEMPLATE.render(clause_data)
+
+    def _format_writing_review_prompt(self, writing_data: dict) -> str:
+        """Format legal writing review prompt"""
+        return _WRITING_REVIEW_TEMPLATE.render(
+            writing_data,
+            focus_areas=', '.join(writing_data.get('focus_areas', _DEFAULT_FOCUS_AREAS))
+        )
+
     def _format_cases_list(self, cases: list) -> str:
         """Format list of cases"""
         if not cases:
             return "No cases provided"
 
-        formatted = ""
-        for case in cases:
-            if isinstance(case, dict):
-                formatted += f"- {case.get('name', 'Unknown')}, {case.get('citation', 'No citation')}\n"
-            else:
-                formatted += f"- {case}\n"
-        return formatted
+        return "".join(
+            f"- {case.get('name', 'Unknown')}, {case.get('citation', 'No citation')}\n"
+            if isinstance(case, dict) else f"- {case}\n"
+            for case in cases
+        )
 
     def _format_arguments(self, arguments: list) -> str:
         """Format list of arguments"""
         if not arguments:
             return "No specific arguments provided"
 
-        formatted = ""
-        for i, arg in enumerate(arguments, 1):
-            formatted += f"{i}. {arg}\n"
-        return formatted
+        return "".join(f"{i}. {arg}\n" for i, arg in enumerate(arguments, 1))
+
+
+# Agent instance, created on first use so importing this module stays cheap
+_drafting_agent: Optional[LegalDraftingAgent] = None
+_drafting_agent_lock = threading.Lock()
+
+
+def get_drafting_agent() -> LegalDraftingAgent:
+    """Return the shared drafting agent, constructing it on first call"""
+    global _drafting_agent
+    if _drafting_agent is None:
+        with _drafting_agent_lock:
+            if _drafting_agent is None:
+                _drafting_agent = LegalDraftingAgent()
+                _drafting_agent.start_clause_warmup()
+    return _drafting_agent
 
 
-# Global agent instance
-drafting_agent = LegalDraftingAgent()
+def __getattr__(name):
+    # Keeps `from agents.legal_drafting_agent import drafting_agent` working
+    if name == "drafting_agent":
+        return get_drafting_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
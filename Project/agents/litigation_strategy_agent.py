@@ -2,32 +2,35 @@
 Litigation Strategy Agent
 Specializes in case strategy, outcome prediction, and litigation planning
 """
+import asyncio
+import json
 import logging
+import threading
+import time
+import weakref
+from typing import AsyncIterator, ClassVar, Dict, Final, Iterator, List, NamedTuple, Optional, Tuple, Union
 from agno.agent import Agent
-from agno.models.google import Gemini
 from config import config
+from agents._batch import BatchProcessor
+from agents._cache import ResponseCache, build_response_cache, cached_llm_call, single_flight
+from agents._gemini_batch import submit_batch, wait_for_batch
+from agents._gemini_pool import build_gemini, warm_up
+from agents._llm import LLMCallError, ainvoke, gemini_breaker, invoke, is_transient, record_usage
+from agents._metrics import agent_metrics, current_method
+from agents._prompt_utils import PromptTemplate, estimate_tokens, truncate_to_tokens
+from agents._semantic_cache import SemanticCache, semantic_lookups_enabled
 
 logger = logging.getLogger(__name__)
 
+# Version tag for persisted responses; bump whenever _INSTRUCTIONS or a prompt builder changes
+PROMPT_VERSION: Final[str] = "v1"
 
-class LitigationStrategyAgent:
-    """
-    AI Agent specialized in litigation strategy and outcome prediction
-    """
+# Fields identifying the matter a call is about; semantic matches never cross matters
+_MATTER_FIELDS: Final[Tuple[str, ...]] = ('case_id', 'case_number', 'case_name', 'client_info', 'client_name')
 
-    def __init__(self):
-        """Initialize Litigation Strategy Agent"""
-        self.agent = Agent(
-            name="Litigation Strategy Specialist",
-            model=Gemini(id=config.AI_MODEL, api_key=config.GEMINI_API_KEY),
-            instructions=self._get_instructions(),
-            markdown=True
-        )
-        logger.info("Litigation Strategy Agent initialized")
 
-    def _get_instructions(self) -> str:
-        """Get comprehensive instructions for the agent"""
-        return """
+# Static system instructions, built once at import and shared by every instance
+_INSTRUCTIONS: Final[str] = """
 You are an expert Litigation Strategy Specialist with deep expertise in case analysis,
 strategic planning, risk assessment, and outcome prediction. Your role is to help lawyers
 develop winning litigation strategies and make informed decisions about case management.
@@ -293,66 +296,78 @@ Provide practical, actionable strategic guidance that balances legal analysis
 with business considerations and client objectives.
 """
 
-    def analyze_case_strategy(self, case_data: dict) -> str:
-        """
-        Comprehensive case strategy analysis
+# Prompt templates, rendered with per-field fallbacks for anything missing from the input
 
-        Args:
-            case_data: Dictionary containing:
-                - case_overview: Case description
-                - client_position: Plaintiff or defendant
-                - facts: Key facts
-                - legal_issues: Legal claims/defenses
-                - evidence: Available evidence
-                - opposing_party: Information about opponent
-                - objectives: Client's goals
+_STRATEGY_TEMPLATE = PromptTemplate("""
+Conduct comprehensive litigation strategy analysis:
 
-        Returns:
-            Comprehensive strategic analysis
-        """
-        prompt = self._format_strategy_analysis_prompt(case_data)
-        logger.info(f"Analyzing litigation strategy for: {case_data.get('case_overview', 'Unknown')[:50]}")
+## Case Overview
+**Case Name**: {case_name}
+**Case Type**: {case_type}
+**Our Position**: {client_position}
+**Current Stage**: {case_stage}
 
-        try:
-            response = self.agent.run(prompt)
-            logger.info("Strategy analysis completed")
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Strategy analysis failed: {str(e)}")
-            raise
+## Facts
+{facts}
 
-    def predict_case_outcome(self, case_data: dict) -> str:
-        """
-        Predict likely case outcomes
+## Legal Issues
+{legal_issues}
 
-        Args:
-            case_data: Case information for prediction
+## Evidence
+**Our Evidence**: {our_evidence}
+**Opponent's Evidence**: {opponent_evidence}
 
-        Returns:
-            Outcome prediction analysis
-        """
-        prompt = f"""
+## Parties
+**Our Client**: {client_info}
+**Opposing Party**: {opposing_party}
+**Opposing Counsel**: {opposing_counsel}
+
+## Objectives
+**Client Goals**: {objectives}
+**Budget**: {budget}
+**Risk Tolerance**: {risk_tolerance}
+
+## Strategic Analysis Task
+Provide comprehensive strategic analysis following your analytical framework.
+Include:
+- Executive summary with key recommendations
+- Detailed case analysis (strengths/weaknesses)
+- Opponent analysis
+- Strategic plan (discovery, motions, trial, settlement)
+- Risk assessment
+- Economic analysis
+- Specific recommendations with rationale
+
+Ensure analysis is practical, realistic, and aligned with client objectives.
+""", {
+    'case_name': 'Unknown',
+    'case_type': 'Unknown',
+    'facts': 'Not provided',
+    'legal_issues': 'Not provided',
+}, fallback='Not specified')
+
+_OUTCOME_TEMPLATE = PromptTemplate("""
 Predict the likely outcome of the following case:
 
 ## Case Information
-**Case Type**: {case_data.get('case_type', 'Unknown')}
-**Our Position**: {case_data.get('client_position', 'Not specified')}
-**Jurisdiction**: {case_data.get('jurisdiction', 'Not specified')}
-**Court**: {case_data.get('court', 'Not specified')}
-**Judge**: {case_data.get('judge', 'Not specified')}
+**Case Type**: {case_type}
+**Our Position**: {client_position}
+**Jurisdiction**: {jurisdiction}
+**Court**: {court}
+**Judge**: {judge}
 
 ## Facts Summary
-{case_data.get('facts', 'Not provided')}
+{facts}
 
 ## Legal Claims/Defenses
-{case_data.get('legal_issues', 'Not provided')}
+{legal_issues}
 
 ## Evidence Strength
-**Our Evidence**: {case_data.get('our_evidence_strength', 'Not assessed')}
-**Opponent Evidence**: {case_data.get('opponent_evidence_strength', 'Not assessed')}
+**Our Evidence**: {our_evidence_strength}
+**Opponent Evidence**: {opponent_evidence_strength}
 
 ## Similar Cases
-{self._format_similar_cases(case_data.get('similar_cases', []))}
+{similar_cases}
 
 ## Prediction Task
 Provide detailed outcome prediction including:
@@ -394,40 +409,27 @@ Provide detailed outcome prediction including:
    - What additional information would improve prediction
 
 Provide specific percentages and dollar amounts with supporting reasoning.
-"""
-
-        logger.info("Predicting case outcome")
-
-        try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Outcome prediction failed: {str(e)}")
-            raise
-
-    def develop_discovery_plan(self, discovery_data: dict) -> str:
-        """
-        Develop comprehensive discovery plan
-
-        Args:
-            discovery_data: Information for discovery planning
-
-        Returns:
-            Detailed discovery plan
-        """
-        prompt = f"""
+""", {
+    'case_type': 'Unknown',
+    'facts': 'Not provided',
+    'legal_issues': 'Not provided',
+    'our_evidence_strength': 'Not assessed',
+    'opponent_evidence_strength': 'Not assessed',
+}, fallback='Not specified')
+
+_DISCOVERY_TEMPLATE = PromptTemplate("""
 Develop a comprehensive discovery plan:
 
 ## Case Context
-**Case Type**: {discovery_data.get('case_type', 'Unknown')}
-**Key Issues**: {', '.join(discovery_data.get('key_issues', []))}
-**Discovery Deadline**: {discovery_data.get('discovery_deadline', 'Not specified')}
-**Budget**: {discovery_data.get('budget', 'Not specified')}
+**Case Type**: {case_type}
+**Key Issues**: {key_issues}
+**Discovery Deadline**: {discovery_deadline}
+**Budget**: {budget}
 
 ## Information Needs
-**What We Need to Prove**: {discovery_data.get('proof_needed', 'Not specified')}
-**Information Gaps**: {discovery_data.get('information_gaps', 'Not specified')}
-**Opponent's Weaknesses to Explore**: {discovery_data.get('opponent_weaknesses', 'Not specified')}
+**What We Need to Prove**: {proof_needed}
+**Information Gaps**: {information_gaps}
+**Opponent's Weaknesses to Explore**: {opponent_weaknesses}
 
 ## Available Discovery Methods
 - Document requests
@@ -489,53 +491,36 @@ Develop comprehensive, phased discovery plan including:
    - Team assignments
 
 Provide specific, actionable plan with priorities and timeline.
-"""
-
-        logger.info("Developing discovery plan")
-
-        try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Discovery planning failed: {str(e)}")
-            raise
-
-    def assess_settlement_value(self, settlement_data: dict) -> str:
-        """
-        Assess fair settlement value
+""", {
+    'case_type': 'Unknown',
+}, fallback='Not specified')
 
-        Args:
-            settlement_data: Information for settlement valuation
-
-        Returns:
-            Settlement value analysis
-        """
-        prompt = f"""
+_SETTLEMENT_TEMPLATE = PromptTemplate("""
 Assess settlement value for:
 
 ## Case Information
-**Case Type**: {settlement_data.get('case_type', 'Unknown')}
-**Our Position**: {settlement_data.get('client_position', 'Not specified')}
-**Stage**: {settlement_data.get('case_stage', 'Not specified')}
+**Case Type**: {case_type}
+**Our Position**: {client_position}
+**Stage**: {case_stage}
 
 ## Liability Assessment
-**Likelihood of Prevailing**: {settlement_data.get('win_probability', 'Not assessed')}
-**Strength of Case**: {settlement_data.get('case_strength', 'Not assessed')}
+**Likelihood of Prevailing**: {win_probability}
+**Strength of Case**: {case_strength}
 
 ## Damages Analysis
-**Economic Damages**: {settlement_data.get('economic_damages', 'Not specified')}
-**Non-Economic Damages**: {settlement_data.get('non_economic_damages', 'Not specified')}
-**Punitive Damages**: {settlement_data.get('punitive_potential', 'Not applicable')}
+**Economic Damages**: {economic_damages}
+**Non-Economic Damages**: {non_economic_damages}
+**Punitive Damages**: {punitive_potential}
 
 ## Costs and Risks
-**Legal Fees to Trial**: {settlement_data.get('fees_to_trial', 'Not estimated')}
-**Appeal Risk**: {settlement_data.get('appeal_risk', 'Not assessed')}
-**Business Impact**: {settlement_data.get('business_impact', 'Not specified')}
+**Legal Fees to Trial**: {fees_to_trial}
+**Appeal Risk**: {appeal_risk}
+**Business Impact**: {business_impact}
 
 ## Settlement Context
-**Prior Offers**: {settlement_data.get('prior_offers', 'None')}
-**Opponent's Position**: {settlement_data.get('opponent_position', 'Unknown')}
-**Mediation Scheduled**: {settlement_data.get('mediation', 'No')}
+**Prior Offers**: {prior_offers}
+**Opponent's Position**: {opponent_position}
+**Mediation Scheduled**: {mediation}
 
 ## Valuation Task
 Provide comprehensive settlement valuation including:
@@ -575,48 +560,39 @@ Provide comprehensive settlement valuation including:
    - Next steps
 
 Provide specific dollar amounts with detailed supporting analysis.
-"""
-
-        logger.info("Assessing settlement value")
-
-        try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Settlement valuation failed: {str(e)}")
-            raise
-
-    def develop_trial_strategy(self, trial_data: dict) -> str:
-        """
-        Develop comprehensive trial strategy
-
-        Args:
-            trial_data: Information for trial planning
-
-        Returns:
-            Detailed trial strategy
-        """
-        prompt = f"""
+""", {
+    'case_type': 'Unknown',
+    'win_probability': 'Not assessed',
+    'case_strength': 'Not assessed',
+    'punitive_potential': 'Not applicable',
+    'fees_to_trial': 'Not estimated',
+    'appeal_risk': 'Not assessed',
+    'prior_offers': 'None',
+    'opponent_position': 'Unknown',
+    'mediation': 'No',
+}, fallback='Not specified')
+
+_TRIAL_TEMPLATE = PromptTemplate("""
 Develop comprehensive trial strategy:
 
 ## Trial Information
-**Trial Date**: {trial_data.get('trial_date', 'Not set')}
-**Trial Type**: {trial_data.get('trial_type', 'Jury trial')}
-**Estimated Duration**: {trial_data.get('duration', 'Not estimated')}
-**Judge**: {trial_data.get('judge', 'Not specified')}
+**Trial Date**: {trial_date}
+**Trial Type**: {trial_type}
+**Estimated Duration**: {duration}
+**Judge**: {judge}
 
 ## Case Theme
-**Our Theory**: {trial_data.get('case_theory', 'Not developed')}
-**Key Messages**: {', '.join(trial_data.get('key_messages', []))}
+**Our Theory**: {case_theory}
+**Key Messages**: {key_messages}
 
 ## Evidence
-**Key Documents**: {trial_data.get('key_documents', 'Not specified')}
-**Physical Evidence**: {trial_data.get('physical_evidence', 'None')}
+**Key Documents**: {key_documents}
+**Physical Evidence**: {physical_evidence}
 
 ## Witnesses
-**Our Witnesses**: {self._format_witness_list(trial_data.get('our_witnesses', []))}
-**Opposing Witnesses**: {self._format_witness_list(trial_data.get('opposing_witnesses', []))}
-**Expert Witnesses**: {self._format_witness_list(trial_data.get('experts', []))}
+**Our Witnesses**: {our_witnesses}
+**Opposing Witnesses**: {opposing_witnesses}
+**Expert Witnesses**: {experts}
 
 ## Trial Strategy Task
 Develop comprehensive trial strategy including:
@@ -681,83 +657,758 @@ Develop comprehensive trial strategy including:
     - Alternative approaches
 
 Provide detailed, actionable trial plan with specific recommendations.
-"""
+""", {
+    'trial_date': 'Not set',
+    'trial_type': 'Jury trial',
+    'duration': 'Not estimated',
+    'case_theory': 'Not developed',
+    'physical_evidence': 'None',
+}, fallback='Not specified')
+
+
+class _Operation(NamedTuple):
+    """
+    A strategy method's log label, prompt builder and cache admission class
+
+    Informational operations only read their input, so their results are cached
+    and identical calls are coalesced. Command operations (e.g. anything that
+    writes to a case-management system) always reach the model.
+    """
+    label: str
+    builder: str
+    informational: bool = True
+
+
+# Public strategy methods by name; each has an async twin named a<method>
+_OPERATIONS: Final[Dict[str, _Operation]] = {
+    'analyze_case_strategy': _Operation('Strategy analysis', '_format_strategy_analysis_prompt'),
+    'predict_case_outcome': _Operation('Outcome prediction', '_format_outcome_prompt'),
+    'develop_discovery_plan': _Operation('Discovery planning', '_format_discovery_prompt'),
+    'assess_settlement_value': _Operation('Settlement valuation', '_format_settlement_prompt'),
+    'develop_trial_strategy': _Operation('Trial strategy development', '_format_trial_prompt'),
+}
+
+
+class _OfflineJob(NamedTuple):
+    """
+    A submitted batch job and what is needed to map its outputs back to the items
+
+    job_name is None when every item was cached; slots give each pending item's
+    position among the submitted (deduplicated) prompts.
+    """
+    job_name: Optional[str]
+    keys: List[str]
+    results: List[Union[str, Exception, None]]
+    pending: List[int]
+    slots: List[int]
+
+
+def _dedupe(keys: List[str]) -> Tuple[List[int], List[int]]:
+    """
+    Positions of each distinct key's first occurrence, and for every position the slot of its key among them
+
+    Lets a batch send each distinct request once and broadcast the result to every duplicate.
+    """
+    slot_of: Dict[str, int] = {}
+    unique: List[int] = []
+    slots: List[int] = []
+    for index, key in enumerate(keys):
+        if key not in slot_of:
+            slot_of[key] = len(unique)
+            unique.append(index)
+        slots.append(slot_of[key])
+    return unique, slots
+
+
+class LitigationStrategyAgent:
+    """
+    AI Agent specialized in litigation strategy and outcome prediction
+    """
+
+    # Agno agent shared by every instance; instances differ only in their caches
+    _shared_agent: ClassVar[Optional[Agent]] = None
+    _shared_agent_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self):
+        """Initialize Litigation Strategy Agent"""
+        self.agent = self._get_shared_agent()
+        self._cache = build_response_cache(PROMPT_VERSION)
+        # Kept in memory: SEMANTIC_CACHE_PATH holds the compliance agent's saved cache
+        self._semantic_cache = SemanticCache(
+            threshold=config.SEMANTIC_CACHE_THRESHOLD,
+            max_entries=config.CACHE_MAX_ENTRIES,
+            ttl=config.SEMANTIC_CACHE_TTL_SECONDS,
+            prompt_version=PROMPT_VERSION
+        )
+        # Cleared while a background warm-up runs
+        self._ready = threading.Event()
+        self._ready.set()
+        # Caps async model calls in flight, one semaphore per event loop
+        self._limiters: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        logger.info("Litigation Strategy Agent initialized")
+
+    def start_warmup(self) -> None:
+        """Open the Gemini connection in a background thread; wait_ready() blocks until it is done"""
+        if not config.GEMINI_WARMUP:
+            return
+        self._ready.clear()
+        threading.Thread(target=self.warmup, name="litigation-agent-warmup", daemon=True).start()
+
+    def warmup(self) -> None:
+        """Open the Gemini connection ahead of the first request, then mark the agent ready"""
+        try:
+            warm_up(self.agent.model.id)
+        finally:
+            self._ready.set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until any warm-up has finished; returns False on timeout"""
+        return self._ready.wait(timeout)
+
+    def clear_cache(self) -> None:
+        """Drop every cached analysis (with CACHE_BACKEND=sqlite this clears the shared cache file)"""
+        self._cache.clear()
+
+    @classmethod
+    def _get_shared_agent(cls) -> Agent:
+        """Return the class-wide Agno agent, building it on first call"""
+        if cls._shared_agent is None:
+            with cls._shared_agent_lock:
+                if cls._shared_agent is None:
+                    cls._shared_agent = Agent(
+                        name="Litigation Strategy Specialist",
+                        model=build_gemini(),
+                        instructions=cls._get_instructions(),
+                        markdown=True
+                    )
+        return cls._shared_agent
+
+    @classmethod
+    def _get_instructions(cls) -> str:
+        """Get comprehensive instructions for the agent"""
+        return _INSTRUCTIONS
+
+    @cached_llm_call
+    def analyze_case_strategy(self, case_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Comprehensive case strategy analysis
+
+        Args:
+            case_data: Dictionary containing:
+                - case_overview: Case description
+                - client_position: Plaintiff or defendant
+                - facts: Key facts
+                - legal_issues: Legal claims/defenses
+                - evidence: Available evidence
+                - opposing_party: Information about opponent
+                - objectives: Client's goals
+
+        Returns:
+            Comprehensive strategic analysis
+        """
+        prompt = self._format_strategy_analysis_prompt(case_data)
+        logger.info(f"Analyzing litigation strategy for: {case_data.get('case_overview', 'Unknown')[:50]}")
+        return self._run('analyze_case_strategy', case_data, prompt, bypass_cache)
+
+    def analyze_case_strategy_stream(self, case_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of analyze_case_strategy
+
+        Yields the analysis as Gemini generates it. Shares cache entries with the non-streaming method.
+        """
+        prompt = self._format_strategy_analysis_prompt(case_data)
+        logger.info(f"Analyzing litigation strategy for: {case_data.get('case_overview', 'Unknown')[:50]}")
+
+        try:
+            yield from self._stream('analyze_case_strategy', case_data, prompt, bypass_cache)
+        except Exception as e:
+            logger.error(f"Strategy analysis failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    def predict_case_outcome(self, case_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Predict likely case outcomes
+
+        Args:
+            case_data: Case information for prediction
+
+        Returns:
+            Outcome prediction analysis
+        """
+        prompt = self._format_outcome_prompt(case_data)
+        logger.info("Predicting case outcome")
+        return self._run('predict_case_outcome', case_data, prompt, bypass_cache)
+
+    def predict_case_outcome_stream(self, case_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of predict_case_outcome
+
+        Yields the analysis as Gemini generates it. Shares cache entries with the non-streaming method.
+        """
+        prompt = self._format_outcome_prompt(case_data)
+        logger.info("Predicting case outcome")
+
+        try:
+            yield from self._stream('predict_case_outcome', case_data, prompt, bypass_cache)
+        except Exception as e:
+            logger.error(f"Outcome prediction failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    def develop_discovery_plan(self, discovery_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Develop comprehensive discovery plan
+
+        Args:
+            discovery_data: Information for discovery planning
+
+        Returns:
+            Detailed discovery plan
+        """
+        prompt = self._format_discovery_prompt(discovery_data)
+        logger.info("Developing discovery plan")
+        return self._run('develop_discovery_plan', discovery_data, prompt, bypass_cache)
+
+    def develop_discovery_plan_stream(self, discovery_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of develop_discovery_plan
+
+        Yields the analysis as Gemini generates it. Shares cache entries with the non-streaming method.
+        """
+        prompt = self._format_discovery_prompt(discovery_data)
+        logger.info("Developing discovery plan")
 
+        try:
+            yield from self._stream('develop_discovery_plan', discovery_data, prompt, bypass_cache)
+        except Exception as e:
+            logger.error(f"Discovery planning failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    def assess_settlement_value(self, settlement_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Assess fair settlement value
+
+        Args:
+            settlement_data: Information for settlement valuation
+
+        Returns:
+            Settlement value analysis
+        """
+        prompt = self._format_settlement_prompt(settlement_data)
+        logger.info("Assessing settlement value")
+        return self._run('assess_settlement_value', settlement_data, prompt, bypass_cache)
+
+    def assess_settlement_value_stream(self, settlement_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of assess_settlement_value
+
+        Yields the analysis as Gemini generates it. Shares cache entries with the non-streaming method.
+        """
+        prompt = self._format_settlement_prompt(settlement_data)
+        logger.info("Assessing settlement value")
+
+        try:
+            yield from self._stream('assess_settlement_value', settlement_data, prompt, bypass_cache)
+        except Exception as e:
+            logger.error(f"Settlement valuation failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    def develop_trial_strategy(self, trial_data: dict, bypass_cache: bool = False) -> str:
+        """
+        Develop comprehensive trial strategy
+
+        Args:
+            trial_data: Information for trial planning
+
+        Returns:
+            Detailed trial strategy
+        """
+        prompt = self._format_trial_prompt(trial_data)
+        logger.info("Developing trial strategy")
+        return self._run('develop_trial_strategy', trial_data, prompt, bypass_cache)
+
+    def develop_trial_strategy_stream(self, trial_data: dict, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of develop_trial_strategy
+
+        Yields the analysis as Gemini generates it. Shares cache entries with the non-streaming method.
+        """
+        prompt = self._format_trial_prompt(trial_data)
         logger.info("Developing trial strategy")
 
         try:
-            response = self.agent.run(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
+            yield from self._stream('develop_trial_strategy', trial_data, prompt, bypass_cache)
         except Exception as e:
             logger.error(f"Trial strategy development failed: {str(e)}")
             raise
 
-    def _format_strategy_analysis_prompt(self, case_data: dict) -> str:
-        """Format comprehensive strategy analysis prompt"""
-        prompt = f"""
-Conduct comprehensive litigation strategy analysis:
+    @cached_llm_call
+    async def aanalyze_case_strategy(self, case_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of analyze_case_strategy"""
+        # Rendering a long case file is CPU work; keep it off the event loop
+        prompt = await asyncio.to_thread(self._format_strategy_analysis_prompt, case_data)
+        logger.info(f"Analyzing litigation strategy for: {case_data.get('case_overview', 'Unknown')[:50]}")
+        return await self._arun('analyze_case_strategy', case_data, prompt, bypass_cache)
 
-## Case Overview
-**Case Name**: {case_data.get('case_name', 'Unknown')}
-**Case Type**: {case_data.get('case_type', 'Unknown')}
-**Our Position**: {case_data.get('client_position', 'Not specified')}
-**Current Stage**: {case_data.get('case_stage', 'Not specified')}
+    async def aanalyze_case_strategy_stream(self, case_data: dict, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of analyze_case_strategy_stream"""
+        prompt = await asyncio.to_thread(self._format_strategy_analysis_prompt, case_data)
+        logger.info(f"Analyzing litigation strategy for: {case_data.get('case_overview', 'Unknown')[:50]}")
 
-## Facts
-{case_data.get('facts', 'Not provided')}
+        try:
+            async for chunk in self._astream('analyze_case_strategy', case_data, prompt, bypass_cache):
+                yield chunk
+        except Exception as e:
+            logger.error(f"Strategy analysis failed: {str(e)}")
+            raise
 
-## Legal Issues
-{case_data.get('legal_issues', 'Not provided')}
+    @cached_llm_call
+    async def apredict_case_outcome(self, case_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of predict_case_outcome"""
+        prompt = await asyncio.to_thread(self._format_outcome_prompt, case_data)
+        logger.info("Predicting case outcome")
+        return await self._arun('predict_case_outcome', case_data, prompt, bypass_cache)
 
-## Evidence
-**Our Evidence**: {case_data.get('our_evidence', 'Not specified')}
-**Opponent's Evidence**: {case_data.get('opponent_evidence', 'Not specified')}
+    async def apredict_case_outcome_stream(self, case_data: dict, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of predict_case_outcome_stream"""
+        prompt = await asyncio.to_thread(self._format_outcome_prompt, case_data)
+        logger.info("Predicting case outcome")
 
-## Parties
-**Our Client**: {case_data.get('client_info', 'Not specified')}
-**Opposing Party**: {case_data.get('opposing_party', 'Not specified')}
-**Opposing Counsel**: {case_data.get('opposing_counsel', 'Not specified')}
+        try:
+            async for chunk in self._astream('predict_case_outcome', case_data, prompt, bypass_cache):
+                yield chunk
+        except Exception as e:
+            logger.error(f"Outcome prediction failed: {str(e)}")
+            raise
 
-## Objectives
-**Client Goals**: {case_data.get('objectives', 'Not specified')}
-**Budget**: {case_data.get('budget', 'Not specified')}
-**Risk Tolerance**: {case_data.get('risk_tolerance', 'Not specified')}
+    @cached_llm_call
+    async def adevelop_discovery_plan(self, discovery_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of develop_discovery_plan"""
+        prompt = await asyncio.to_thread(self._format_discovery_prompt, discovery_data)
+        logger.info("Developing discovery plan")
+        return await self._arun('develop_discovery_plan', discovery_data, prompt, bypass_cache)
 
-## Strategic Analysis Task
-Provide comprehensive strategic analysis following your analytical framework.
-Include:
-- Executive summary with key recommendations
-- Detailed case analysis (strengths/weaknesses)
-- Opponent analysis
-- Strategic plan (discovery, motions, trial, settlement)
-- Risk assessment
-- Economic analysis
-- Specific recommendations with rationale
+    async def adevelop_discovery_plan_stream(self, discovery_data: dict, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of develop_discovery_plan_stream"""
+        prompt = await asyncio.to_thread(self._format_discovery_prompt, discovery_data)
+        logger.info("Developing discovery plan")
 
-Ensure analysis is practical, realistic, and aligned with client objectives.
-"""
-        return prompt
+        try:
+            async for chunk in self._astream('develop_discovery_plan', discovery_data, prompt, bypass_cache):
+                yield chunk
+        except Exception as e:
+            logger.error(f"Discovery planning failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    async def aassess_settlement_value(self, settlement_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of assess_settlement_value"""
+        prompt = await asyncio.to_thread(self._format_settlement_prompt, settlement_data)
+        logger.info("Assessing settlement value")
+        return await self._arun('assess_settlement_value', settlement_data, prompt, bypass_cache)
+
+    async def aassess_settlement_value_stream(self, settlement_data: dict, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of assess_settlement_value_stream"""
+        prompt = await asyncio.to_thread(self._format_settlement_prompt, settlement_data)
+        logger.info("Assessing settlement value")
+
+        try:
+            async for chunk in self._astream('assess_settlement_value', settlement_data, prompt, bypass_cache):
+                yield chunk
+        except Exception as e:
+            logger.error(f"Settlement valuation failed: {str(e)}")
+            raise
+
+    @cached_llm_call
+    async def adevelop_trial_strategy(self, trial_data: dict, bypass_cache: bool = False) -> str:
+        """Async variant of develop_trial_strategy"""
+        prompt = await asyncio.to_thread(self._format_trial_prompt, trial_data)
+        logger.info("Developing trial strategy")
+        return await self._arun('develop_trial_strategy', trial_data, prompt, bypass_cache)
+
+    async def adevelop_trial_strategy_stream(self, trial_data: dict, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of develop_trial_strategy_stream"""
+        prompt = await asyncio.to_thread(self._format_trial_prompt, trial_data)
+        logger.info("Developing trial strategy")
+
+        try:
+            async for chunk in self._astream('develop_trial_strategy', trial_data, prompt, bypass_cache):
+                yield chunk
+        except Exception as e:
+            logger.error(f"Trial strategy development failed: {str(e)}")
+            raise
+
+    async def abatch(self, jobs: List[Tuple[str, dict]]) -> List[Union[str, Exception]]:
+        """
+        Run several strategy analyses concurrently
+
+        Args:
+            jobs: (method name, input dictionary) pairs, e.g. ('predict_case_outcome', case_data)
+
+        Returns:
+            Results in the same order as jobs; a job that failed maps to its
+            exception so the other results are still returned
+        """
+        unknown = {method for method, _ in jobs} - set(_OPERATIONS)
+        if unknown:
+            raise ValueError(f"Unsupported strategy methods: {', '.join(sorted(unknown))}")
+
+        # Identical informational jobs run once; every command job runs
+        unique, slots = _dedupe([
+            ResponseCache.make_call_key(method, self.agent.model.id, data) if _OPERATIONS[method].informational
+            else str(index)
+            for index, (method, data) in enumerate(jobs)
+        ])
+        logger.info(f"Running {len(unique)} distinct strategy analyses concurrently for {len(jobs)} jobs")
+        results = await asyncio.gather(
+            *[getattr(self, f"a{jobs[index][0]}")(jobs[index][1]) for index in unique],
+            return_exceptions=True
+        )
+        return [results[slot] for slot in slots]
+
+    async def analyze_case_strategy_batch(self, cases: List[dict],
+                                          interactive: bool = False) -> List[Union[str, Exception]]:
+        """
+        Analyze many cases' strategy, e.g. for a firm-wide dashboard
+
+        Uncached cases go out as one Gemini batch job (half the online price, but results
+        can take hours; waiting stops after GEMINI_BATCH_TIMEOUT_SECONDS). If the job cannot
+        be submitted, or interactive is True, cases are analyzed through online calls under
+        the GEMINI_MAX_CONCURRENCY and GEMINI_REQUESTS_PER_MINUTE limits instead. Once a job
+        is accepted, errors collecting it are raised rather than paying for the analyses twice.
+
+        Args:
+            cases: case_data dictionaries, one per case
+            interactive: Skip the Batch API and analyze online
+
+        Returns:
+            Analyses in the same order as cases; a case whose analysis failed maps
+            to its exception so the other analyses are still returned
+        """
+        if not interactive:
+            try:
+                job = await asyncio.to_thread(self._submit_offline, 'analyze_case_strategy', cases)
+            except Exception as e:
+                logger.warning(f"Gemini batch unavailable, analyzing strategies online: {str(e)}")
+            else:
+                return await asyncio.to_thread(self._collect_offline, job)
+
+        unique, slots = _dedupe([ResponseCache.make_call_key('analyze_case_strategy', self.agent.model.id, case)
+                                 for case in cases])
+        results = await BatchProcessor(self).run_batch(
+            'analyze_case_strategy', [cases[index] for index in unique], return_exceptions=True
+        )
+        return [results[slot] for slot in slots]
+
+    def _submit_offline(self, method: str, items: List[dict]) -> _OfflineJob:
+        """Serve cached results and submit the rest of a method's items as one Gemini batch job"""
+        keys = [ResponseCache.make_call_key(method, self.agent.model.id, item) for item in items]
+        results: List[Union[str, Exception, None]] = [
+            self._cache.get_key(key) if config.ENABLE_CACHING else None for key in keys
+        ]
+        pending = [index for index, result in enumerate(results) if result is None]
+        if not pending:
+            return _OfflineJob(None, keys, results, pending, [])
+
+        builder = getattr(self, _OPERATIONS[method].builder)
+        prompts = [builder(items[index]) for index in pending]
+        # Inputs that render the same prompt are submitted once
+        unique, slots = _dedupe(prompts)
+        job_name = submit_batch(
+            [prompts[position] for position in unique],
+            self._get_instructions(),
+            model_id=self.agent.model.id,
+            display_name=f"litigation-{method}"
+        )
+        return _OfflineJob(job_name, keys, results, pending, slots)
+
+    def _collect_offline(self, job: _OfflineJob) -> List[Union[str, Exception]]:
+        """Wait for a submitted batch job and store its results in the response cache"""
+        job_name, keys, results, pending, slots = job
+        if job_name is None:
+            return results
+
+        try:
+            outputs = wait_for_batch(job_name, timeout=config.GEMINI_BATCH_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.error(f"Collecting Gemini batch {job_name} failed: {str(e)}")
+            raise
+        for index, slot in zip(pending, slots):
+            output = outputs[slot] if slot < len(outputs) else None
+            if output is None:
+                results[index] = LLMCallError(f"Batch request {index} in {job_name} failed")
+                continue
+            results[index] = output
+            if config.ENABLE_CACHING:
+                self._cache.set_key(keys[index], output)
+        return results
+
+    @staticmethod
+    def _cacheable(method: str) -> bool:
+        """Whether cached_llm_call may serve or store method's results; commands always reach the model"""
+        return _OPERATIONS[method].informational
+
+    @staticmethod
+    def _semantic_bucket(method: str, data: dict) -> Optional[str]:
+        """
+        Semantic cache partition for a call: one per method and matter, so one client's strategy is
+        never served for another's; None (no semantic caching) when data does not identify a matter
+        """
+        matter = {field: data[field] for field in _MATTER_FIELDS if data.get(field)}
+        if not matter:
+            return None
+        return f"{method}/{ResponseCache.make_key(json.dumps(matter, sort_keys=True, default=str))}"
+
+    def _inflight_key(self, prompt: str) -> str:
+        """Single-flight key for a prompt; namespaced since other agents send the same prompt with other instructions"""
+        return ResponseCache.make_key(f"litigation-strategy\n{self.agent.model.id}\n{prompt}")
+
+    def _call(self, method: str, prompt: str) -> str:
+        """One model call with retry on transient errors, recorded in agent_metrics under method"""
+        started = time.perf_counter()
+        token = current_method.set(method)
+        try:
+            result = invoke(self.agent, prompt)
+        finally:
+            current_method.reset(token)
+            elapsed = time.perf_counter() - started
+            agent_metrics.incr(method, 'api_call')
+            agent_metrics.observe(method, elapsed)
+        logger.info(f"op={method} lat={elapsed:.2f}s")
+        return result
+
+    def _limiter(self) -> asyncio.Semaphore:
+        """This event loop's GEMINI_MAX_CONCURRENCY semaphore for async model calls"""
+        loop = asyncio.get_running_loop()
+        limiter = self._limiters.get(loop)
+        if limiter is None:
+            limiter = self._limiters[loop] = asyncio.Semaphore(config.GEMINI_MAX_CONCURRENCY)
+        return limiter
+
+    async def _acall(self, method: str, prompt: str) -> str:
+        """Async variant of _call; at most GEMINI_MAX_CONCURRENCY run at once so fan-outs do not trip 429s"""
+        async with self._limiter():
+            started = time.perf_counter()
+            token = current_method.set(method)
+            try:
+                result = await ainvoke(self.agent, prompt)
+            finally:
+                current_method.reset(token)
+                elapsed = time.perf_counter() - started
+                agent_metrics.incr(method, 'api_call')
+                agent_metrics.observe(method, elapsed)
+        logger.info(f"op={method} lat={elapsed:.2f}s")
+        return result
+
+    def _run(self, method: str, data: dict, prompt: str, bypass_cache: bool = False) -> str:
+        """Run a prompt, serving near-duplicate prompts for the same method and matter from the semantic cache"""
+        try:
+            informational = _OPERATIONS[method].informational
+            bucket = self._semantic_bucket(method, data)
+            vector = None
+            if bucket is not None and semantic_lookups_enabled() and informational and not bypass_cache:
+                cached, vector = self._semantic_cache.lookup(bucket, prompt)
+                agent_metrics.incr(method, 'sem_miss' if cached is None else 'sem_hit')
+                if cached is not None:
+                    return cached
+
+            if not informational:
+                return self._call(method, prompt)
+            # Identical prompts already in flight share one call, even with caching off or bypassed
+            result = single_flight.do(self._inflight_key(prompt), lambda: self._call(method, prompt))
+            if vector is not None and result:
+                self._semantic_cache.add(bucket, vector, result)
+            return result
+        except Exception as e:
+            logger.error(f"{_OPERATIONS[method].label} failed: {str(e)}")
+            raise
+
+    async def _arun(self, method: str, data: dict, prompt: str, bypass_cache: bool = False) -> str:
+        """Async variant of _run"""
+        try:
+            informational = _OPERATIONS[method].informational
+            bucket = self._semantic_bucket(method, data)
+            vector = None
+            if bucket is not None and semantic_lookups_enabled() and informational and not bypass_cache:
+                # Embedding is a blocking HTTP call; keep it off the event loop
+                cached, vector = await asyncio.to_thread(self._semantic_cache.lookup, bucket, prompt)
+                agent_metrics.incr(method, 'sem_miss' if cached is None else 'sem_hit')
+                if cached is not None:
+                    return cached
+
+            if not informational:
+                return await self._acall(method, prompt)
+            result = await single_flight.ado(self._inflight_key(prompt), lambda: self._acall(method, prompt))
+            if vector is not None and result:
+                self._semantic_cache.add(bucket, vector, result)
+            return result
+        except Exception as e:
+            logger.error(f"{_OPERATIONS[method].label} failed: {str(e)}")
+            raise
+
+    def _stream(self, method: str, data: dict, prompt: str, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Yield response text as it is generated, recording time to first token under "<method>.ttft"
+
+        The assembled response is cached under the same key as method, unless method is a command.
+        """
+        use_cache = config.ENABLE_CACHING and _OPERATIONS[method].informational and not bypass_cache
+        key = ResponseCache.make_call_key(method, self.agent.model.id, data)
+        if use_cache:
+            cached = self._cache.get_key(key)
+            if cached is not None:
+                yield cached
+                return
+
+        # A partially consumed stream cannot be retried, so only the breaker applies
+        gemini_breaker.before_call()
+        started = time.perf_counter()
+        parts = []
+        for event in self.agent.run(prompt, stream=True, stream_events=True):
+            if event.event == "RunError":
+                error = LLMCallError.from_run(event.content or "Gemini streaming run failed")
+                if is_transient(error):
+                    gemini_breaker.record_failure()
+                raise error
+            if event.event == "RunContent" and event.content:
+                if not parts:
+                    ttft = time.perf_counter() - started
+                    agent_metrics.observe(f"{method}.ttft", ttft)
+                parts.append(event.content)
+                yield event.content
+            elif event.event == "RunCompleted":
+                record_usage(event)
+        gemini_breaker.record_success()
+        elapsed = time.perf_counter() - started
+        agent_metrics.incr(method, 'api_call')
+        agent_metrics.observe(method, elapsed)
+        logger.info(f"op={method} ttft={ttft:.2f}s lat={elapsed:.2f}s" if parts else f"op={method} lat={elapsed:.2f}s")
+
+        if use_cache and parts:
+            self._cache.set_key(key, "".join(parts))
+
+    async def _astream(self, method: str, data: dict, prompt: str, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async variant of _stream"""
+        use_cache = config.ENABLE_CACHING and _OPERATIONS[method].informational and not bypass_cache
+        key = ResponseCache.make_call_key(method, self.agent.model.id, data)
+        if use_cache:
+            cached = self._cache.get_key(key)
+            if cached is not None:
+                yield cached
+                return
+
+        gemini_breaker.before_call()
+        started = time.perf_counter()
+        parts = []
+        async for event in self.agent.arun(prompt, stream=True, stream_events=True):
+            if event.event == "RunError":
+                error = LLMCallError.from_run(event.content or "Gemini streaming run failed")
+                if is_transient(error):
+                    gemini_breaker.record_failure()
+                raise error
+            if event.event == "RunContent" and event.content:
+                if not parts:
+                    ttft = time.perf_counter() - started
+                    agent_metrics.observe(f"{method}.ttft", ttft)
+                parts.append(event.content)
+                yield event.content
+            elif event.event == "RunCompleted":
+                record_usage(event)
+        gemini_breaker.record_success()
+        elapsed = time.perf_counter() - started
+        agent_metrics.incr(method, 'api_call')
+        agent_metrics.observe(method, elapsed)
+        logger.info(f"op={method} ttft={ttft:.2f}s lat={elapsed:.2f}s" if parts else f"op={method} lat={elapsed:.2f}s")
+
+        if use_cache and parts:
+            self._cache.set_key(key, "".join(parts))
+
+    def _format_strategy_analysis_prompt(self, case_data: dict) -> str:
+        """Format comprehensive strategy analysis prompt"""
+        return _STRATEGY_TEMPLATE.render(
+            case_data,
+            **self._bounded_fields(_STRATEGY_TEMPLATE, case_data, ('facts', 'our_evidence', 'opponent_evidence'))
+        )
+
+    def _format_outcome_prompt(self, case_data: dict) -> str:
+        """Format outcome prediction prompt"""
+        return _OUTCOME_TEMPLATE.render(
+            case_data,
+            similar_cases=self._format_similar_cases(case_data.get('similar_cases', [])),
+            **self._bounded_fields(_OUTCOME_TEMPLATE, case_data, ('facts',))
+        )
+
+    def _format_discovery_prompt(self, discovery_data: dict) -> str:
+        """Format discovery planning prompt"""
+        return _DISCOVERY_TEMPLATE.render(
+            discovery_data,
+            key_issues=', '.join(discovery_data.get('key_issues', []))
+        )
+
+    def _format_settlement_prompt(self, settlement_data: dict) -> str:
+        """Format settlement valuation prompt"""
+        return _SETTLEMENT_TEMPLATE.render(settlement_data)
+
+    def _format_trial_prompt(self, trial_data: dict) -> str:
+        """Format trial strategy prompt"""
+        return _TRIAL_TEMPLATE.render(
+            trial_data,
+            key_messages=', '.join(trial_data.get('key_messages', [])),
+            our_witnesses=self._format_witness_list(trial_data.get('our_witnesses', [])),
+            opposing_witnesses=self._format_witness_list(trial_data.get('opposing_witnesses', [])),
+            experts=self._format_witness_list(trial_data.get('experts', []))
+        )
+
+    def _bounded_fields(self, template: PromptTemplate, data: dict, fields: Tuple[str, ...]) -> Dict[str, str]:
+        """Free-text fields cut to CASE_FIELD_TOKEN_BUDGET each, so pasted transcripts cannot blow up the prompt"""
+        bounded = {}
+        for name in fields:
+            text = str(template.value(data, name))
+            bounded[name] = truncate_to_tokens(text, config.CASE_FIELD_TOKEN_BUDGET)
+            if bounded[name] is not text:
+                logger.info(f"Truncated {name} from ~{estimate_tokens(text)} to ~{estimate_tokens(bounded[name])} tokens")
+        return bounded
 
     def _format_similar_cases(self, cases: list) -> str:
         """Format similar cases"""
         if not cases:
             return "No similar cases provided"
 
-        formatted = ""
-        for case in cases:
-            if isinstance(case, dict):
-                formatted += f"- {case.get('name', 'Unknown')}: {case.get('outcome', 'Unknown outcome')}\n"
-            else:
-                formatted += f"- {case}\n"
-        return formatted
+        return "".join(
+            f"- {case.get('name', 'Unknown')}: {case.get('outcome', 'Unknown outcome')}\n"
+            if isinstance(case, dict) else f"- {case}\n"
+            for case in cases
+        )
 
     def _format_witness_list(self, witnesses: list) -> str:
         """Format witness list"""
         if not witnesses:
             return "None specified"
 
-        return ", ".join([w if isinstance(w, str) else w.get('name', 'Unknown') for w in witnesses])
+        return ", ".join(w if isinstance(w, str) else w.get('name', 'Unknown') for w in witnesses)
+
+
+# Agent instance, created on first use so importing this module stays cheap
+_litigation_agent: Optional[LitigationStrategyAgent] = None
+_litigation_agent_lock = threading.Lock()
+
+
+def get_litigation_agent() -> LitigationStrategyAgent:
+    """Return the shared litigation agent, constructing it on first call"""
+    global _litigation_agent
+    if _litigation_agent is None:
+        with _litigation_agent_lock:
+            if _litigation_agent is None:
+                _litigation_agent = LitigationStrategyAgent()
+                _litigation_agent.start_warmup()
+    return _litigation_agent
 
 
-# Global agent instance
-litigation_agent = LitigationStrategyAgent()
+def __getattr__(name):
+    # Keeps `from agents.litigation_strategy_agent import litigation_agent` working
+    if name == "litigation_agent":
+        return get_litigation_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,19 +2,34 @@
 Legal Intelligence Orchestrator
 Coordinates all legal agents and manages comprehensive legal analyses
 """
+import asyncio
+import json
 import logging
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional
 from datetime import datetime
 
-from agents.case_law_research_agent import case_law_agent
-from agents.contract_analysis_agent import contract_agent
-from agents.compliance_advisory_agent import compliance_agent
-from agents.legal_drafting_agent import drafting_agent
-from agents.litigation_strategy_agent import litigation_agent
+from config import config
+from agents.case_law_research_agent import get_case_law_agent
+from agents.contract_analysis_agent import get_contract_agent
+from agents.compliance_advisory_agent import get_compliance_agent
+from agents.legal_drafting_agent import get_drafting_agent
+from agents.litigation_strategy_agent import get_litigation_agent
+from agents._metrics import agent_metrics
+from agents._semantic_cache import SemanticCache, skip_agent_semantic_cache
 from utils.database import db
+from utils.write_queue import write_queue
 
 logger = logging.getLogger(__name__)
 
+# Drafting agent method for each supported document type
+_DRAFTERS: Dict[str, str] = {
+    'memo': 'draft_legal_memo',
+    'motion': 'draft_motion',
+    'demand_letter': 'draft_demand_letter',
+    'contract_clause': 'draft_contract_clause',
+}
+
 
 class LegalOrchestrator:
     """
@@ -24,13 +39,74 @@ class LegalOrchestrator:
 
     def __init__(self):
         """Initialize the orchestrator"""
-        self.case_law_agent = case_law_agent
-        self.contract_agent = contract_agent
-        self.compliance_agent = compliance_agent
-        self.drafting_agent = drafting_agent
-        self.litigation_agent = litigation_agent
+        # Results of earlier requests, matched by the similarity of their input payloads
+        self._semantic_cache = SemanticCache(
+            threshold=config.SEMANTIC_CACHE_THRESHOLD,
+            max_entries=config.CACHE_MAX_ENTRIES,
+            ttl=config.SEMANTIC_CACHE_TTL_SECONDS
+        )
         logger.info("Legal Orchestrator initialized")
 
+    @property
+    def case_law_agent(self):
+        """Case law agent, constructed on first use"""
+        return get_case_law_agent()
+
+    @property
+    def contract_agent(self):
+        """Contract agent, constructed on first use"""
+        return get_contract_agent()
+
+    @property
+    def compliance_agent(self):
+        """Compliance agent, constructed on first use"""
+        return get_compliance_agent()
+
+    @property
+    def drafting_agent(self):
+        """Drafting agent, constructed on first use"""
+        return get_drafting_agent()
+
+    @property
+    def litigation_agent(self):
+        """Litigation agent, constructed on first use"""
+        return get_litigation_agent()
+
+    def _cached_analysis(self, method: str, entity: Optional[str], payload: dict, run: Callable[[], str]) -> str:
+        """
+        Serve a near-identical earlier request for the same entity from the semantic cache,
+        or run the agent and remember its result
+
+        Payloads for different cases or clients can differ only in names and amounts and still
+        embed as near-duplicates, so results are only reused within one entity's partition.
+
+        Args:
+            method: Orchestrator method
+            entity: Case, contract or client the result belongs to (None skips the cache)
+            payload: Agent input; canonicalized as sorted, lowercased JSON before embedding
+            run: Calls the agent on a miss
+
+        Returns:
+            Analysis text
+        """
+        if not config.ENABLE_SEMANTIC_CACHE or entity is None:
+            return run()
+
+        bucket = f"{method}/{entity}"
+        canonical = json.dumps(payload, sort_keys=True, default=str).lower()
+        cached, vector = self._semantic_cache.lookup(bucket, canonical)
+        agent_metrics.incr(f"orchestrator.{method}", 'sem_miss' if cached is None else 'sem_hit')
+        if cached is not None:
+            logger.info(f"Serving {method} for {entity} from the orchestrator semantic cache")
+            return cached
+
+        # This lookup already paid for an embedding; skip the agent's own semantic lookup
+        with skip_agent_semantic_cache():
+            result = run()
+        if vector is not None and result:
+            self._semantic_cache.add(bucket, vector, result)
+        return result
+
     def research_case_law(self, lawyer_id: int, **kwargs) -> str:
         """
         Conduct case law research
@@ -62,10 +138,14 @@ class LegalOrchestrator:
                 if case:
                     research_data['current_facts'] = case.get('case_summary')
 
-            result = self.case_law_agent.research_precedents(research_data)
+            entity = f"case-{kwargs['case_id']}" if kwargs.get('case_id') else f"lawyer-{lawyer_id}"
+            result = self._cached_analysis(
+                'research_case_law', entity, research_data,
+                lambda: self.case_law_agent.research_precedents(research_data)
+            )
 
             # Save research session
-            db.add_research_session({
+            write_queue.insert('research_sessions', {
                 'session_name': f"Case Law Research - {research_data.get('legal_issue', 'Unknown')[:50]}",
                 'lawyer_id': lawyer_id,
                 'case_id': kwargs.get('case_id'),
@@ -107,10 +187,14 @@ class LegalOrchestrator:
                     'contract_type': contract.get('document_type')
                 })
 
-            result = self.contract_agent.analyze_contract(contract_data)
+            # Ad hoc contract text has no entity to partition by, so it is not semantic-cached here
+            result = self._cached_analysis(
+                'analyze_contract', f"contract-{contract_id}" if contract_id else None, contract_data,
+                lambda: self.contract_agent.analyze_contract(contract_data)
+            )
 
             # Save analysis
-            db.save_analysis_result({
+            write_queue.insert('analysis_results', {
                 'analysis_type': 'contract_analysis',
                 'entity_type': 'contract',
                 'entity_id': contract_id or 0,
@@ -153,10 +237,13 @@ class LegalOrchestrator:
                 'scope': kwargs.get('scope', [])
             }
 
-            result = self.compliance_agent.assess_compliance(compliance_data)
+            result = self._cached_analysis(
+                'assess_compliance', f"lawyer-{lawyer_id}/{compliance_data['organization']}", compliance_data,
+                lambda: self.compliance_agent.assess_compliance(compliance_data)
+            )
 
             # Save analysis
-            db.save_analysis_result({
+            write_queue.insert('analysis_results', {
                 'analysis_type': 'compliance_assessment',
                 'entity_type': 'organization',
                 'entity_id': 0,
@@ -187,19 +274,14 @@ class LegalOrchestrator:
         logger.info(f"Drafting {document_type} for lawyer {lawyer_id}")
 
         try:
-            if document_type == 'memo':
-                result = self.drafting_agent.draft_legal_memo(kwargs)
-            elif document_type == 'motion':
-                result = self.drafting_agent.draft_motion(kwargs)
-            elif document_type == 'demand_letter':
-                result = self.drafting_agent.draft_demand_letter(kwargs)
-            elif document_type == 'contract_clause':
-                result = self.drafting_agent.draft_contract_clause(kwargs)
-            else:
+            if document_type not in _DRAFTERS:
                 raise ValueError(f"Unsupported document type: {document_type}")
 
+            # Drafts are never reused semantically: near-identical requests differ in parties and amounts
+            result = getattr(self.drafting_agent, _DRAFTERS[document_type])(kwargs)
+
             # Save document
-            doc_id = db.add_document({
+            doc_id = write_queue.insert('legal_documents', {
                 'document_type': document_type,
                 'title': kwargs.get('title', f"{document_type.title()} Draft"),
                 'case_id': kwargs.get('case_id'),
@@ -209,7 +291,7 @@ class LegalOrchestrator:
                 'creation_date': datetime.now().strftime('%Y-%m-%d')
             })
 
-            logger.info(f"Document drafting completed successfully (ID: {doc_id})")
+            logger.info(f"Document drafting completed successfully (ID: {doc_id or 'queued'})")
             return result
 
         except Exception as e:
@@ -251,10 +333,13 @@ class LegalOrchestrator:
                 **kwargs
             }
 
-            result = self.litigation_agent.analyze_case_strategy(case_data)
+            result = self._cached_analysis(
+                'develop_litigation_strategy', f"case-{case_id}", case_data,
+                lambda: self.litigation_agent.analyze_case_strategy(case_data)
+            )
 
             # Save analysis
-            db.save_analysis_result({
+            write_queue.insert('analysis_results', {
                 'analysis_type': 'litigation_strategy',
                 'entity_type': 'case',
                 'entity_id': case_id,
@@ -270,6 +355,18 @@ class LegalOrchestrator:
             logger.error(f"Litigation strategy development failed: {str(e)}")
             raise
 
+    async def aresearch_case_law(self, lawyer_id: int, **kwargs) -> str:
+        """Async variant of research_case_law, run in a worker thread"""
+        return await asyncio.to_thread(self.research_case_law, lawyer_id, **kwargs)
+
+    async def aanalyze_contract(self, lawyer_id: int, contract_id: int = None, **kwargs) -> str:
+        """Async variant of analyze_contract, run in a worker thread"""
+        return await asyncio.to_thread(self.analyze_contract, lawyer_id, contract_id, **kwargs)
+
+    async def adevelop_litigation_strategy(self, lawyer_id: int, case_id: int, **kwargs) -> str:
+        """Async variant of develop_litigation_strategy, run in a worker thread"""
+        return await asyncio.to_thread(self.develop_litigation_strategy, lawyer_id, case_id, **kwargs)
+
     def comprehensive_case_analysis(self, lawyer_id: int, case_id: int) -> Dict[str, str]:
         """
         Perform comprehensive analysis across all dimensions
@@ -281,41 +378,49 @@ class LegalOrchestrator:
         Returns:
             Dictionary with all analysis results
         """
+        analysis = self.acomprehensive_case_analysis(lawyer_id, case_id)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(analysis)
+        # Called from inside an event loop (e.g. a notebook or async handler), which asyncio.run refuses
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, analysis).result()
+
+    async def acomprehensive_case_analysis(self, lawyer_id: int, case_id: int) -> Dict[str, str]:
+        """
+        Async variant of comprehensive_case_analysis
+
+        Case law research, litigation strategy and the contract analyses are independent,
+        so they run concurrently and the whole analysis takes about as long as the slowest one.
+        """
         logger.info(f"Starting comprehensive analysis for case {case_id}")
 
         results = {}
 
         try:
-            case = db.get_case_by_id(case_id)
-
-            # Case Law Research
-            logger.info("Running case law research...")
-            results['case_law_research'] = self.research_case_law(
-                lawyer_id,
-                case_id=case_id,
-                legal_issue=case.get('key_issues'),
-                practice_area=case.get('practice_area')
+            case, documents = await asyncio.gather(
+                asyncio.to_thread(db.get_case_by_id, case_id),
+                asyncio.to_thread(db.get_case_documents, case_id)
             )
-
-            # Litigation Strategy
-            logger.info("Developing litigation strategy...")
-            results['litigation_strategy'] = self.develop_litigation_strategy(
-                lawyer_id,
-                case_id
+            # Limit to contracts among the first 3 documents
+            contracts = [doc for doc in documents[:3] if doc.get('document_type') in ['contract', 'agreement']]
+
+            logger.info(f"Running case law research, litigation strategy and {len(contracts)} contract analyses...")
+            analyses = await asyncio.gather(
+                self.aresearch_case_law(
+                    lawyer_id,
+                    case_id=case_id,
+                    legal_issue=case.get('key_issues'),
+                    practice_area=case.get('practice_area')
+                ),
+                self.adevelop_litigation_strategy(lawyer_id, case_id),
+                *[self.aanalyze_contract(lawyer_id, contract_id=doc.get('id')) for doc in contracts]
             )
-
-            # Get case documents for contract analysis if applicable
-            documents = db.get_case_documents(case_id)
+            results['case_law_research'] = analyses[0]
+            results['litigation_strategy'] = analyses[1]
             if documents:
-                logger.info("Analyzing case documents...")
-                results['document_analyses'] = []
-                for doc in documents[:3]:  # Limit to first 3 documents
-                    if doc.get('document_type') in ['contract', 'agreement']:
-                        analysis = self.analyze_contract(
-                            lawyer_id,
-                            contract_id=doc.get('id')
-                        )
-                        results['document_analyses'].append(analysis)
+                results['document_analyses'] = list(analyses[2:])
 
             logger.info("Comprehensive analysis completed successfully")
             return results
@@ -335,23 +440,30 @@ class LegalOrchestrator:
             Summary dictionary
         """
         try:
-            lawyer = db.get_lawyer_by_id(lawyer_id)
-            cases = db.get_lawyer_cases(lawyer_id)
-            research_sessions = db.get_lawyer_research_sessions(lawyer_id)
-
-            closed_cases = [c for c in cases if c.get('status') in ['closed', 'settled', 'dismissed']]
-            won_cases = [c for c in closed_cases if c.get('outcome') in ['won', 'favorable', 'settled']]
+            bundle = db.get_lawyer_summary_bundle(lawyer_id)
+            lawyer = bundle['lawyer']
+
+            # Case counts come back grouped by (status, outcome)
+            total_cases = active_cases = closed_cases = won_cases = 0
+            for group in bundle['case_counts']:
+                total_cases += group['count']
+                if group['status'] == 'active':
+                    active_cases += group['count']
+                elif group['status'] in ['closed', 'settled', 'dismissed']:
+                    closed_cases += group['count']
+                    if group['outcome'] in ['won', 'favorable', 'settled']:
+                        won_cases += group['count']
 
             summary = {
                 'lawyer': lawyer,
-                'total_cases': len(cases),
-                'active_cases': len([c for c in cases if c.get('status') == 'active']),
-                'closed_cases': len(closed_cases),
-                'win_rate': (len(won_cases) / len(closed_cases) * 100) if closed_cases else 0,
-                'research_sessions': len(research_sessions),
+                'total_cases': total_cases,
+                'active_cases': active_cases,
+                'closed_cases': closed_cases,
+                'win_rate': (won_cases / closed_cases * 100) if closed_cases else 0,
+                'research_sessions': bundle['research_sessions'],
                 'years_experience': lawyer.get('years_experience', 0),
                 'specializations': lawyer.get('specializations', ''),
-                'recent_cases': cases[:5] if cases else []
+                'recent_cases': bundle['recent_cases']
             }
 
             return summary
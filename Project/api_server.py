@@ -5,7 +5,9 @@ Built with FastAPI for programmatic access
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Dict, Any
+import asyncio
 import uvicorn
 import sys
 from pathlib import Path
@@ -16,7 +18,11 @@ sys.path.insert(0, str(Path(__file__).parent))
 from config import config
 from utils.database import db
 from utils.validators import validators
+from utils.write_queue import write_queue
 from agents.orchestrator import orchestrator
+from agents._cache import ResponseCache, single_flight
+from agents._llm import token_usage
+from agents._metrics import agent_metrics
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -25,6 +31,33 @@ app = FastAPI(
     description="AI-powered Legal Intelligence System API"
 )
 
+# Recent results of read-only database queries, cleared whenever an endpoint writes
+_read_cache = ResponseCache(maxsize=1024, ttl=config.API_READ_CACHE_TTL_SECONDS)
+
+
+async def cached_read(query, *args):
+    """
+    Run a blocking database read in a worker thread, reusing its result for API_READ_CACHE_TTL_SECONDS
+
+    Identical reads already in flight share one query. None results (e.g. unknown IDs) are not cached.
+    """
+    if config.API_READ_CACHE_TTL_SECONDS <= 0:
+        return await asyncio.to_thread(query, *args)
+
+    key = ResponseCache.make_call_key(f"api.{query.__name__}", "", args)
+    cached = _read_cache.get_key(key)
+    if cached is not None:
+        return cached
+
+    async def run():
+        result = await asyncio.to_thread(query, *args)
+        if result is not None:
+            _read_cache.set_key(key, result)
+        return result
+
+    return await single_flight.ado(key, run)
+
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -94,6 +127,38 @@ class ComplianceAssessmentRequest(BaseModel):
     current_practices: Optional[str] = None
 
 
+@app.on_event("startup")
+async def configure_worker_threads():
+    """Size the thread pool that endpoints offload blocking database and agent calls to"""
+    # The default pool (cpu + 4 threads) would queue requests behind a few multi-second Gemini calls
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=config.API_WORKER_THREADS, thread_name_prefix="api-worker")
+    )
+
+
+@app.on_event("startup")
+async def start_write_queue():
+    """Write analysis records in the background so responses do not wait on SQLite"""
+    # Cached reads are dropped once queued records are committed, not when the request returns
+    write_queue.add_commit_listener(_read_cache.clear)
+    write_queue.start()
+
+
+@app.on_event("shutdown")
+async def flush_write_queue():
+    """Write any queued records before the server exits"""
+    await asyncio.to_thread(write_queue.stop)
+
+
+@app.on_event("startup")
+async def warm_caches():
+    """Build agents with warm-up work at startup so it runs before the first request"""
+    if config.WARM_CLAUSE_CACHE:
+        orchestrator.drafting_agent
+    if config.GEMINI_WARMUP:
+        orchestrator.litigation_agent
+
+
 # Health Check
 @app.get("/")
 async def root():
@@ -123,7 +188,8 @@ async def create_lawyer(lawyer: LawyerCreate):
         raise HTTPException(status_code=400, detail={"errors": errors})
 
     try:
-        lawyer_id = db.add_lawyer(lawyer_data)
+        lawyer_id = await asyncio.to_thread(db.add_lawyer, lawyer_data)
+        _read_cache.clear()
         return {"id": lawyer_id, "message": "Lawyer created successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -133,7 +199,7 @@ async def create_lawyer(lawyer: LawyerCreate):
 async def get_lawyers():
     """Get all lawyers"""
     try:
-        lawyers = db.get_all_lawyers()
+        lawyers = await cached_read(db.get_all_lawyers)
         return {"lawyers": lawyers, "count": len(lawyers)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -143,7 +209,7 @@ async def get_lawyers():
 async def get_lawyer(lawyer_id: int):
     """Get lawyer by ID"""
     try:
-        lawyer = db.get_lawyer_by_id(lawyer_id)
+        lawyer = await cached_read(db.get_lawyer_by_id, lawyer_id)
         if not lawyer:
             raise HTTPException(status_code=404, detail="Lawyer not found")
         return lawyer
@@ -157,7 +223,7 @@ async def get_lawyer(lawyer_id: int):
 async def get_lawyer_summary(lawyer_id: int):
     """Get lawyer summary with statistics"""
     try:
-        summary = orchestrator.get_lawyer_summary(lawyer_id)
+        summary = await asyncio.to_thread(orchestrator.get_lawyer_summary, lawyer_id)
         return summary
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -175,7 +241,8 @@ async def create_case(case: CaseCreate):
         raise HTTPException(status_code=400, detail={"errors": errors})
 
     try:
-        case_id = db.add_case(case_data)
+        case_id = await asyncio.to_thread(db.add_case, case_data)
+        _read_cache.clear()
         return {"id": case_id, "message": "Case created successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -185,7 +252,7 @@ async def create_case(case: CaseCreate):
 async def get_case(case_id: int):
     """Get case by ID"""
     try:
-        case = db.get_case_by_id(case_id)
+        case = await cached_read(db.get_case_by_id, case_id)
         if not case:
             raise HTTPException(status_code=404, detail="Case not found")
         return case
@@ -199,7 +266,7 @@ async def get_case(case_id: int):
 async def get_lawyer_cases(lawyer_id: int):
     """Get all cases for a lawyer"""
     try:
-        cases = db.get_lawyer_cases(lawyer_id)
+        cases = await cached_read(db.get_lawyer_cases, lawyer_id)
         return {"cases": cases, "count": len(cases)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -210,7 +277,8 @@ async def get_lawyer_cases(lawyer_id: int):
 async def research_case_law(request: CaseLawResearchRequest):
     """Perform case law research"""
     try:
-        result = orchestrator.research_case_law(
+        result = await asyncio.to_thread(
+            orchestrator.research_case_law,
             request.lawyer_id,
             legal_issue=request.legal_issue,
             jurisdiction=request.jurisdiction,
@@ -227,7 +295,8 @@ async def research_case_law(request: CaseLawResearchRequest):
 async def analyze_contract(request: ContractAnalysisRequest):
     """Analyze a contract"""
     try:
-        result = orchestrator.analyze_contract(
+        result = await asyncio.to_thread(
+            orchestrator.analyze_contract,
             request.lawyer_id,
             contract_name=request.contract_name,
             contract_type=request.contract_type,
@@ -246,7 +315,8 @@ async def analyze_contract(request: ContractAnalysisRequest):
 async def assess_compliance(request: ComplianceAssessmentRequest):
     """Assess compliance"""
     try:
-        result = orchestrator.assess_compliance(
+        result = await asyncio.to_thread(
+            orchestrator.assess_compliance,
             request.lawyer_id,
             organization=request.organization,
             industry=request.industry,
@@ -264,7 +334,7 @@ async def assess_compliance(request: ComplianceAssessmentRequest):
 async def develop_litigation_strategy(case_id: int, lawyer_id: int):
     """Develop litigation strategy for a case"""
     try:
-        result = orchestrator.develop_litigation_strategy(lawyer_id, case_id)
+        result = await asyncio.to_thread(orchestrator.develop_litigation_strategy, lawyer_id, case_id)
         return {"strategy": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -274,7 +344,7 @@ async def develop_litigation_strategy(case_id: int, lawyer_id: int):
 async def comprehensive_case_analysis(case_id: int, lawyer_id: int):
     """Perform comprehensive case analysis"""
     try:
-        result = orchestrator.comprehensive_case_analysis(lawyer_id, case_id)
+        result = await orchestrator.acomprehensive_case_analysis(lawyer_id, case_id)
         return {"analyses": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -285,8 +355,18 @@ async def comprehensive_case_analysis(case_id: int, lawyer_id: int):
 async def get_database_stats():
     """Get database statistics"""
     try:
-        stats = db.get_database_stats()
-        return stats
+        stats = await cached_read(db.get_database_stats)
+        return {**stats, "read_cache": dict(_read_cache.stats)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Agent Call Stats
+@app.get("/stats/agents")
+async def get_agent_stats():
+    """Get per-method cache hit rates, latencies and Gemini token usage"""
+    try:
+        return {"methods": agent_metrics.snapshot(), "tokens": token_usage()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -24,16 +24,38 @@ class Config:
     WEB_PORT = int(os.getenv("WEB_PORT", "8501"))
     API_PORT = int(os.getenv("API_PORT", "8004"))
     CLI_ENABLED = os.getenv("CLI_ENABLED", "true").lower() == "true"
+    # Worker threads for blocking database and agent calls made by API requests
+    API_WORKER_THREADS = int(os.getenv("API_WORKER_THREADS", "64"))
 
     # AI Model Configuration
     AI_MODEL = os.getenv("AI_MODEL", "gemini-2.5-flash-lite")
+    AI_MODEL_FAST = os.getenv("AI_MODEL_FAST", "gemini-2.5-flash-lite")
     AI_TEMPERATURE = float(os.getenv("AI_TEMPERATURE", "0.7"))
     AI_MAX_TOKENS = int(os.getenv("AI_MAX_TOKENS", "8000"))
 
+    # Gemini Resilience
+    GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
+    GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+    GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+    GEMINI_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "500"))
+    GEMINI_BATCH_POLL_SECONDS = float(os.getenv("GEMINI_BATCH_POLL_SECONDS", "60"))
+    GEMINI_BATCH_TIMEOUT_SECONDS = float(os.getenv("GEMINI_BATCH_TIMEOUT_SECONDS", "3600"))
+
+    # Gemini HTTP Connection Pool
+    GEMINI_HTTP2 = os.getenv("GEMINI_HTTP2", "true").lower() == "true"
+    GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "64"))
+    GEMINI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GEMINI_MAX_KEEPALIVE_CONNECTIONS", "32"))
+    GEMINI_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("GEMINI_KEEPALIVE_EXPIRY_SECONDS", "60"))
+    GEMINI_WARMUP = os.getenv("GEMINI_WARMUP", "true").lower() == "true"
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_BREAKER_RESET_SECONDS = float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", "30"))
+
     # Database Configuration
     BASE_DIR = Path(__file__).parent
     DATABASE_PATH = os.getenv("DATABASE_PATH", str(BASE_DIR / "legal_intelligence.db"))
     ENABLE_DATABASE_LOGGING = os.getenv("ENABLE_DATABASE_LOGGING", "true").lower() == "true"
+    # Most queued background writes committed in one transaction
+    DB_WRITE_BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", "50"))
 
     # Logging Configuration
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -63,6 +85,11 @@ class Config:
     MIN_CASE_RELEVANCE_SCORE = float(os.getenv("MIN_CASE_RELEVANCE_SCORE", "0.6"))
     MAX_CASE_RECOMMENDATIONS = int(os.getenv("MAX_CASE_RECOMMENDATIONS", "20"))
     STATUTE_SEARCH_DEPTH = int(os.getenv("STATUTE_SEARCH_DEPTH", "50"))
+    PRECEDENT_DETAIL_LIMIT = int(os.getenv("PRECEDENT_DETAIL_LIMIT", "20"))
+    PRECEDENT_TOKEN_BUDGET = int(os.getenv("PRECEDENT_TOKEN_BUDGET", "24000"))
+    CASE_COMPARISON_MAP_REDUCE_MIN = int(os.getenv("CASE_COMPARISON_MAP_REDUCE_MIN", "5"))
+    # Token budget for each free-text case field (facts, evidence) in litigation prompts
+    CASE_FIELD_TOKEN_BUDGET = int(os.getenv("CASE_FIELD_TOKEN_BUDGET", "2000"))
 
     # Legal Research Metrics
     TARGET_CASE_SUCCESS_RATE = float(os.getenv("TARGET_CASE_SUCCESS_RATE", "0.75"))
@@ -90,6 +117,11 @@ class Config:
             "Liability,Termination,Payment Terms,Intellectual Property,Confidentiality,Force Majeure,Indemnification,Warranties"
         ).split(",")
     ]
+    # Token budgets for contract text in risk assessments and for each side of a comparison
+    CONTRACT_TEXT_TOKEN_BUDGET = int(os.getenv("CONTRACT_TEXT_TOKEN_BUDGET", "4000"))
+    COMPARISON_TEXT_TOKEN_BUDGET = int(os.getenv("COMPARISON_TEXT_TOKEN_BUDGET", "3000"))
+    # Clause reviews up to this many (estimated) tokens run on AI_MODEL_FAST
+    CLAUSE_FAST_TIER_MAX_TOKENS = int(os.getenv("CLAUSE_FAST_TIER_MAX_TOKENS", "500"))
 
     # Compliance Framework Settings
     COMPLIANCE_FRAMEWORKS = [
@@ -103,6 +135,22 @@ class Config:
     # Cache Settings
     ENABLE_CACHING = os.getenv("ENABLE_CACHING", "true").lower() == "true"
     CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+    CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", str(Path.home() / ".cache" / "legal_agents" / "llm_cache.db"))
+    CACHE_DB_MAX_ENTRIES = int(os.getenv("CACHE_DB_MAX_ENTRIES", "100000"))
+    CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "true").lower() == "true"
+    ENABLE_CONTEXT_CACHING = os.getenv("ENABLE_CONTEXT_CACHING", "true").lower() == "true"
+    CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("CONTEXT_CACHE_TTL_SECONDS", "3600"))
+    ENABLE_SEMANTIC_CACHE = os.getenv("ENABLE_SEMANTIC_CACHE", "false").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+    SEMANTIC_CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH", "")
+    SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "86400"))
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "gemini-embedding-001")
+    EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "768"))
+    WARM_CLAUSE_CACHE = os.getenv("WARM_CLAUSE_CACHE", "false").lower() == "true"
+    WARM_CLAUSES_PATH = os.getenv("WARM_CLAUSES_PATH", "")
+    API_READ_CACHE_TTL_SECONDS = int(os.getenv("API_READ_CACHE_TTL_SECONDS", "30"))
 
     # Rate Limiting
     API_RATE_LIMIT_PER_MINUTE = int(os.getenv("API_RATE_LIMIT_PER_MINUTE", "60"))
@@ -4,6 +4,7 @@ Utilities package for Legal Intelligence System
 from utils.database import db, LegalDatabase
 from utils.logger import setup_logger
 from utils.validators import validators, Validators, ValidationError
+from utils.write_queue import write_queue, WriteQueue
 
 __all__ = [
     'db',
@@ -11,5 +12,7 @@ __all__ = [
     'setup_logger',
     'validators',
     'Validators',
-    'ValidationError'
+    'ValidationError',
+    'write_queue',
+    'WriteQueue'
 ]
@@ -6,7 +6,7 @@ import sqlite3
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from contextlib import contextmanager
 
 from config import config
@@ -294,6 +294,18 @@ class LegalDatabase:
             cursor.execute(query, tuple(data.values()))
             return cursor.lastrowid
 
+    def execute_insert_batch(self, rows: List[Tuple[str, Dict[str, Any]]]) -> List[int]:
+        """Insert (table, data) rows in one transaction and return their row ids"""
+        ids = []
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            for table, data in rows:
+                columns = ', '.join(data.keys())
+                placeholders = ', '.join(['?' for _ in data])
+                cursor.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", tuple(data.values()))
+                ids.append(cursor.lastrowid)
+        return ids
+
     def execute_update(self, table: str, data: Dict[str, Any], where: str, params: tuple = ()) -> int:
         """Update table and return number of rows affected"""
         set_clause = ', '.join([f"{k} = ?" for k in data.keys()])
@@ -448,6 +460,42 @@ class LegalDatabase:
         """Get research sessions for a lawyer"""
         return self.execute_query("SELECT * FROM research_sessions WHERE lawyer_id = ? ORDER BY session_date DESC", (lawyer_id,))
 
+    def get_lawyer_summary_bundle(self, lawyer_id: int, recent_limit: int = 5) -> Dict[str, Any]:
+        """
+        Get everything a lawyer summary needs in one connection
+
+        Args:
+            lawyer_id: Lawyer ID
+            recent_limit: Number of most recent cases to include
+
+        Returns:
+            Dictionary with the lawyer row (None if not found), case counts grouped by
+            status and outcome, the research session count and the most recent cases
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM lawyers WHERE id = ?", (lawyer_id,))
+            lawyer = cursor.fetchone()
+            cursor.execute(
+                "SELECT status, outcome, COUNT(*) as count FROM cases WHERE lawyer_id = ? GROUP BY status, outcome",
+                (lawyer_id,)
+            )
+            case_counts = [dict(row) for row in cursor.fetchall()]
+            cursor.execute("SELECT COUNT(*) as count FROM research_sessions WHERE lawyer_id = ?", (lawyer_id,))
+            research_sessions = cursor.fetchone()['count']
+            cursor.execute(
+                "SELECT * FROM cases WHERE lawyer_id = ? ORDER BY filing_date DESC LIMIT ?",
+                (lawyer_id, recent_limit)
+            )
+            recent_cases = [dict(row) for row in cursor.fetchall()]
+
+        return {
+            'lawyer': dict(lawyer) if lawyer else None,
+            'case_counts': case_counts,
+            'research_sessions': research_sessions,
+            'recent_cases': recent_cases
+        }
+
     # Analysis Operations
     def save_analysis_result(self, analysis_data: Dict[str, Any]) -> int:
         """Save analysis result"""
@@ -0,0 +1,123 @@
+"""
+Background database writes for Legal Intelligence System
+Queues non-critical inserts (analysis results, research sessions, drafts) off the request path
+"""
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import config
+from utils.database import db, LegalDatabase
+
+logger = logging.getLogger(__name__)
+
+# Queued by stop() to tell the writer thread to exit once earlier rows are written
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    Inserts rows from a background thread, committing up to DB_WRITE_BATCH_SIZE per transaction
+
+    Only the API server calls start(); elsewhere (the CLI and web interface) inserts
+    are written synchronously, so callers do not need to know whether a writer is running.
+    """
+
+    def __init__(self, database: LegalDatabase, batch_size: Optional[int] = None):
+        """
+        Initialize write queue
+
+        Args:
+            database: Database the rows are written to
+            batch_size: Most rows per transaction (defaults to DB_WRITE_BATCH_SIZE)
+        """
+        self.database = database
+        self.batch_size = batch_size or config.DB_WRITE_BATCH_SIZE
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._commit_listeners: List[Callable[[], None]] = []
+
+    def add_commit_listener(self, listener: Callable[[], None]) -> None:
+        """Call listener after each committed write (e.g. to invalidate caches of query results)"""
+        self._commit_listeners.append(listener)
+
+    def insert(self, table: str, data: Dict[str, Any]) -> Optional[int]:
+        """
+        Insert a row, in the background when the writer is running
+
+        Args:
+            table: Table name
+            data: Column values
+
+        Returns:
+            Row id when written synchronously, None when queued
+        """
+        with self._lock:
+            # Checked and queued together so no row lands behind stop()'s sentinel
+            if self._thread is not None:
+                self._queue.put((table, data))
+                return None
+        row_id = self.database.execute_insert(table, data)
+        self._notify_commit()
+        return row_id
+
+    def start(self) -> None:
+        """Start the writer thread; later inserts are queued"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Write every queued row, then stop the writer; later inserts are synchronous again"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        """Writer loop: block for a row, then commit it with whatever else is already queued"""
+        while True:
+            rows: List[Tuple[str, Dict[str, Any]]] = []
+            item = self._queue.get()
+            while item is not _STOP:
+                rows.append(item)
+                if len(rows) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if rows:
+                self._write(rows)
+            if item is _STOP:
+                return
+
+    def _write(self, rows: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Commit rows in one transaction, falling back to one per row so a bad row loses only itself"""
+        try:
+            self.database.execute_insert_batch(rows)
+        except Exception as e:
+            logger.warning(f"Batched write of {len(rows)} rows failed, retrying individually: {str(e)}")
+            for table, data in rows:
+                try:
+                    self.database.execute_insert(table, data)
+                except Exception as e:
+                    logger.error(f"Background insert into {table} failed: {str(e)}")
+        self._notify_commit()
+
+    def _notify_commit(self) -> None:
+        """Run the commit listeners; a failing listener is logged and does not affect the write"""
+        for listener in self._commit_listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Write queue commit listener failed: {str(e)}")
+
+
+# Global write queue instance
+write_queue = WriteQueue(db)
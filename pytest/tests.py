@@ -14,6 +14,13 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import Config
 from utils.database import LegalDatabase
 from utils.validators import Validators
+from utils.write_queue import WriteQueue
+from agents._cache import ResponseCache, SingleFlight, SQLiteBackend, cached_llm_call
+from agents._prompt_utils import HeadingSplitter, PromptTemplate, SectionSplitter
+from agents._semantic_cache import SemanticCache
+from agents._metrics import CallMetrics
+from agents._batch import BatchProcessor
+from agents._llm import CircuitBreaker, CircuitOpenError, LLMCallError, is_transient, record_usage, token_usage
 
 
 # ============================================================================
@@ -296,6 +303,421 @@ def test_15_compliance_frameworks_list_loaded():
     print(f"✓ Test 15: Loaded {len(config.COMPLIANCE_FRAMEWORKS)} compliance frameworks")
 
 
+def test_16_response_cache_evicts_least_recently_used():
+    """Test Case 16: Response cache keeps recently used prompts and evicts the oldest"""
+    # Arrange
+    cache = ResponseCache(maxsize=2)
+    cache.set("prompt a", "answer a")
+    cache.set("prompt b", "answer b")
+
+    # Act
+    cache.get("prompt a")
+    cache.set("prompt c", "answer c")
+
+    # Assert
+    assert cache.get("prompt a") == "answer a"
+    assert cache.get("prompt b") is None
+    assert cache.get("prompt c") == "answer c"
+    assert len(cache) == 2
+    print("✓ Test 16: Response cache evicts least recently used entry")
+
+
+def test_17_prompt_template_fills_missing_fields():
+    """Test Case 17: Prompt templates fall back per field for missing input"""
+    # Arrange
+    template = PromptTemplate("{case_name} | {citation} | {holding}", {'case_name': 'Unknown'})
+
+    # Act
+    prompt = template.render({'citation': '123 F.3d 456'})
+
+    # Assert
+    assert prompt == "Unknown | 123 F.3d 456 | Not provided"
+    print("✓ Test 17: Prompt template fills missing fields")
+
+
+def test_18_section_splitter_handles_streamed_chunks():
+    """Test Case 18: Section splitter emits sections as soon as they close"""
+    # Arrange
+    splitter = SectionSplitter()
+    chunks = ["<<<SEC 1>>>\nPrecedents", " found\n<<<END", " 1>>>\n<<<SEC 2>>>Princ", "iples<<<END 2>>>"]
+
+    # Act
+    emitted = [splitter.feed(chunk) for chunk in chunks]
+
+    # Assert
+    assert emitted[0] == []
+    assert emitted[2] == [(1, "Precedents found")]
+    assert emitted[3] == [(2, "Principles")]
+    print("✓ Test 18: Section splitter handles streamed chunks")
+
+
+def test_19_circuit_breaker_opens_after_failures():
+    """Test Case 19: Circuit breaker fails fast after repeated failures"""
+    # Arrange
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    # Act
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+
+    # Assert
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert not breaker.is_open
+    print("✓ Test 19: Circuit breaker opens after repeated failures")
+
+
+def test_20_response_cache_expires_entries_after_ttl(monkeypatch):
+    """Test Case 20: Response cache treats entries past their TTL as misses"""
+    # Arrange
+    import agents._cache as cache_module
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    cache = ResponseCache(maxsize=8, ttl=60)
+    cache.set("prompt", "answer")
+
+    # Act
+    fresh = cache.get("prompt")
+    now[0] += 61
+    expired = cache.get("prompt")
+
+    # Assert
+    assert fresh == "answer"
+    assert expired is None
+    assert cache.stats == {"hits": 1, "misses": 1}
+    print("✓ Test 20: Response cache expires entries after TTL")
+
+
+def test_21_sqlite_cache_persists_and_honors_prompt_version(tmp_path):
+    """Test Case 21: SQLite cache survives reopening and ignores other prompt versions"""
+    # Arrange
+    db_path = str(tmp_path / "llm_cache.db")
+    ResponseCache(backend=SQLiteBackend(db_path, prompt_version="v1")).set("prompt", "answer")
+
+    # Act
+    reopened = ResponseCache(backend=SQLiteBackend(db_path, prompt_version="v1"))
+    bumped = ResponseCache(backend=SQLiteBackend(db_path, prompt_version="v2"))
+
+    # Assert
+    assert reopened.get("prompt") == "answer"
+    assert bumped.get("prompt") is None
+    assert len(reopened) == 1
+    print("✓ Test 21: SQLite cache persists and honors prompt version")
+
+
+def test_22_token_usage_tracks_cached_prompt_tokens():
+    """Test Case 22: Token usage accumulates prompt tokens served from Gemini's cache"""
+    # Arrange
+    from types import SimpleNamespace
+    before = token_usage()
+    run = SimpleNamespace(
+        agent_name="Test Agent",
+        metrics=SimpleNamespace(input_tokens=1000, cache_read_tokens=800, output_tokens=200)
+    )
+
+    # Act
+    record_usage(run)
+    after = token_usage()
+
+    # Assert
+    assert after["prompt_tokens"] - before["prompt_tokens"] == 1000
+    assert after["cached_tokens"] - before["cached_tokens"] == 800
+    assert after["output_tokens"] - before["output_tokens"] == 200
+    assert 0 < after["cached_ratio"] <= 1
+    print("✓ Test 22: Token usage tracks cached prompt tokens")
+
+
+def test_23_single_flight_coalesces_concurrent_calls():
+    """Test Case 23: Concurrent identical async calls share one execution"""
+    # Arrange
+    import asyncio
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def burst():
+        return await asyncio.gather(*[flight.ado("key", work) for _ in range(5)])
+
+    # Act
+    results = asyncio.run(burst())
+
+    # Assert
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
+    print("✓ Test 23: Single flight coalesces concurrent calls")
+
+
+def test_24_response_cache_compresses_long_responses():
+    """Test Case 24: Compressed cache stores long responses smaller and returns them intact"""
+    # Arrange
+    cache = ResponseCache(maxsize=8, compress=True)
+    response = "## Executive Summary\nThe organization should ensure GDPR compliance.\n" * 50
+
+    # Act
+    cache.set("prompt", response)
+    stored, _ = cache.backend.get(ResponseCache.make_key("prompt"))
+
+    # Assert
+    assert isinstance(stored, bytes)
+    assert len(stored) < len(response) / 3
+    assert cache.get("prompt") == response
+    print("✓ Test 24: Response cache compresses long responses")
+
+
+def test_25_semantic_cache_warm_loads_saved_entries(tmp_path):
+    """Test Case 25: Semantic cache saved to disk is warm-loaded by a new instance"""
+    # Arrange
+    import numpy as np
+    path = str(tmp_path / "semantic_cache.npz")
+    vector = np.array([0.6, 0.8], dtype=np.float32)
+    saved = SemanticCache(path=path)
+    saved.add("assess_compliance", vector, "cached assessment")
+    saved.save()
+
+    # Act
+    loaded = SemanticCache(path=path, dimensions=2)
+    loaded.embed = lambda text: vector
+    loaded.warm_load()
+    loaded.wait_ready(timeout=5)
+    response, _ = loaded.lookup("assess_compliance", "similar prompt")
+
+    # Assert
+    assert response == "cached assessment"
+    print("✓ Test 25: Semantic cache warm-loads saved entries")
+
+
+def test_26_call_metrics_report_hit_rate_and_latency():
+    """Test Case 26: Call metrics summarize cache hit rate and latency per method"""
+    # Arrange
+    metrics = CallMetrics()
+
+    # Act
+    metrics.incr("assess_compliance", "exact_hit")
+    metrics.incr("assess_compliance", "exact_miss", 3)
+    metrics.observe("assess_compliance", 0.2)
+    metrics.observe("assess_compliance", 4.0)
+    snapshot = metrics.snapshot()["assess_compliance"]
+
+    # Assert
+    assert snapshot["exact_hit_rate"] == 0.25
+    assert snapshot["latency"]["count"] == 2
+    assert snapshot["latency"]["max"] == 4.0
+    assert snapshot["latency"]["buckets"]["0.25"] == 1
+    assert snapshot["latency"]["buckets"]["5"] == 1
+    print("✓ Test 26: Call metrics report hit rate and latency")
+
+
+def test_27_batch_processor_retries_and_preserves_order(monkeypatch):
+    """Test Case 27: Batch processor retries transient errors and keeps input order"""
+    # Arrange
+    import asyncio
+    import agents._batch as batch_module
+    monkeypatch.setattr(batch_module, "backoff_delay", lambda attempt: 0)
+    failures = {"b": 1}
+
+    class FakeAgent:
+        async def aanalyze_contract(self, item):
+            if failures.get(item["name"]):
+                failures[item["name"]] -= 1
+                raise LLMCallError("Gemini unavailable", status_code=503)
+            return f"analysis of {item['name']}"
+
+    progress = []
+    processor = BatchProcessor(FakeAgent(), max_concurrency=2, rpm=600, retries=2)
+    items = [{"name": name} for name in "abc"]
+
+    # Act
+    results = asyncio.run(processor.run_batch("analyze_contract", items, on_progress=lambda done, total: progress.append(done)))
+
+    # Assert
+    assert results == ["analysis of a", "analysis of b", "analysis of c"]
+    assert progress[-1] == 3
+    print("✓ Test 27: Batch processor retries and preserves order")
+
+
+def test_28_heading_splitter_emits_markdown_sections():
+    """Test Case 28: Heading splitter emits each section once the next heading arrives"""
+    # Arrange
+    splitter = HeadingSplitter()
+    chunks = ["### Executive Summary\nLow", " risk\n### Risk", " Matrix\n| Liability | High |\n"]
+
+    # Act
+    emitted = [splitter.feed(chunk) for chunk in chunks]
+    final = splitter.close()
+
+    # Assert
+    assert emitted[:2] == [[], []]
+    assert emitted[2] == [("Executive Summary", "Low risk")]
+    assert final == [("Risk Matrix", "| Liability | High |")]
+    print("✓ Test 28: Heading splitter emits markdown sections")
+
+
+def test_29_lawyer_summary_bundle_groups_case_counts(test_db, sample_lawyer, sample_case):
+    """Test Case 29: Lawyer summary bundle returns grouped case counts and recent cases"""
+    # Arrange
+    lawyer_id = test_db.add_lawyer(sample_lawyer)
+    for number, (status, outcome) in enumerate([('active', None), ('closed', 'won'), ('closed', 'won'), ('settled', 'lost')]):
+        test_db.add_case({**sample_case, 'case_number': f"CV-2024-{number}", 'lawyer_id': lawyer_id,
+                          'status': status, 'outcome': outcome})
+
+    # Act
+    bundle = test_db.get_lawyer_summary_bundle(lawyer_id, recent_limit=3)
+
+    # Assert
+    counts = {(group['status'], group['outcome']): group['count'] for group in bundle['case_counts']}
+    assert bundle['lawyer']['id'] == lawyer_id
+    assert counts == {('active', None): 1, ('closed', 'won'): 2, ('settled', 'lost'): 1}
+    assert bundle['research_sessions'] == 0
+    assert len(bundle['recent_cases']) == 3
+    assert test_db.get_lawyer_summary_bundle(9999)['lawyer'] is None
+    print("✓ Test 29: Lawyer summary bundle groups case counts")
+
+
+def test_30_write_queue_flushes_background_inserts(test_db, sample_lawyer):
+    """Test Case 30: Write queue inserts synchronously until started, then in the background"""
+    # Arrange
+    lawyer_id = test_db.add_lawyer(sample_lawyer)
+    writes = WriteQueue(test_db, batch_size=2)
+    session = {'session_name': 'Research', 'lawyer_id': lawyer_id}
+    commits = []
+    writes.add_commit_listener(lambda: commits.append(True))
+
+    # Act
+    row_id = writes.insert('research_sessions', session)
+    writes.start()
+    queued = [writes.insert('research_sessions', session) for _ in range(5)]
+    writes.stop(timeout=5)
+
+    # Assert
+    assert row_id is not None
+    assert queued == [None] * 5
+    assert len(test_db.get_lawyer_research_sessions(lawyer_id)) == 6
+    assert 2 <= len(commits) <= 6
+    print("✓ Test 30: Write queue flushes background inserts")
+
+
+def test_31_cached_llm_call_skips_command_operations(monkeypatch):
+    """Test Case 31: Informational calls are served from the cache, command calls always run"""
+    # Arrange
+    monkeypatch.setattr(Config, 'ENABLE_CACHING', True)
+
+    class FakeAgent:
+        _cache = ResponseCache(maxsize=8)
+        agent = type('Agent', (), {'model': type('Model', (), {'id': 'test-model'})})()
+        calls = []
+
+        @staticmethod
+        def _cacheable(method):
+            return method != 'file_motion'
+
+        @cached_llm_call
+        def summarize(self, data, bypass_cache=False):
+            self.calls.append('summarize')
+            return "summary"
+
+        @cached_llm_call
+        def file_motion(self, data, bypass_cache=False):
+            self.calls.append('file_motion')
+            return "filed"
+
+    owner = FakeAgent()
+
+    # Act
+    for _ in range(2):
+        owner.summarize({'case_id': 1})
+        owner.file_motion({'case_id': 1})
+
+    # Assert
+    assert owner.calls.count('summarize') == 1
+    assert owner.calls.count('file_motion') == 2
+    print("✓ Test 31: Cached LLM call skips command operations")
+
+
+def test_32_semantic_cache_expires_entries_and_checks_prompt_version(tmp_path, monkeypatch):
+    """Test Case 32: Semantic entries stop matching after their TTL; saves from another prompt version are not loaded"""
+    # Arrange
+    import numpy as np
+    import agents._semantic_cache as semantic_module
+    now = [1000.0]
+    monkeypatch.setattr(semantic_module.time, "time", lambda: now[0])
+    path = str(tmp_path / "semantic_cache.npz")
+    vector = np.array([0.6, 0.8], dtype=np.float32)
+    cache = SemanticCache(path=path, ttl=60, prompt_version="v1", dimensions=2)
+    cache.embed = lambda text: vector
+    cache.add("assess_compliance", vector, "cached assessment")
+    cache.save()
+
+    # Act
+    fresh, _ = cache.lookup("assess_compliance", "similar prompt")
+    now[0] += 61
+    expired, _ = cache.lookup("assess_compliance", "similar prompt")
+    now[0] -= 61
+    other_version = SemanticCache(path=path, ttl=60, prompt_version="v2", dimensions=2)
+    other_version.embed = lambda text: vector
+    other_version.warm_load()
+    other_version.wait_ready(timeout=5)
+    reloaded, _ = other_version.lookup("assess_compliance", "similar prompt")
+
+    # Assert
+    assert fresh == "cached assessment"
+    assert expired is None
+    assert reloaded is None
+    print("✓ Test 32: Semantic cache expires entries and checks prompt version")
+
+
+def test_33_semantic_cache_drops_saved_buckets_of_another_dimension(tmp_path):
+    """Test Case 33: Buckets saved with a different embedding size are dropped on load instead of failing lookups"""
+    # Arrange
+    import numpy as np
+    path = str(tmp_path / "semantic_cache.npz")
+    saved = SemanticCache(path=path, dimensions=2)
+    saved.add("assess_compliance", np.array([0.6, 0.8], dtype=np.float32), "cached assessment")
+    saved.save()
+    vector = np.array([0.0, 0.6, 0.8], dtype=np.float32)
+
+    # Act
+    loaded = SemanticCache(path=path, dimensions=3)
+    loaded.embed = lambda text: vector
+    loaded.warm_load()
+    loaded.wait_ready(timeout=5)
+    response, returned = loaded.lookup("assess_compliance", "similar prompt")
+
+    # Assert
+    assert response is None
+    assert returned is vector
+    print("✓ Test 33: Semantic cache drops saved buckets of another dimension")
+
+
+def test_34_transient_errors_classified_by_status_code():
+    """Test Case 34: Retries follow the provider status code, not words that happen to appear in the message"""
+    # Arrange
+    from google.genai import errors as genai_errors
+    unavailable = genai_errors.APIError(503, {'error': {'code': 503, 'status': 'UNAVAILABLE', 'message': 'Overloaded'}})
+    bad_request = genai_errors.APIError(400, {'error': {'code': 400, 'status': 'INVALID_ARGUMENT',
+                                                        'message': 'Prompt exceeds 500 tokens'}})
+
+    # Act
+    run_errors = [
+        LLMCallError.from_run(str(unavailable)),
+        LLMCallError.from_run(str(bad_request)),
+        LLMCallError.from_run('{"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}}'),
+        LLMCallError.from_run("Connection string is not configured"),
+    ]
+
+    # Assert
+    assert is_transient(unavailable)
+    assert not is_transient(bad_request)
+    assert [is_transient(error) for error in run_errors] == [True, False, True, False]
+    assert is_transient(TimeoutError())
+    print("✓ Test 34: Transient errors classified by status code")
+
 # ============================================================================
 # RUN TESTS
 # ============================================================================